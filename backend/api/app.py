@@ -1,11 +1,15 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Request, request, jsonify, send_file, Response
+import io
 import os
 import sys
 import logging
 import json
+import time
 from werkzeug.utils import secure_filename
 import uuid
 
+APP_START_TIME = time.perf_counter()
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -13,22 +17,21 @@ logger = logging.getLogger(__name__)
 # Add backend directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Import services
-from services.image_recognition.image_analyzer import ImageAnalyzer
-from services.nlp.text_processor import TextProcessor
-from services.nlp.intent_classifier import IntentClassifier
-from services.nlp.entity_extractor import EntityExtractor
-from services.nlp.command_parser import CommandParser
-from services.nlp.response_generator import ResponseGenerator
-from services.design_engine.design_manager import DesignManager
-from services.design_engine.material_database import MaterialDatabase
-from services.design_engine.industry_standards import IndustryStandards
-from services.design_engine.sustainability_analyzer import SustainabilityAnalyzer
-from services.design_engine.trend_analyzer import TrendAnalyzer
-from services.design_engine.compliance_checker import ComplianceChecker
+# Import lightweight services; heavy subsystems are imported by the registry on first use
+from services.service_registry import ServiceRegistry
+from services.image_recognition.analysis_jobs import AnalysisJobQueue, SqliteJobStore
+from services.image_recognition.upload_ingest import UploadIngestor
+from services.design_engine.project_store import ProjectVersionConflict
+
+class InMemoryUploadRequest(Request):
+    """Request that keeps uploaded files in memory (bounded by MAX_CONTENT_LENGTH) instead of spooling them to disk"""
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return io.BytesIO()
 
 # Create Flask app
 app = Flask(__name__)
+app.request_class = InMemoryUploadRequest
 
 # Configure upload folder
 UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'uploads')
@@ -36,36 +39,129 @@ os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max upload size
 
-# Initialize services
-image_analyzer = ImageAnalyzer()
-text_processor = TextProcessor()
-intent_classifier = IntentClassifier()
-entity_extractor = EntityExtractor()
-command_parser = CommandParser(intent_classifier, entity_extractor)
-response_generator = ResponseGenerator()
-
-# Initialize design engine services
-material_database = MaterialDatabase()
-industry_standards = IndustryStandards()
-sustainability_analyzer = SustainabilityAnalyzer()
-trend_analyzer = TrendAnalyzer()
-compliance_checker = ComplianceChecker()
-
-# Initialize design manager with all services
-design_manager = DesignManager(
-    material_service=material_database,
-    standards_service=industry_standards,
-    sustainability_service=sustainability_analyzer,
-    trend_service=trend_analyzer,
-    compliance_service=compliance_checker,
-    database_path=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'design_database.json')
+# Background image analysis workers
+app.config['ANALYSIS_WORKERS'] = int(os.environ.get('PRODUCTPRO_ANALYSIS_WORKERS', 2))
+app.config['ANALYSIS_QUEUE_SIZE'] = int(os.environ.get('PRODUCTPRO_ANALYSIS_QUEUE_SIZE', 32))
+
+# Seconds an artifact request waits for an upload another worker is still writing
+app.config['ARTIFACT_SOURCE_WAIT'] = float(os.environ.get('PRODUCTPRO_ARTIFACT_SOURCE_WAIT', 5))
+
+# Batch analysis worker processes per server worker; every server worker has its own
+# pool, so by default the cores are divided among the PRODUCTPRO_WORKERS server workers
+app.config['SERVER_WORKERS'] = max(1, int(os.environ.get('PRODUCTPRO_WORKERS', 1)))
+app.config['BATCH_WORKERS'] = (
+    int(os.environ.get('PRODUCTPRO_BATCH_WORKERS', 0))
+    or max(1, (os.cpu_count() or 1) // app.config['SERVER_WORKERS'])
 )
 
-# Create data directory if it doesn't exist
-os.makedirs(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data'), exist_ok=True)
+# Parsed command cache (0 disables it; set a path to keep it across restarts)
+app.config['PARSE_CACHE_SIZE'] = int(os.environ.get('PRODUCTPRO_PARSE_CACHE_SIZE', 1024))
+app.config['PARSE_CACHE_PATH'] = os.environ.get('PRODUCTPRO_PARSE_CACHE_PATH') or None
+
+# Project list pagination
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Register services; each subsystem is imported and constructed on first use
+service_registry = ServiceRegistry()
+
+def create_design_manager():
+    """Build the design manager and fold any journaled changes into a fresh database snapshot"""
+    # Create data directory if it doesn't exist
+    os.makedirs(DATA_DIR, exist_ok=True)
+    
+    manager = service_registry.load('services.design_engine.design_manager', 'DesignManager')(
+        material_service=service_registry.get('material_database'),
+        standards_service=service_registry.get('industry_standards'),
+        sustainability_service=service_registry.get('sustainability_analyzer'),
+        trend_service=service_registry.get('trend_analyzer'),
+        compliance_service=service_registry.get('compliance_checker'),
+        database_path=os.path.join(DATA_DIR, DATABASE_FILENAME),
+        storage_backend=STORAGE_BACKEND,
+        shared_store=SHARED_STORE
+    )
+    manager.save_database()
+    return manager
+
+def warm_up_image_analyzer(analyzer):
+    """Load the feature extractor and start building the similarity index if the store needs one"""
+    analyzer.model_generator.load_feature_extractor()
+    analyzer.embedding_index.prepare()
+
+service_registry.register(
+    'image_analyzer',
+    lambda: service_registry.load('services.image_recognition.image_analyzer', 'ImageAnalyzer')(),
+    warmup=warm_up_image_analyzer
+)
+service_registry.register('batch_analyzer', lambda: service_registry.load('services.image_recognition.batch_analyzer', 'BatchAnalyzer')(
+    max_workers=app.config['BATCH_WORKERS']
+))
+service_registry.register('text_processor', lambda: service_registry.load('services.nlp.text_processor', 'TextProcessor')())
+service_registry.register('intent_classifier', lambda: service_registry.load('services.nlp.intent_classifier', 'IntentClassifier')(
+    service_registry.get('text_processor')
+))
+service_registry.register('entity_extractor', lambda: service_registry.load('services.nlp.entity_extractor', 'EntityExtractor')(
+    service_registry.get('text_processor')
+))
+service_registry.register('parse_cache', lambda: service_registry.load('services.nlp.parse_cache', 'ParseCache')(
+    max_entries=app.config['PARSE_CACHE_SIZE'],
+    persist_path=app.config['PARSE_CACHE_PATH']
+))
+service_registry.register('command_parser', lambda: service_registry.load('services.nlp.command_parser', 'CommandParser')(
+    service_registry.get('intent_classifier'), service_registry.get('entity_extractor'),
+    parse_cache=service_registry.get('parse_cache') if app.config['PARSE_CACHE_SIZE'] > 0 else None
+))
+service_registry.register('response_generator', lambda: service_registry.load('services.nlp.response_generator', 'ResponseGenerator')(
+    service_registry.get('command_parser')
+))
+
+# Design engine services
+service_registry.register('material_database', lambda: service_registry.load('services.design_engine.material_database', 'MaterialDatabase')())
+service_registry.register('industry_standards', lambda: service_registry.load('services.design_engine.industry_standards', 'IndustryStandards')())
+service_registry.register('sustainability_analyzer', lambda: service_registry.load('services.design_engine.sustainability_analyzer', 'SustainabilityAnalyzer')())
+service_registry.register('trend_analyzer', lambda: service_registry.load('services.design_engine.trend_analyzer', 'TrendAnalyzer')())
+service_registry.register('compliance_checker', lambda: service_registry.load('services.design_engine.compliance_checker', 'ComplianceChecker')())
+service_registry.register('design_manager', create_design_manager)
+
+# Select the project storage backend ('json' or 'sqlite'); shared store mode lets
+# several gunicorn workers use one SQLite database with optimistic concurrency
+SHARED_STORE = os.environ.get('PRODUCTPRO_SHARED_STORE', '0') == '1'
+STORAGE_BACKEND = os.environ.get('PRODUCTPRO_STORAGE_BACKEND', 'sqlite' if SHARED_STORE else 'json')
+DATABASE_FILENAME = 'design_database.sqlite3' if STORAGE_BACKEND == 'sqlite' else 'design_database.json'
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+# Module-level names used by the routes; the service is built on first attribute access
+image_analyzer = service_registry.proxy('image_analyzer')
+batch_analyzer = service_registry.proxy('batch_analyzer')
+text_processor = service_registry.proxy('text_processor')
+intent_classifier = service_registry.proxy('intent_classifier')
+entity_extractor = service_registry.proxy('entity_extractor')
+command_parser = service_registry.proxy('command_parser')
+response_generator = service_registry.proxy('response_generator')
+material_database = service_registry.proxy('material_database')
+industry_standards = service_registry.proxy('industry_standards')
+sustainability_analyzer = service_registry.proxy('sustainability_analyzer')
+trend_analyzer = service_registry.proxy('trend_analyzer')
+compliance_checker = service_registry.proxy('compliance_checker')
+design_manager = service_registry.proxy('design_manager')
+
+# Job records are kept in memory unless the workers share a store; in-memory
+# jobs can only be polled through the worker that queued them
+analysis_jobs = AnalysisJobQueue(
+    max_workers=app.config['ANALYSIS_WORKERS'],
+    max_pending=app.config['ANALYSIS_QUEUE_SIZE'],
+    job_store=SqliteJobStore(os.path.join(DATA_DIR, 'design_database.sqlite3')) if SHARED_STORE else None
+)
+
+# Uploads are analyzed from memory while the originals are written in the background
+upload_ingestor = UploadIngestor(app.config['UPLOAD_FOLDER'])
+
+# Optionally build every service (and load model weights) before serving requests
+if os.environ.get('PRODUCTPRO_EAGER_SERVICES', '0') == '1':
+    service_registry.warmup()
 
-# Ensure design database is saved
-design_manager.save_database()
+APP_STARTUP_SECONDS = time.perf_counter() - APP_START_TIME
+logger.info(f"API module loaded in {APP_STARTUP_SECONDS:.3f}s")
 
 # API Routes
 @app.route('/api/health', methods=['GET'])
@@ -80,6 +176,46 @@ def health_check():
         }
     })
 
+@app.route('/api/warmup', methods=['POST'])
+def warmup():
+    """Load all services and model weights ahead of the first real request"""
+    try:
+        timings = service_registry.warmup()
+        return jsonify({
+            'success': True,
+            'timings': timings
+        })
+    
+    except Exception as e:
+        logger.error(f"Error warming up services: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/startup-report', methods=['GET'])
+def startup_report():
+    """Get import, construction and warmup timings of the services loaded so far"""
+    return jsonify({
+        'success': True,
+        'app_startup_seconds': APP_STARTUP_SECONDS,
+        'timings': service_registry.get_timings()
+    })
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Get runtime metrics of the analysis and command pipelines without loading any services"""
+    metrics = {
+        'analysis_jobs': analysis_jobs.get_stats(),
+        'upload_ingest': upload_ingestor.get_stats()
+    }
+    if service_registry.is_loaded('image_analyzer'):
+        metrics['feature_extraction'] = image_analyzer.model_generator.get_feature_metrics()
+    if service_registry.is_loaded('parse_cache'):
+        metrics['parse_cache'] = service_registry.get('parse_cache').get_stats()
+    
+    return jsonify({
+        'success': True,
+        'metrics': metrics
+    })
+
 @app.route('/api/process-command', methods=['POST'])
 def process_command():
     """Process a text command"""
@@ -91,11 +227,8 @@ def process_command():
         command_text = data.get('command')
         project_id = data.get('project_id')
         
-        # Process command text
-        processed_text = text_processor.process_text(command_text)
-        
-        # Parse command
-        command_data = command_parser.parse_command(processed_text)
+        # Parse command; repeated commands are served from the parse cache without running the NLP stages
+        command_data = command_parser.parse_command(command_text)
         
         # Process design command if project_id is provided
         if project_id:
@@ -124,9 +257,34 @@ def process_command():
         logger.error(f"Error processing command: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+def artifact_urls(analysis_id, artifacts=None):
+    """Get the URLs of the visualization artifacts of an analysis"""
+    if artifacts is None:
+        artifacts = image_analyzer.ARTIFACTS
+    return {
+        artifact: f"/api/analyses/{analysis_id}/artifacts/{artifact}"
+        for artifact in artifacts
+    }
+
+def run_image_analysis(file_path, project_id=None, analysis_id=None, tier='standard', time_budget=None, image_data=None):
+    """Analyze an uploaded image once and attach the results to its project"""
+    analysis_results = image_analyzer.analyze_image(
+        file_path, analysis_id=analysis_id, tier=tier, time_budget=time_budget, image_data=image_data
+    )
+    if 'error' in analysis_results:
+        raise RuntimeError(analysis_results['error'])
+    analysis_results['artifact_urls'] = artifact_urls(analysis_results['analysis_id'], analysis_results['artifacts'])
+    
+    # If project_id is provided, update the project with the image analysis
+    if project_id:
+        design_manager.attach_image_analysis(project_id, file_path, analysis_results)
+        image_analyzer.link_project(analysis_results['analysis_id'], project_id)
+    
+    return analysis_results
+
 @app.route('/api/upload-image', methods=['POST'])
 def upload_image():
-    """Upload and analyze an image"""
+    """Upload an image and queue it for analysis"""
     try:
         # Check if the post request has the file part
         if 'image' not in request.files:
@@ -142,40 +300,249 @@ def upload_image():
         # Get project ID if provided
         project_id = request.form.get('project_id')
         
+        # Analysis tier and optional time budget
+        tier = request.form.get('tier', 'standard')
+        if tier not in image_analyzer.TIERS:
+            return jsonify({'error': f"Unknown analysis tier: {tier}"}), 400
+        try:
+            time_budget_ms = float(request.form['time_budget_ms']) if request.form.get('time_budget_ms') else None
+        except ValueError:
+            return jsonify({'error': 'time_budget_ms must be a number'}), 400
+        time_budget = time_budget_ms / 1000 if time_budget_ms else None
+        
         if file:
             # Generate unique filename
             filename = secure_filename(file.filename)
             unique_filename = f"{uuid.uuid4()}_{filename}"
             file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
             
-            # Save the file
-            file.save(file_path)
+            # Hash the upload from memory and store the original in the background
+            image_data = upload_ingestor.read_upload(file)
+            analysis_id = upload_ingestor.ingest(image_data, file_path)
+            
+            # Visualizations are rendered on demand from the registered image
+            image_analyzer.register_image(file_path, analysis_id=analysis_id)
+            
+            # Images analyzed before are answered straight from the analysis cache
+            cached_results = image_analyzer.get_cached_analysis(file_path, analysis_id=analysis_id, tier=tier)
+            if cached_results is not None:
+                cached_results['artifact_urls'] = artifact_urls(analysis_id, cached_results['artifacts'])
+                if project_id and tier != 'preview':
+                    design_manager.attach_image_analysis(project_id, file_path, cached_results)
+                    image_analyzer.link_project(analysis_id, project_id)
+                
+                return jsonify({
+                    'success': True,
+                    'file_path': file_path,
+                    'analysis_id': analysis_id,
+                    'artifact_urls': cached_results['artifact_urls'],
+                    'status': 'completed',
+                    'analysis': cached_results
+                })
             
-            # Analyze the image
-            analysis_results = image_analyzer.analyze_image(file_path)
+            # Previews are fast enough to answer in the request; they are not attached to projects
+            if tier == 'preview':
+                preview_results = image_analyzer.analyze_image(
+                    file_path, analysis_id=analysis_id, tier=tier, time_budget=time_budget, image_data=image_data
+                )
+                if 'error' in preview_results:
+                    return jsonify({'error': preview_results['error']}), 500
+                preview_results['artifact_urls'] = artifact_urls(analysis_id, preview_results['artifacts'])
+                
+                return jsonify({
+                    'success': True,
+                    'file_path': file_path,
+                    'analysis_id': analysis_id,
+                    'artifact_urls': preview_results['artifact_urls'],
+                    'status': 'completed',
+                    'analysis': preview_results
+                })
             
-            # If project_id is provided, update the project with the image analysis
-            if project_id:
-                design_manager.analyze_reference_image(project_id, file_path)
+            # Queue the analysis instead of running it in the request
+            job_id = analysis_jobs.submit(
+                lambda: run_image_analysis(file_path, project_id, analysis_id, tier, time_budget, image_data),
+                metadata={'file_path': file_path, 'project_id': project_id, 'tier': tier}
+            )
+            if not job_id:
+                return jsonify({'error': 'Image analysis queue is full, please retry later'}), 503
             
             return jsonify({
                 'success': True,
                 'file_path': file_path,
-                'analysis': analysis_results
-            })
+                'analysis_id': analysis_id,
+                'artifact_urls': artifact_urls(analysis_id),
+                'job_id': job_id,
+                'status': 'queued',
+                'status_url': f"/api/jobs/{job_id}"
+            }), 202
     
     except Exception as e:
         logger.error(f"Error uploading image: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/analyze-batch', methods=['POST'])
+def analyze_batch():
+    """Analyze uploaded images and archives on the process pool, streaming NDJSON results as they finish"""
+    try:
+        files = [file for file in request.files.getlist('images') if file.filename]
+        if not files:
+            return jsonify({'error': 'No images provided'}), 400
+        
+        project_id = request.form.get('project_id')
+        generate_visualizations = request.form.get('visualizations', 'true').lower() != 'false'
+        
+        # Keep the batch together so archives can be extracted next to the images
+        batch_id = str(uuid.uuid4())
+        batch_dir = os.path.join(app.config['UPLOAD_FOLDER'], f"batch_{batch_id}")
+        os.makedirs(batch_dir, exist_ok=True)
+        
+        sources = []
+        for index, file in enumerate(files):
+            file_path = os.path.join(batch_dir, f"{index}_{secure_filename(file.filename)}")
+            file.save(file_path)
+            sources.append(file_path)
+        
+        image_paths = service_registry.load('services.image_recognition.batch_analyzer', 'collect_images')(sources, batch_dir)
+        if not image_paths:
+            return jsonify({'error': 'No images found in the upload'}), 400
+    
+    except Exception as e:
+        logger.error(f"Error preparing batch analysis: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+    
+    def generate():
+        yield json.dumps({'batch_id': batch_id, 'status': 'started', 'total': len(image_paths)}) + '\n'
+        failed = 0
+        for result in batch_analyzer.analyze(image_paths, generate_visualizations=generate_visualizations):
+            if result['status'] == 'completed':
+                analysis_results = result['analysis']
+                analysis_results['artifact_urls'] = artifact_urls(analysis_results['analysis_id'], analysis_results['artifacts'])
+                if project_id:
+                    try:
+                        design_manager.attach_image_analysis(project_id, result['image_path'], analysis_results)
+                        image_analyzer.link_project(analysis_results['analysis_id'], project_id)
+                    except Exception as e:
+                        logger.error(f"Error attaching batch result to project: {str(e)}")
+            else:
+                failed += 1
+            yield json.dumps(result, default=str) + '\n'
+        yield json.dumps({'batch_id': batch_id, 'status': 'completed', 'total': len(image_paths), 'failed': failed}) + '\n'
+    
+    return Response(generate(), mimetype='application/x-ndjson')
+
+@app.route('/api/analyses/<analysis_id>/similar', methods=['GET'])
+def get_similar_images(analysis_id):
+    """Find previously analyzed reference images that look similar, with their projects"""
+    try:
+        try:
+            limit = int(request.args.get('limit', 10))
+        except ValueError:
+            return jsonify({'error': 'Invalid limit'}), 400
+        limit = max(1, min(limit, 100))
+        
+        similar_images = image_analyzer.find_similar_images(analysis_id, limit=limit)
+        if similar_images is None:
+            return jsonify({'error': 'Analysis not found'}), 404
+        
+        for similar_image in similar_images:
+            projects = []
+            for project_id in similar_image['project_ids']:
+                project = design_manager.get_design_project(project_id)
+                if project:
+                    projects.append({'id': project_id, 'name': project.get('name')})
+            similar_image['projects'] = projects
+        
+        return jsonify({
+            'success': True,
+            'analysis_id': analysis_id,
+            'similar_images': similar_images
+        })
+    
+    except Exception as e:
+        logger.error(f"Error finding similar images: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/analyses/<analysis_id>/artifacts/<artifact>', methods=['GET'])
+def get_analysis_artifact(analysis_id, artifact):
+    """Get a visualization of an image analysis, rendering it on first request"""
+    try:
+        try:
+            artifact_path = image_analyzer.render_artifact(analysis_id, artifact)
+            
+            # The uploaded original may still be being written
+            if not artifact_path and upload_ingestor.get_stats()['pending'] and upload_ingestor.wait(timeout=10):
+                artifact_path = image_analyzer.render_artifact(analysis_id, artifact)
+            
+            # Another worker may be writing it, so poll the file system for a short while
+            deadline = time.time() + app.config['ARTIFACT_SOURCE_WAIT']
+            while not artifact_path and image_analyzer.artifact_source_pending(analysis_id) and time.time() < deadline:
+                time.sleep(0.1)
+                artifact_path = image_analyzer.render_artifact(analysis_id, artifact)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if artifact_path:
+            return send_file(os.path.abspath(artifact_path), mimetype='image/png')
+        elif image_analyzer.artifact_source_pending(analysis_id):
+            response = jsonify({'error': 'The uploaded image is still being stored, please retry'})
+            response.headers['Retry-After'] = '1'
+            return response, 503
+        else:
+            return jsonify({'error': 'Artifact not found'}), 404
+    
+    except Exception as e:
+        logger.error(f"Error getting analysis artifact: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get the status and result of an image analysis job"""
+    try:
+        job = analysis_jobs.get_job(job_id)
+        if job:
+            return jsonify({
+                'success': True,
+                'job': job
+            })
+        else:
+            return jsonify({'error': 'Job not found'}), 404
+    
+    except Exception as e:
+        logger.error(f"Error getting job: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/projects', methods=['GET'])
 def get_projects():
-    """Get all design projects"""
+    """Get a page of design project summaries"""
     try:
-        projects = design_manager.design_projects
+        try:
+            limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+        except ValueError:
+            return jsonify({'error': 'Invalid limit'}), 400
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        
+        fields = request.args.get('fields')
+        if fields:
+            fields = [field.strip() for field in fields.split(',') if field.strip()]
+        
+        try:
+            page = design_manager.list_design_projects(
+                industry=request.args.get('industry'),
+                status=request.args.get('status'),
+                updated_since=request.args.get('updated_since'),
+                sort=request.args.get('sort', 'updated_at'),
+                descending=request.args.get('order', 'desc') != 'asc',
+                limit=limit,
+                cursor=request.args.get('cursor'),
+                fields=fields
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         return jsonify({
             'success': True,
-            'projects': projects
+            'projects': page['projects'],
+            'next_cursor': page['next_cursor']
         })
     
     except Exception as e:
@@ -205,8 +572,8 @@ def create_project():
         )
         
         if project_id:
-            # Save database
-            design_manager.save_database()
+            # Persist changes
+            design_manager.commit_changes()
             
             return jsonify({
                 'success': True,
@@ -245,11 +612,27 @@ def update_project(project_id):
         if not data:
             return jsonify({'error': 'Missing update data'}), 400
         
-        success = design_manager.update_design_project(project_id, data)
+        # Optimistic concurrency: clients pass the version they edited, in the body or If-Match
+        expected_version = data.pop('version', None)
+        if expected_version is None and request.headers.get('If-Match'):
+            expected_version = request.headers.get('If-Match').strip('"')
+        if expected_version is not None:
+            try:
+                expected_version = int(expected_version)
+            except (TypeError, ValueError):
+                return jsonify({'error': 'Invalid project version'}), 400
+        
+        try:
+            success = design_manager.update_design_project(project_id, data, expected_version=expected_version)
+        except ProjectVersionConflict as e:
+            return jsonify({
+                'error': str(e),
+                'current_version': e.current_version
+            }), 409
         
         if success:
-            # Save database
-            design_manager.save_database()
+            # Persist changes
+            design_manager.commit_changes()
             
             return jsonify({
                 'success': True,
@@ -262,6 +645,39 @@ def update_project(project_id):
         logger.error(f"Error updating project: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/projects/<project_id>/versions', methods=['GET'])
+def get_project_versions(project_id):
+    """Get the version list of a design project"""
+    try:
+        if not design_manager.get_design_project(project_id):
+            return jsonify({'error': 'Project not found'}), 404
+        
+        return jsonify({
+            'success': True,
+            'versions': design_manager.get_project_versions(project_id)
+        })
+    
+    except Exception as e:
+        logger.error(f"Error getting project versions: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/projects/<project_id>/versions/<int:version>', methods=['GET'])
+def get_project_version(project_id, version):
+    """Get a past version of a design project"""
+    try:
+        project = design_manager.get_project_version(project_id, version)
+        if project:
+            return jsonify({
+                'success': True,
+                'project': project
+            })
+        else:
+            return jsonify({'error': 'Project version not found'}), 404
+    
+    except Exception as e:
+        logger.error(f"Error getting project version: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/projects/<project_id>', methods=['DELETE'])
 def delete_project(project_id):
     """Delete a design project"""
@@ -269,8 +685,8 @@ def delete_project(project_id):
         success = design_manager.delete_design_project(project_id)
         
         if success:
-            # Save database
-            design_manager.save_database()
+            # Persist changes
+            design_manager.commit_changes()
             
             return jsonify({
                 'success': True,
@@ -290,8 +706,8 @@ def analyze_project(project_id):
         analysis_results = design_manager.analyze_design(project_id)
         
         if 'error' not in analysis_results:
-            # Save database
-            design_manager.save_database()
+            # Persist changes
+            design_manager.commit_changes()
             
             return jsonify({
                 'success': True,
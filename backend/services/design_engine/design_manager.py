@@ -1,8 +1,12 @@
 import logging
 import json
 import os
+import copy
+from contextlib import contextmanager
 from datetime import datetime
 import uuid
+from .project_store import create_project_store, ProjectVersionConflict
+from .project_history import ProjectHistory
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -17,7 +21,8 @@ class DesignManager:
     
     def __init__(self, material_service=None, standards_service=None, 
                  sustainability_service=None, trend_service=None, 
-                 compliance_service=None, database_path=None):
+                 compliance_service=None, database_path=None, use_journal=True,
+                 storage_backend='json', shared_store=False, history_checkpoint_interval=10):
         """
         Initialize the DesignManager.
         
@@ -28,6 +33,13 @@ class DesignManager:
             trend_service: Reference to the TrendAnalyzer service
             compliance_service: Reference to the ComplianceChecker service
             database_path (str, optional): Path to the design manager database file
+            use_journal (bool): Record project mutations in an append-only journal next
+                to the database file instead of rewriting the whole file on every change
+            storage_backend (str): Project storage backend ('json' or 'sqlite')
+            shared_store (bool): Share the project store with other worker processes
+                (requires the 'sqlite' backend)
+            history_checkpoint_interval (int): Number of delta-encoded history entries
+                between full checkpoints of a project
         """
         logger.info("Initializing DesignManager")
         self.material_service = material_service
@@ -38,20 +50,20 @@ class DesignManager:
         self.database_path = database_path
         self.design_templates = {}
         self.industry_configs = {}
-        self.design_projects = {}
+        self.project_history = ProjectHistory(checkpoint_interval=history_checkpoint_interval)
+        self.design_projects = create_project_store(storage_backend, database_path, use_journal=use_journal,
+                                                    shared=shared_store)
         self._load_design_data()
     
     def _load_design_data(self):
         """
-        Load design data from database file or initialize with default data.
+        Load design data from the project store or initialize with default data.
         """
         try:
-            if self.database_path and os.path.exists(self.database_path):
-                with open(self.database_path, 'r') as f:
-                    data = json.load(f)
-                    self.design_templates = data.get('design_templates', {})
-                    self.industry_configs = data.get('industry_configs', {})
-                    self.design_projects = data.get('design_projects', {})
+            data = self.design_projects.load()
+            if data:
+                self.design_templates = data.get('design_templates', {})
+                self.industry_configs = data.get('industry_configs', {})
                 logger.info(f"Loaded design data from database")
             else:
                 logger.info("Initializing default design database")
@@ -59,6 +71,29 @@ class DesignManager:
         except Exception as e:
             logger.error(f"Error loading design data: {str(e)}")
             self._initialize_default_data()
+        
+        self.design_projects.set_metadata(self.design_templates, self.industry_configs)
+    
+    def compact_database(self):
+        """
+        Compact the project store (folds the JSON journal into a snapshot).
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        return self.design_projects.compact()
+    
+    def commit_changes(self):
+        """
+        Persist pending project changes.
+        
+        Journaled and SQLite stores persist every mutation as it happens, so
+        this only saves the full database when neither is in use.
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        return self.design_projects.commit()
     
     def _initialize_default_data(self):
         """
@@ -954,9 +989,6 @@ class DesignManager:
             }
         }
         
-        # Initialize empty design projects
-        self.design_projects = {}
-        
         logger.info("Initialized default design database")
     
     def save_database(self, output_path=None):
@@ -969,30 +1001,7 @@ class DesignManager:
         Returns:
             bool: True if successful, False otherwise
         """
-        try:
-            path = output_path or self.database_path
-            if not path:
-                logger.warning("No output path specified for saving database")
-                return False
-            
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(path), exist_ok=True)
-            
-            # Save database to file
-            with open(path, 'w') as f:
-                json.dump({
-                    'design_templates': self.design_templates,
-                    'industry_configs': self.industry_configs,
-                    'design_projects': self.design_projects,
-                    'last_updated': datetime.now().isoformat()
-                }, f, indent=2)
-            
-            logger.info(f"Saved design database to {path}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error saving design database: {str(e)}")
-            return False
+        return self.design_projects.save(output_path)
     
     def get_industry_templates(self, industry):
         """
@@ -1044,6 +1053,102 @@ class DesignManager:
         """
         return self.design_projects.get(project_id, {})
     
+    def _record_current_version(self, project):
+        """
+        Add the current version of a project to its history if it is missing.
+        
+        Every save records the version it creates, so this only applies to
+        projects whose history was recorded before the save path did so; it
+        is called on the copy being changed, before the next version is recorded.
+        
+        Args:
+            project (dict): Design project, modified in place
+        """
+        history = project.setdefault('version_history', [])
+        if not history or history[-1].get('version', 0) != project.get('version', 0):
+            self.project_history.record(history, project, version_date=project.get('updated_at'))
+    
+    def _save_project(self, project_id, project, operation='update'):
+        """
+        Record the next version of a project in its history and persist it.
+        
+        Every project mutation is saved through here, so the history holds
+        each version the project has had, ending with the current one.
+        
+        Args:
+            project_id (str): Project identifier
+            project (dict): Modified project data
+            operation (str): Mutation type ('create', 'update', 'analysis')
+            
+        Raises:
+            ProjectVersionConflict: If the stored project changed since it was read
+        """
+        history = project.setdefault('version_history', [])
+        # The store increments the version when saving
+        self.project_history.record(
+            history,
+            dict(project, version=project.get('version', 0) + 1),
+            version_date=project.get('updated_at')
+        )
+        try:
+            self.design_projects.save_project(project_id, project, operation=operation)
+        except Exception:
+            history.pop()
+            raise
+    
+    @contextmanager
+    def _editing_project(self, project_id):
+        """
+        Hold the store lock and provide a private copy of a project to change and save.
+        
+        Stored projects are shared with readers and with background compaction,
+        so they are replaced by saving a changed copy rather than modified in
+        place; the lock keeps read-modify-save of the same project atomic.
+        
+        Args:
+            project_id (str): Project identifier
+            
+        Yields:
+            dict: Copy of the project, or an empty dict if not found
+        """
+        with self.design_projects.lock:
+            project = copy.deepcopy(self.design_projects.get(project_id) or {})
+            if project:
+                self._record_current_version(project)
+            yield project
+    
+    def list_design_projects(self, industry=None, status=None, updated_since=None, sort='updated_at',
+                             descending=True, limit=50, cursor=None, fields=None):
+        """
+        List one page of design project summaries.
+        
+        Args:
+            industry (str, optional): Only include projects of this industry
+            status (str, optional): Only include projects with this status
+            updated_since (str, optional): Only include projects updated at or after this ISO timestamp
+            sort (str): Sort field ('updated_at', 'created_at' or 'name')
+            descending (bool): Sort in descending order
+            limit (int): Maximum number of projects to return
+            cursor (str, optional): Cursor returned with the previous page
+            fields (list, optional): Project fields to return (defaults to summary fields)
+            
+        Returns:
+            dict: 'projects' list and 'next_cursor' (None on the last page)
+            
+        Raises:
+            ValueError: If the sort field or cursor is invalid
+        """
+        return self.design_projects.list_projects(
+            industry=industry,
+            status=status,
+            updated_since=updated_since,
+            sort=sort,
+            descending=descending,
+            limit=limit,
+            cursor=cursor,
+            fields=fields
+        )
+    
     def create_design_project(self, name, industry, template_id=None, reference_image=None, description=None):
         """
         Create a new design project.
@@ -1114,7 +1219,7 @@ class DesignManager:
                 project['manufacturing_processes'] = template.get('manufacturing_processes', [])
             
             # Save project
-            self.design_projects[project_id] = project
+            self._save_project(project_id, project, operation='create')
             logger.info(f"Created design project: {project_id}")
             
             return project_id
@@ -1123,44 +1228,99 @@ class DesignManager:
             logger.error(f"Error creating design project: {str(e)}")
             return None
     
-    def update_design_project(self, project_id, updates):
+    def update_design_project(self, project_id, updates, expected_version=None):
         """
         Update a design project.
         
         Args:
             project_id (str): Project identifier
             updates (dict): Project updates
+            expected_version (int, optional): Project version the updates are based on
             
         Returns:
             bool: True if successful, False otherwise
+            
+        Raises:
+            ProjectVersionConflict: If the project changed since expected_version
+                or was modified concurrently by another worker
         """
         try:
-            # Get project
-            project = self.get_design_project(project_id)
-            if not project:
-                logger.error(f"Project not found: {project_id}")
-                return False
-            
-            # Save current version to history
-            current_version = project.copy()
-            current_version['version_date'] = project.get('updated_at')
-            project.setdefault('version_history', []).append(current_version)
-            
-            # Update project
-            for key, value in updates.items():
-                if key not in ['id', 'created_at', 'version_history']:
-                    project[key] = value
-            
-            # Update timestamp
-            project['updated_at'] = datetime.now().isoformat()
+            # Change a private copy of the project under the store lock
+            with self._editing_project(project_id) as project:
+                if not project:
+                    logger.error(f"Project not found: {project_id}")
+                    return False
+                
+                # Reject updates based on a stale version
+                current_version_number = project.get('version', 0)
+                if expected_version is not None and expected_version != current_version_number:
+                    raise ProjectVersionConflict(project_id, expected_version, current_version_number)
+                
+                # Update project
+                for key, value in updates.items():
+                    if key not in ['id', 'created_at', 'version', 'version_history']:
+                        project[key] = value
+                
+                # Update timestamp
+                project['updated_at'] = datetime.now().isoformat()
+                self._save_project(project_id, project)
             
             logger.info(f"Updated design project: {project_id}")
             return True
             
+        except ProjectVersionConflict:
+            raise
         except Exception as e:
             logger.error(f"Error updating design project: {str(e)}")
             return False
     
+    def get_project_versions(self, project_id):
+        """
+        List the versions of a design project.
+        
+        Args:
+            project_id (str): Project identifier
+            
+        Returns:
+            list: Version numbers and dates, oldest first, ending with the current version
+        """
+        project = self.get_design_project(project_id)
+        if not project:
+            return []
+        
+        versions = self.project_history.list_versions(project.get('version_history', []))
+        # Histories recorded before the save path recorded every version lack the current one
+        if not versions or versions[-1]['version'] != project.get('version', 0):
+            versions.append({'version': project.get('version', 0), 'version_date': project.get('updated_at')})
+        return versions
+    
+    def get_project_version(self, project_id, version):
+        """
+        Materialize a past version of a design project.
+        
+        Args:
+            project_id (str): Project identifier
+            version (int): Project version number
+            
+        Returns:
+            dict: Project state at that version, or an empty dict if not found
+        """
+        try:
+            project = self.get_design_project(project_id)
+            if not project:
+                logger.error(f"Project not found: {project_id}")
+                return {}
+            
+            if version == project.get('version', 0):
+                return {key: value for key, value in project.items() if key != 'version_history'}
+            
+            state = self.project_history.find_version(project.get('version_history', []), version)
+            return state or {}
+            
+        except Exception as e:
+            logger.error(f"Error materializing project version: {str(e)}")
+            return {}
+    
     def delete_design_project(self, project_id):
         """
         Delete a design project.
@@ -1178,7 +1338,7 @@ class DesignManager:
                 return False
             
             # Delete project
-            del self.design_projects[project_id]
+            self.design_projects.delete_project(project_id)
             logger.info(f"Deleted design project: {project_id}")
             
             return True
@@ -1215,9 +1375,7 @@ class DesignManager:
                 analysis_results = self.image_recognition_service.analyze_image(image_path)
                 
                 # Update project with reference image and analysis results
-                project['reference_image'] = image_path
-                project['image_analysis'] = analysis_results
-                project['updated_at'] = datetime.now().isoformat()
+                self.attach_image_analysis(project_id, image_path, analysis_results)
                 
                 logger.info(f"Analyzed reference image for project: {project_id}")
                 return analysis_results
@@ -1229,6 +1387,38 @@ class DesignManager:
             logger.error(f"Error analyzing reference image: {str(e)}")
             return {'error': str(e)}
     
+    def attach_image_analysis(self, project_id, image_path, analysis_results):
+        """
+        Attach the results of an already completed reference image analysis to a project.
+        
+        Args:
+            project_id (str): Project identifier
+            image_path (str): Path to reference image
+            analysis_results (dict): Image analysis results
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            # Change a private copy of the project under the store lock
+            with self._editing_project(project_id) as project:
+                if not project:
+                    logger.error(f"Project not found: {project_id}")
+                    return False
+                
+                # Update project with reference image and analysis results
+                project['reference_image'] = image_path
+                project['image_analysis'] = analysis_results
+                project['updated_at'] = datetime.now().isoformat()
+                self._save_project(project_id, project)
+            
+            logger.info(f"Attached reference image analysis to project: {project_id}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error attaching image analysis: {str(e)}")
+            return False
+    
     def select_material(self, project_id, component_name, material_id):
         """
         Select a material for a component in a design project.
@@ -1242,39 +1432,40 @@ class DesignManager:
             bool: True if successful, False otherwise
         """
         try:
-            # Get project
-            project = self.get_design_project(project_id)
-            if not project:
-                logger.error(f"Project not found: {project_id}")
-                return False
-            
-            # Find component
-            component = None
-            for comp in project.get('components', []):
-                if comp.get('name') == component_name:
-                    component = comp
-                    break
-            
-            if not component:
-                logger.error(f"Component not found: {component_name}")
-                return False
-            
-            # Check if material exists in database
-            if hasattr(self, 'material_service') and self.material_service:
-                material = self.material_service.get_material(material_id)
-                if not material:
-                    logger.error(f"Material not found: {material_id}")
+            # Change a private copy of the project under the store lock
+            with self._editing_project(project_id) as project:
+                if not project:
+                    logger.error(f"Project not found: {project_id}")
                     return False
-            
-            # Update component with selected material
-            component['selected_material'] = material_id
-            
-            # Add material to project materials list if not already present
-            if material_id not in project.get('materials', []):
-                project.setdefault('materials', []).append(material_id)
-            
-            # Update timestamp
-            project['updated_at'] = datetime.now().isoformat()
+                
+                # Find component
+                component = None
+                for comp in project.get('components', []):
+                    if comp.get('name') == component_name:
+                        component = comp
+                        break
+                
+                if not component:
+                    logger.error(f"Component not found: {component_name}")
+                    return False
+                
+                # Check if material exists in database
+                if hasattr(self, 'material_service') and self.material_service:
+                    material = self.material_service.get_material(material_id)
+                    if not material:
+                        logger.error(f"Material not found: {material_id}")
+                        return False
+                
+                # Update component with selected material
+                component['selected_material'] = material_id
+                
+                # Add material to project materials list if not already present
+                if material_id not in project.get('materials', []):
+                    project.setdefault('materials', []).append(material_id)
+                
+                # Update timestamp
+                project['updated_at'] = datetime.now().isoformat()
+                self._save_project(project_id, project)
             
             logger.info(f"Selected material {material_id} for component {component_name} in project {project_id}")
             return True
@@ -1296,25 +1487,26 @@ class DesignManager:
             bool: True if successful, False otherwise
         """
         try:
-            # Get project
-            project = self.get_design_project(project_id)
-            if not project:
-                logger.error(f"Project not found: {project_id}")
-                return False
-            
-            # Check if parameter exists
-            if parameter_name not in project.get('design_parameters', {}):
-                # Create parameter if it doesn't exist
-                project.setdefault('design_parameters', {})[parameter_name] = {
-                    'options': [],
-                    'selected': None
-                }
-            
-            # Update parameter value
-            project['design_parameters'][parameter_name]['selected'] = parameter_value
-            
-            # Update timestamp
-            project['updated_at'] = datetime.now().isoformat()
+            # Change a private copy of the project under the store lock
+            with self._editing_project(project_id) as project:
+                if not project:
+                    logger.error(f"Project not found: {project_id}")
+                    return False
+                
+                # Check if parameter exists
+                if parameter_name not in project.get('design_parameters', {}):
+                    # Create parameter if it doesn't exist
+                    project.setdefault('design_parameters', {})[parameter_name] = {
+                        'options': [],
+                        'selected': None
+                    }
+                
+                # Update parameter value
+                project['design_parameters'][parameter_name]['selected'] = parameter_value
+                
+                # Update timestamp
+                project['updated_at'] = datetime.now().isoformat()
+                self._save_project(project_id, project)
             
             logger.info(f"Set design parameter {parameter_name} to {parameter_value} in project {project_id}")
             return True
@@ -1364,8 +1556,13 @@ class DesignManager:
                 analysis_results['compliance'] = compliance_analysis
             
             # Update project with analysis results
-            project['analysis_results'] = analysis_results
-            project['updated_at'] = datetime.now().isoformat()
+            with self._editing_project(project_id) as project:
+                if not project:
+                    logger.error(f"Project deleted during analysis: {project_id}")
+                    return {'error': 'Project not found'}
+                project['analysis_results'] = analysis_results
+                project['updated_at'] = datetime.now().isoformat()
+                self._save_project(project_id, project, operation='analysis')
             
             logger.info(f"Analyzed design for project: {project_id}")
             return analysis_results
@@ -1437,8 +1634,13 @@ class DesignManager:
                 recommendations['categories']['compliance'] = compliance_recommendations
             
             # Update project with recommendations
-            project['design_recommendations'] = recommendations
-            project['updated_at'] = datetime.now().isoformat()
+            with self._editing_project(project_id) as project:
+                if not project:
+                    logger.error(f"Project deleted while generating recommendations: {project_id}")
+                    return {'error': 'Project not found'}
+                project['design_recommendations'] = recommendations
+                project['updated_at'] = datetime.now().isoformat()
+                self._save_project(project_id, project)
             
             logger.info(f"Generated design recommendations for project: {project_id}")
             return recommendations
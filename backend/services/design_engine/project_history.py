@@ -0,0 +1,200 @@
+import logging
+import copy
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class ProjectHistory:
+    """
+    Delta-encoded version history for design projects.
+    Each history entry stores only the changes from the previous entry,
+    with a full checkpoint every checkpoint_interval entries so any past
+    version can be rebuilt by replaying a bounded number of deltas.
+    """
+
+    EXCLUDED_KEYS = ('version_history',)
+
+    def __init__(self, checkpoint_interval=10):
+        """
+        Initialize the ProjectHistory.
+
+        Args:
+            checkpoint_interval (int): Number of history entries between full checkpoints
+        """
+        self.checkpoint_interval = max(1, checkpoint_interval)
+
+    def record(self, history, project, version_date=None):
+        """
+        Append the current state of a project to its history.
+
+        Args:
+            history (list): Project version history, modified in place
+            project (dict): Project data to record
+            version_date (str, optional): Timestamp of the recorded version
+
+        Returns:
+            dict: Appended history entry
+        """
+        state = self._strip(project)
+        entry = {
+            'version': project.get('version', 0),
+            'version_date': version_date
+        }
+
+        checkpoint_index = self._last_checkpoint_index(history)
+        if checkpoint_index is None or len(history) - checkpoint_index >= self.checkpoint_interval:
+            entry['checkpoint'] = copy.deepcopy(state)
+        else:
+            previous_state = self.materialize(history, len(history) - 1)
+            entry['changes'] = self.diff(previous_state, state)
+
+        history.append(entry)
+        return entry
+
+    def materialize(self, history, index):
+        """
+        Rebuild the project state stored at a history index.
+
+        Args:
+            history (list): Project version history
+            index (int): History entry index
+
+        Returns:
+            dict: Project state at that entry
+        """
+        if index < 0 or index >= len(history):
+            raise IndexError(f"History index out of range: {index}")
+
+        checkpoint_index = self._last_checkpoint_index(history, index)
+        if checkpoint_index is None:
+            raise ValueError("Project history has no checkpoint")
+
+        state = copy.deepcopy(self._checkpoint_state(history[checkpoint_index]))
+        for entry in history[checkpoint_index + 1:index + 1]:
+            self.apply(state, entry.get('changes', []))
+        return state
+
+    def find_version(self, history, version):
+        """
+        Rebuild the project state recorded for a version number.
+
+        Args:
+            history (list): Project version history
+            version (int): Project version number
+
+        Returns:
+            dict: Project state, or None if the version is not in the history
+        """
+        for index in range(len(history) - 1, -1, -1):
+            if history[index].get('version', 0) == version:
+                return self.materialize(history, index)
+        return None
+
+    def list_versions(self, history):
+        """
+        List the versions stored in a history.
+
+        Args:
+            history (list): Project version history
+
+        Returns:
+            list: Version numbers and dates, oldest first
+        """
+        return [
+            {'version': entry.get('version', 0), 'version_date': entry.get('version_date')}
+            for entry in history
+        ]
+
+    def diff(self, old, new):
+        """
+        Compute the changes that turn one project state into another.
+
+        Nested dictionaries are compared key by key; any other value that
+        differs is replaced as a whole.
+
+        Args:
+            old (dict): Previous state
+            new (dict): New state
+
+        Returns:
+            list: Changes as ['set', path, value] and ['unset', path] operations
+        """
+        changes = []
+        self._diff(old, new, [], changes)
+        return changes
+
+    def _diff(self, old, new, path, changes):
+        for key in old:
+            if key not in new:
+                changes.append(['unset', path + [key]])
+
+        for key, value in new.items():
+            if key not in old:
+                changes.append(['set', path + [key], copy.deepcopy(value)])
+                continue
+
+            old_value = old[key]
+            if isinstance(value, dict) and isinstance(old_value, dict):
+                self._diff(old_value, value, path + [key], changes)
+            elif value != old_value:
+                changes.append(['set', path + [key], copy.deepcopy(value)])
+
+    def apply(self, state, changes):
+        """
+        Apply changes produced by diff to a state in place.
+
+        Args:
+            state (dict): State to modify
+            changes (list): Changes to apply
+        """
+        for change in changes:
+            operation, path = change[0], change[1]
+            target = state
+            for key in path[:-1]:
+                target = target.setdefault(key, {})
+
+            if operation == 'set':
+                target[path[-1]] = copy.deepcopy(change[2])
+            elif operation == 'unset':
+                target.pop(path[-1], None)
+            else:
+                logger.warning(f"Unknown history change: {operation}")
+
+    def _strip(self, project):
+        """
+        Get the recordable part of a project.
+        """
+        return {key: value for key, value in project.items() if key not in self.EXCLUDED_KEYS}
+
+    def _checkpoint_state(self, entry):
+        """
+        Get the full state stored in a checkpoint entry.
+
+        Entries written before delta encoding are full project copies and
+        count as checkpoints.
+        """
+        if 'checkpoint' in entry:
+            return entry['checkpoint']
+        return {key: value for key, value in entry.items() if key not in self.EXCLUDED_KEYS + ('version_date',)}
+
+    def _is_checkpoint(self, entry):
+        return 'checkpoint' in entry or 'changes' not in entry
+
+    def _last_checkpoint_index(self, history, index=None):
+        """
+        Find the nearest checkpoint at or before an index.
+
+        Args:
+            history (list): Project version history
+            index (int, optional): Index to search back from (defaults to the last entry)
+
+        Returns:
+            int: Checkpoint index, or None if there is none
+        """
+        if index is None:
+            index = len(history) - 1
+        for position in range(index, -1, -1):
+            if self._is_checkpoint(history[position]):
+                return position
+        return None
@@ -0,0 +1,226 @@
+import logging
+import json
+import os
+import threading
+import time
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class ProjectJournal:
+    """
+    Append-only write-ahead journal of design project mutations.
+    Each record is a single JSON line carrying a monotonically increasing
+    sequence number, so a snapshot plus the journal tail can be replayed
+    to rebuild the project database without rewriting it on every edit.
+    """
+
+    OPERATIONS = ('create', 'update', 'delete', 'analysis')
+
+    def __init__(self, journal_path, batch_size=32, flush_interval=1.0, compact_threshold=1000):
+        """
+        Initialize the ProjectJournal.
+
+        Args:
+            journal_path (str): Path to the journal file
+            batch_size (int): Number of appended records after which the journal is fsync'd
+            flush_interval (float): Maximum seconds an appended record may wait for fsync
+            compact_threshold (int): Number of journal records that triggers compaction
+        """
+        logger.info("Initializing ProjectJournal")
+        self.journal_path = journal_path
+        self.compacting_path = journal_path + '.compacting'
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.compact_threshold = compact_threshold
+        self.last_seq = 0
+        self.record_count = 0
+        self._pending = 0
+        self._lock = threading.RLock()
+        self._compacting = False
+        self._closed = False
+        self._file = None
+
+        directory = os.path.dirname(journal_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._flusher = threading.Thread(target=self._flush_loop, name='project-journal-flush', daemon=True)
+        self._flusher.start()
+
+    def _open(self):
+        """
+        Open the active journal file for appending if it is not open yet.
+        """
+        if self._file is None:
+            self._file = open(self.journal_path, 'a', encoding='utf-8')
+        return self._file
+
+    def _flush_loop(self):
+        """
+        Background loop that fsyncs pending records at least every flush_interval seconds.
+        """
+        while not self._closed:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing project journal: {str(e)}")
+
+    def replay(self, after_seq=0):
+        """
+        Read journal records written after a snapshot.
+
+        Records from an interrupted compaction are read first, then the active
+        journal. A truncated trailing line left by a crash is skipped.
+
+        Args:
+            after_seq (int): Sequence number already covered by the snapshot
+
+        Returns:
+            list: Journal records with a sequence number greater than after_seq
+        """
+        records = []
+        for path in (self.compacting_path, self.journal_path):
+            if not os.path.exists(path):
+                continue
+
+            with open(path, 'r', encoding='utf-8') as f:
+                for line_number, line in enumerate(f, 1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        logger.warning(f"Skipping corrupt journal record at {path}:{line_number}")
+                        continue
+
+                    seq = record.get('seq', 0)
+                    self.last_seq = max(self.last_seq, seq)
+                    if path == self.journal_path:
+                        self.record_count += 1
+                    if seq > after_seq:
+                        records.append(record)
+
+        self.last_seq = max(self.last_seq, after_seq)
+        records.sort(key=lambda record: record.get('seq', 0))
+        logger.info(f"Replaying {len(records)} journal records after sequence {after_seq}")
+        return records
+
+    def append(self, operation, project_id, payload=None):
+        """
+        Append a project mutation to the journal.
+
+        The record is written to the OS immediately; fsync happens once
+        batch_size records are pending or on the next background flush.
+
+        Args:
+            operation (str): Mutation type ('create', 'update', 'delete', 'analysis')
+            project_id (str): Project identifier
+            payload (dict, optional): Mutation data
+
+        Returns:
+            int: Sequence number of the appended record
+        """
+        if operation not in self.OPERATIONS:
+            raise ValueError(f"Unsupported journal operation: {operation}")
+
+        with self._lock:
+            self.last_seq += 1
+            record = {
+                'seq': self.last_seq,
+                'op': operation,
+                'project_id': project_id,
+                'data': payload
+            }
+            journal_file = self._open()
+            journal_file.write(json.dumps(record, separators=(',', ':')) + '\n')
+            journal_file.flush()
+            self.record_count += 1
+            self._pending += 1
+
+            if self._pending >= self.batch_size:
+                self._sync()
+
+            return self.last_seq
+
+    def _sync(self):
+        """
+        Fsync the active journal file. Caller must hold the lock.
+        """
+        if self._file is not None and self._pending:
+            os.fsync(self._file.fileno())
+            self._pending = 0
+
+    def flush(self):
+        """
+        Fsync all pending journal records to disk.
+        """
+        with self._lock:
+            self._sync()
+
+    def needs_compaction(self):
+        """
+        Check whether the journal has grown past the compaction threshold.
+
+        Returns:
+            bool: True if a compaction should be started
+        """
+        return not self._compacting and self.record_count >= self.compact_threshold
+
+    def begin_compaction(self):
+        """
+        Rotate the active journal aside so a snapshot can be written.
+
+        Records appended after this call go to a fresh journal file, while
+        the rotated file is kept until the snapshot is safely on disk.
+        Every record is idempotent, so mutations that land in both the
+        snapshot and the fresh journal replay safely.
+
+        Returns:
+            int: Sequence number covered by the snapshot, or None if a compaction is already running
+        """
+        with self._lock:
+            if self._compacting:
+                return None
+            self._compacting = True
+            self._sync()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if os.path.exists(self.journal_path):
+                if os.path.exists(self.compacting_path):
+                    # Leftover from an interrupted compaction; keep both until the snapshot lands
+                    with open(self.compacting_path, 'a', encoding='utf-8') as target, \
+                            open(self.journal_path, 'r', encoding='utf-8') as source:
+                        target.write(source.read())
+                    os.remove(self.journal_path)
+                else:
+                    os.replace(self.journal_path, self.compacting_path)
+            self.record_count = 0
+            return self.last_seq
+
+    def finish_compaction(self, success=True):
+        """
+        Complete a compaction started with begin_compaction.
+
+        Args:
+            success (bool): Whether the snapshot was written successfully
+        """
+        with self._lock:
+            if success and os.path.exists(self.compacting_path):
+                os.remove(self.compacting_path)
+            self._compacting = False
+
+    def close(self):
+        """
+        Flush and close the journal.
+        """
+        with self._lock:
+            self._closed = True
+            self._sync()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,899 @@
+import logging
+import json
+import os
+import copy
+import uuid
+import sqlite3
+import threading
+import heapq
+import base64
+from collections import OrderedDict
+from collections.abc import Mapping
+from datetime import datetime
+from .project_journal import ProjectJournal
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class ProjectVersionConflict(Exception):
+    """
+    Raised when a project was modified by another writer since it was read.
+    """
+
+    def __init__(self, project_id, expected_version, current_version=None):
+        """
+        Initialize the ProjectVersionConflict.
+
+        Args:
+            project_id (str): Project identifier
+            expected_version (int): Version the writer based its changes on
+            current_version (int, optional): Version currently stored
+        """
+        self.project_id = project_id
+        self.expected_version = expected_version
+        self.current_version = current_version
+        super().__init__(
+            f"Project {project_id} was modified concurrently "
+            f"(expected version {expected_version}, current version {current_version})"
+        )
+
+
+def _encode_cursor(sort_key):
+    """
+    Encode a (sort value, project id) pair as an opaque pagination cursor.
+    """
+    return base64.urlsafe_b64encode(json.dumps(list(sort_key)).encode('utf-8')).decode('ascii')
+
+
+def _decode_cursor(cursor):
+    """
+    Decode a pagination cursor into a (sort value, project id) pair.
+    """
+    try:
+        sort_value, project_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return (sort_value, project_id)
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+class ProjectStore(Mapping):
+    """
+    Base class for design project storage backends.
+    Exposes the stored projects as a read-only mapping of project id to
+    project data; all writes go through save_project and delete_project so
+    each backend can persist them in its own way. Every save increments the
+    project's 'version' field.
+
+    Stored project dicts are never modified in place: writers hold lock
+    while they read a project, change a copy and save it, so readers and
+    snapshots always see whole versions.
+    """
+
+    SUMMARY_FIELDS = ('id', 'name', 'industry', 'status', 'created_at', 'updated_at', 'version')
+    SORT_FIELDS = ('updated_at', 'created_at', 'name')
+
+    def __init__(self, database_path=None):
+        """
+        Initialize the ProjectStore.
+
+        Args:
+            database_path (str, optional): Path to the backing database file
+        """
+        self.database_path = database_path
+        self.design_templates = {}
+        self.industry_configs = {}
+        # Serializes read-modify-save of projects within this process
+        self.lock = threading.RLock()
+
+    def load(self):
+        """
+        Load stored data.
+
+        Returns:
+            dict: Stored 'design_templates' and 'industry_configs', or None if the store is empty
+        """
+        raise NotImplementedError
+
+    def set_metadata(self, design_templates, industry_configs):
+        """
+        Attach the design templates and industry configurations persisted alongside the projects.
+
+        Args:
+            design_templates (dict): Design templates by industry
+            industry_configs (dict): Industry configurations
+        """
+        self.design_templates = design_templates
+        self.industry_configs = industry_configs
+
+    def save_project(self, project_id, project, operation='update'):
+        """
+        Persist a created or modified project and increment its version.
+
+        Args:
+            project_id (str): Project identifier
+            project (dict): Project data
+            operation (str): Mutation type ('create', 'update', 'analysis')
+
+        Raises:
+            ProjectVersionConflict: If the stored project changed since it was read
+        """
+        raise NotImplementedError
+
+    def delete_project(self, project_id):
+        """
+        Delete a project.
+
+        Args:
+            project_id (str): Project identifier
+
+        Returns:
+            bool: True if the project existed, False otherwise
+        """
+        raise NotImplementedError
+
+    def list_projects(self, industry=None, status=None, updated_since=None, sort='updated_at',
+                      descending=True, limit=50, cursor=None, fields=None):
+        """
+        List one page of projects matching the given filters.
+
+        Pages are keyset-paginated on (sort field, project id), so a cursor
+        stays valid while projects are added or removed.
+
+        Args:
+            industry (str, optional): Only include projects of this industry
+            status (str, optional): Only include projects with this status
+            updated_since (str, optional): Only include projects updated at or after this ISO timestamp
+            sort (str): Sort field ('updated_at', 'created_at' or 'name')
+            descending (bool): Sort in descending order
+            limit (int): Maximum number of projects to return
+            cursor (str, optional): Cursor returned with the previous page
+            fields (list, optional): Project fields to return (defaults to SUMMARY_FIELDS)
+
+        Returns:
+            dict: 'projects' list and 'next_cursor' (None on the last page)
+        """
+        fields = self._validate_listing(sort, fields)
+        after = _decode_cursor(cursor) if cursor else None
+
+        candidates = []
+        for project in self.values():
+            if industry and project.get('industry') != industry:
+                continue
+            if status and project.get('status') != status:
+                continue
+            if updated_since and (project.get('updated_at') or '') < updated_since:
+                continue
+
+            sort_key = (project.get(sort) or '', project.get('id') or '')
+            if after is not None and (sort_key >= after if descending else sort_key <= after):
+                continue
+            candidates.append((sort_key, project))
+
+        select = heapq.nlargest if descending else heapq.nsmallest
+        page = select(limit + 1, candidates, key=lambda candidate: candidate[0])
+        next_cursor = _encode_cursor(page[limit - 1][0]) if len(page) > limit else None
+
+        return {
+            'projects': [self._project_fields(project, fields) for _, project in page[:limit]],
+            'next_cursor': next_cursor
+        }
+
+    def _validate_listing(self, sort, fields):
+        """
+        Validate listing arguments.
+
+        Returns:
+            tuple: Fields to return
+        """
+        if sort not in self.SORT_FIELDS:
+            raise ValueError(f"Unsupported sort field: {sort}")
+        return tuple(fields) if fields else self.SUMMARY_FIELDS
+
+    def _project_fields(self, project, fields):
+        """
+        Project a project down to the requested fields.
+        """
+        return {field: project.get(field) for field in fields}
+
+    def save(self, output_path=None):
+        """
+        Save the complete database.
+
+        Args:
+            output_path (str, optional): Path to export the database to instead of the store itself
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        raise NotImplementedError
+
+    def commit(self):
+        """
+        Make sure all saved projects are persisted.
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        return True
+
+    def compact(self):
+        """
+        Compact the backing storage, if the backend supports it.
+
+        Returns:
+            bool: True if a compaction ran, False otherwise
+        """
+        return False
+
+    def close(self):
+        """
+        Release any resources held by the store.
+        """
+        pass
+
+    def _export_data(self, projects):
+        """
+        Build the serializable JSON database layout.
+
+        Args:
+            projects (dict): Projects to include
+
+        Returns:
+            dict: Database data
+        """
+        return {
+            'design_templates': self.design_templates,
+            'industry_configs': self.industry_configs,
+            'design_projects': projects,
+            'last_updated': datetime.now().isoformat()
+        }
+
+    def _write_file(self, path, content):
+        """
+        Atomically write serialized database content to a file.
+
+        Args:
+            path (str): Destination path
+            content (str): Serialized database
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Unique per writer: a full save and a background compaction may overlap
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(temp_path, 'w') as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+class JsonProjectStore(ProjectStore):
+    """
+    Project store backed by a single JSON database file.
+    All projects are held in memory. When journaling is enabled, mutations
+    are appended to a ProjectJournal and folded into the JSON snapshot by
+    background compaction instead of rewriting the file on every change.
+    Mutations and snapshots share the store lock; snapshots copy the
+    projects under it and serialize the copy outside it, so writers are
+    only held up for the copy.
+    """
+
+    def __init__(self, database_path=None, use_journal=True):
+        """
+        Initialize the JsonProjectStore.
+
+        Args:
+            database_path (str, optional): Path to the JSON database file
+            use_journal (bool): Record mutations in an append-only journal next to the database file
+        """
+        super().__init__(database_path)
+        self._projects = {}
+        self.journal = None
+        if database_path and use_journal:
+            self.journal = ProjectJournal(database_path + '.journal')
+
+    def __getitem__(self, project_id):
+        return self._projects[project_id]
+
+    def __iter__(self):
+        return iter(self._projects)
+
+    def __len__(self):
+        return len(self._projects)
+
+    def load(self):
+        """
+        Load the JSON snapshot and replay the journal recorded after it.
+
+        Returns:
+            dict: Stored 'design_templates' and 'industry_configs', or None if the store is empty
+        """
+        data = None
+        journal_seq = 0
+        try:
+            if self.database_path and os.path.exists(self.database_path):
+                with open(self.database_path, 'r') as f:
+                    data = json.load(f)
+                self._projects = data.get('design_projects', {})
+                journal_seq = data.get('journal_seq', 0)
+        except Exception as e:
+            logger.error(f"Error loading design database: {str(e)}")
+            data = None
+            self._projects = {}
+
+        # Replay project mutations recorded after the snapshot
+        if self.journal:
+            for record in self.journal.replay(after_seq=journal_seq):
+                self._apply_journal_record(record)
+
+        return data
+
+    def _apply_journal_record(self, record):
+        """
+        Apply a single journal record to the in-memory projects.
+
+        Args:
+            record (dict): Journal record with 'op', 'project_id' and 'data'
+        """
+        operation = record.get('op')
+        project_id = record.get('project_id')
+        data = record.get('data') or {}
+
+        if operation in ('create', 'update'):
+            self._projects[project_id] = data.get('project', {})
+        elif operation == 'delete':
+            self._projects.pop(project_id, None)
+        elif operation == 'analysis':
+            project = self._projects.get(project_id)
+            if project:
+                project['analysis_results'] = data.get('analysis_results', {})
+                project['updated_at'] = data.get('updated_at')
+                project['version'] = data.get('version', project.get('version', 0))
+                # Skip history entries the snapshot already holds
+                history = project.setdefault('version_history', [])
+                recorded = history[-1].get('version', 0) if history else -1
+                history.extend(
+                    entry for entry in data.get('version_history', []) if entry.get('version', 0) > recorded
+                )
+        else:
+            logger.warning(f"Unknown journal operation: {operation}")
+
+    def save_project(self, project_id, project, operation='update'):
+        """
+        Store a project in memory and journal the mutation.
+
+        Args:
+            project_id (str): Project identifier
+            project (dict): Project data
+            operation (str): Mutation type ('create', 'update', 'analysis')
+        """
+        with self.lock:
+            project['version'] = project.get('version', 0) + 1
+            self._projects[project_id] = project
+
+            if operation == 'analysis':
+                # History entries from the previously stored version on may be new
+                payload = {
+                    'analysis_results': project.get('analysis_results', {}),
+                    'updated_at': project.get('updated_at'),
+                    'version': project['version'],
+                    'version_history': [
+                        entry for entry in project.get('version_history', [])
+                        if entry.get('version', 0) >= project['version'] - 1
+                    ]
+                }
+            else:
+                payload = {'project': project}
+            self._journal(operation, project_id, payload)
+
+    def delete_project(self, project_id):
+        """
+        Delete a project and journal the deletion.
+
+        Args:
+            project_id (str): Project identifier
+
+        Returns:
+            bool: True if the project existed, False otherwise
+        """
+        with self.lock:
+            if self._projects.pop(project_id, None) is None:
+                return False
+            self._journal('delete', project_id, None)
+            return True
+
+    def _journal(self, operation, project_id, payload):
+        """
+        Append a mutation to the journal and start compaction when it grows too large.
+
+        Called with the store lock held; compaction runs in its own thread
+        and waits for the lock.
+
+        Args:
+            operation (str): Mutation type
+            project_id (str): Project identifier
+            payload (dict): Mutation data
+        """
+        if not self.journal:
+            return
+
+        try:
+            self.journal.append(operation, project_id, payload)
+
+            if self.journal.needs_compaction():
+                threading.Thread(target=self.compact, name='design-db-compaction', daemon=True).start()
+        except Exception as e:
+            logger.error(f"Error recording {operation} for project {project_id}: {str(e)}")
+
+    def save(self, output_path=None):
+        """
+        Save the complete database to the JSON file.
+
+        A full snapshot of the main database file supersedes the journal.
+
+        Args:
+            output_path (str, optional): Path to save the database file
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            path = output_path or self.database_path
+            if not path:
+                logger.warning("No output path specified for saving database")
+                return False
+
+            if self.journal and path == self.database_path:
+                journal_seq, projects = self._snapshot_projects()
+                rotated = journal_seq is not None
+                try:
+                    data = self._export_data(projects)
+                    # While a background compaction owns the journal, replay all of it on load
+                    data['journal_seq'] = journal_seq if rotated else 0
+                    self._write_file(path, json.dumps(data, indent=2))
+                except Exception:
+                    if rotated:
+                        self.journal.finish_compaction(success=False)
+                    raise
+                if rotated:
+                    self.journal.finish_compaction(success=True)
+            else:
+                _, projects = self._snapshot_projects(rotate_journal=False)
+                self._write_file(path, json.dumps(self._export_data(projects), indent=2))
+
+            logger.info(f"Saved design database to {path}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error saving design database: {str(e)}")
+            return False
+
+    def commit(self):
+        """
+        Persist pending changes.
+
+        With journaling enabled every mutation is already in the journal and
+        is fsync'd in batches, so this is a no-op; otherwise the full
+        database is saved.
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if self.journal or not self.database_path:
+            return True
+        return self.save()
+
+    def compact(self):
+        """
+        Fold the journal into a fresh database snapshot.
+
+        Runs in a background thread once the journal grows past its threshold.
+        The active journal is rotated aside first, so writers keep appending
+        while the snapshot is serialized and written.
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if not self.journal or not self.database_path:
+            return False
+
+        journal_seq, projects = self._snapshot_projects()
+        if journal_seq is None:
+            return False
+
+        try:
+            data = self._export_data(projects)
+            data['journal_seq'] = journal_seq
+            self._write_file(self.database_path, json.dumps(data, separators=(',', ':')))
+            self.journal.finish_compaction(success=True)
+            logger.info(f"Compacted design database journal at sequence {journal_seq}")
+            return True
+        except Exception as e:
+            self.journal.finish_compaction(success=False)
+            logger.error(f"Error compacting design database: {str(e)}")
+            return False
+
+    def _snapshot_projects(self, rotate_journal=True):
+        """
+        Copy the projects consistently with the journal position.
+
+        Args:
+            rotate_journal (bool): Rotate the journal aside before copying
+
+        Returns:
+            tuple: Journal sequence covered by the copy (None if the journal was not
+                rotated) and a deep copy of the projects
+        """
+        with self.lock:
+            journal_seq = self.journal.begin_compaction() if rotate_journal else None
+            return journal_seq, copy.deepcopy(self._projects)
+
+    def close(self):
+        """
+        Flush and close the journal.
+        """
+        if self.journal:
+            self.journal.close()
+
+
+class SqliteProjectStore(ProjectStore):
+    """
+    Project store backed by an embedded SQLite database.
+    Projects are loaded lazily on first access and kept in a bounded cache,
+    while the summary columns (industry, status, updated_at, name) are
+    indexed so projects can be queried without loading them.
+
+    Updates use optimistic concurrency on the per-project version column,
+    so several processes can share one database file. In shared mode the
+    project cache is disabled and every read sees other writers' changes.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS projects (
+            id TEXT PRIMARY KEY,
+            name TEXT,
+            industry TEXT,
+            status TEXT,
+            created_at TEXT,
+            updated_at TEXT,
+            version INTEGER NOT NULL DEFAULT 0,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_projects_industry ON projects (industry);
+        CREATE INDEX IF NOT EXISTS idx_projects_status ON projects (status);
+        CREATE INDEX IF NOT EXISTS idx_projects_updated_at ON projects (updated_at, id);
+        CREATE INDEX IF NOT EXISTS idx_projects_created_at ON projects (created_at, id);
+        CREATE INDEX IF NOT EXISTS idx_projects_name ON projects (name, id);
+        CREATE TABLE IF NOT EXISTS metadata (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, database_path, cache_size=256, shared=False):
+        """
+        Initialize the SqliteProjectStore.
+
+        Args:
+            database_path (str): Path to the SQLite database file
+            cache_size (int): Maximum number of projects kept in memory
+            shared (bool): Whether other processes write to the same database file
+        """
+        super().__init__(database_path)
+        self.shared = shared
+        self.cache_size = 0 if shared else cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._local = threading.local()
+
+        directory = os.path.dirname(database_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self._connection()
+        connection.executescript(self.SCHEMA)
+
+        # Databases created before per-project versions lack the column
+        columns = [row[1] for row in connection.execute('PRAGMA table_info(projects)')]
+        if 'version' not in columns:
+            with connection:
+                connection.execute('ALTER TABLE projects ADD COLUMN version INTEGER NOT NULL DEFAULT 0')
+
+    def _connection(self):
+        """
+        Get the SQLite connection for the current thread.
+
+        Returns:
+            sqlite3.Connection: Database connection
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.database_path, timeout=30)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def _cache_put(self, project_id, project):
+        with self._cache_lock:
+            self._cache[project_id] = project
+            self._cache.move_to_end(project_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def __getitem__(self, project_id):
+        with self._cache_lock:
+            project = self._cache.get(project_id)
+            if project is not None:
+                self._cache.move_to_end(project_id)
+                return project
+
+        row = self._connection().execute(
+            'SELECT data, version FROM projects WHERE id = ?', (project_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(project_id)
+
+        project = json.loads(row[0])
+        project['version'] = row[1]
+        self._cache_put(project_id, project)
+        return project
+
+    def __contains__(self, project_id):
+        with self._cache_lock:
+            if project_id in self._cache:
+                return True
+        row = self._connection().execute(
+            'SELECT 1 FROM projects WHERE id = ?', (project_id,)
+        ).fetchone()
+        return row is not None
+
+    def __iter__(self):
+        cursor = self._connection().execute('SELECT id FROM projects ORDER BY id')
+        for (project_id,) in cursor:
+            yield project_id
+
+    def __len__(self):
+        return self._connection().execute('SELECT COUNT(*) FROM projects').fetchone()[0]
+
+    def load(self):
+        """
+        Load the stored design templates and industry configurations.
+
+        Projects are not loaded here; they are read on first access.
+
+        Returns:
+            dict: Stored 'design_templates' and 'industry_configs', or None if the store is empty
+        """
+        rows = self._connection().execute('SELECT key, value FROM metadata').fetchall()
+        if not rows:
+            return None
+
+        data = {key: json.loads(value) for key, value in rows}
+        logger.info(f"Opened SQLite design database with {len(self)} projects")
+        return data
+
+    def set_metadata(self, design_templates, industry_configs):
+        """
+        Attach and persist the design templates and industry configurations.
+
+        Args:
+            design_templates (dict): Design templates by industry
+            industry_configs (dict): Industry configurations
+        """
+        super().set_metadata(design_templates, industry_configs)
+        self._save_metadata()
+
+    def _save_metadata(self):
+        connection = self._connection()
+        with connection:
+            connection.executemany(
+                'INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)',
+                [
+                    ('design_templates', json.dumps(self.design_templates)),
+                    ('industry_configs', json.dumps(self.industry_configs))
+                ]
+            )
+
+    def save_project(self, project_id, project, operation='update'):
+        """
+        Write a project row and its indexed summary columns.
+
+        Updates only succeed if the stored version still matches the version
+        the project was read at.
+
+        Args:
+            project_id (str): Project identifier
+            project (dict): Project data
+            operation (str): Mutation type ('create', 'update', 'analysis')
+
+        Raises:
+            ProjectVersionConflict: If the stored project changed since it was read
+        """
+        expected_version = project.get('version', 0)
+        project['version'] = expected_version + 1
+        columns = (
+            project.get('name') or '',
+            project.get('industry'),
+            project.get('status'),
+            project.get('created_at') or '',
+            project.get('updated_at') or '',
+            project['version'],
+            json.dumps(project, separators=(',', ':'))
+        )
+
+        connection = self._connection()
+        with connection:
+            if operation == 'create':
+                cursor = connection.execute(
+                    'INSERT OR IGNORE INTO projects (name, industry, status, created_at, updated_at, version, data, id) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    columns + (project_id,)
+                )
+            else:
+                cursor = connection.execute(
+                    'UPDATE projects SET name = ?, industry = ?, status = ?, created_at = ?, updated_at = ?, '
+                    'version = ?, data = ? WHERE id = ? AND version = ?',
+                    columns + (project_id, expected_version)
+                )
+
+        if cursor.rowcount == 0:
+            project['version'] = expected_version
+            with self._cache_lock:
+                self._cache.pop(project_id, None)
+            row = connection.execute('SELECT version FROM projects WHERE id = ?', (project_id,)).fetchone()
+            raise ProjectVersionConflict(project_id, expected_version, row[0] if row else None)
+
+        self._cache_put(project_id, project)
+
+    def list_projects(self, industry=None, status=None, updated_since=None, sort='updated_at',
+                      descending=True, limit=50, cursor=None, fields=None):
+        """
+        List one page of projects using the indexed summary columns.
+
+        Project bodies are only read when fields outside SUMMARY_FIELDS are requested.
+
+        Args:
+            industry (str, optional): Only include projects of this industry
+            status (str, optional): Only include projects with this status
+            updated_since (str, optional): Only include projects updated at or after this ISO timestamp
+            sort (str): Sort field ('updated_at', 'created_at' or 'name')
+            descending (bool): Sort in descending order
+            limit (int): Maximum number of projects to return
+            cursor (str, optional): Cursor returned with the previous page
+            fields (list, optional): Project fields to return (defaults to SUMMARY_FIELDS)
+
+        Returns:
+            dict: 'projects' list and 'next_cursor' (None on the last page)
+        """
+        fields = self._validate_listing(sort, fields)
+
+        conditions = []
+        params = []
+        if industry:
+            conditions.append('industry = ?')
+            params.append(industry)
+        if status:
+            conditions.append('status = ?')
+            params.append(status)
+        if updated_since:
+            conditions.append('updated_at >= ?')
+            params.append(updated_since)
+        if cursor:
+            conditions.append(f"({sort}, id) {'<' if descending else '>'} (?, ?)")
+            params.extend(_decode_cursor(cursor))
+
+        load_data = not set(fields).issubset(self.SUMMARY_FIELDS)
+        direction = 'DESC' if descending else 'ASC'
+        query = f"SELECT {', '.join(self.SUMMARY_FIELDS)}{', data' if load_data else ''} FROM projects"
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += f" ORDER BY {sort} {direction}, id {direction} LIMIT ?"
+        params.append(limit + 1)
+
+        rows = self._connection().execute(query, params).fetchall()
+        sort_index = self.SUMMARY_FIELDS.index(sort)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor((rows[-1][sort_index], rows[-1][0]))
+
+        projects = []
+        for row in rows:
+            if load_data:
+                project = json.loads(row[-1])
+                project['version'] = row[self.SUMMARY_FIELDS.index('version')]
+            else:
+                project = dict(zip(self.SUMMARY_FIELDS, row))
+            projects.append(self._project_fields(project, fields))
+
+        return {
+            'projects': projects,
+            'next_cursor': next_cursor
+        }
+
+    def delete_project(self, project_id):
+        """
+        Delete a project row.
+
+        Args:
+            project_id (str): Project identifier
+
+        Returns:
+            bool: True if the project existed, False otherwise
+        """
+        with self._cache_lock:
+            self._cache.pop(project_id, None)
+
+        connection = self._connection()
+        with connection:
+            cursor = connection.execute('DELETE FROM projects WHERE id = ?', (project_id,))
+        return cursor.rowcount > 0
+
+    def save(self, output_path=None):
+        """
+        Save the database.
+
+        Projects are written as they change, so saving the store itself only
+        persists the templates and configurations. With an output path the
+        whole database is exported in the JSON file layout.
+
+        Args:
+            output_path (str, optional): Path to export the database to as JSON
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            if output_path and output_path != self.database_path:
+                projects = {project_id: self[project_id] for project_id in self}
+                self._write_file(output_path, json.dumps(self._export_data(projects), indent=2))
+                logger.info(f"Exported design database to {output_path}")
+            else:
+                self._save_metadata()
+                logger.info(f"Saved design database to {self.database_path}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error saving design database: {str(e)}")
+            return False
+
+    def close(self):
+        """
+        Close the current thread's database connection.
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+def create_project_store(backend='json', database_path=None, use_journal=True, shared=False):
+    """
+    Create a project store for the given storage backend.
+
+    Args:
+        backend (str): Storage backend ('json' or 'sqlite')
+        database_path (str, optional): Path to the backing database file
+        use_journal (bool): Enable the mutation journal for the JSON backend
+        shared (bool): Share the store between several worker processes
+
+    Returns:
+        ProjectStore: Project store instance
+    """
+    if backend == 'json':
+        if shared:
+            raise ValueError("Shared store mode requires the sqlite storage backend")
+        return JsonProjectStore(database_path, use_journal=use_journal)
+    if backend == 'sqlite':
+        if not database_path:
+            raise ValueError("The sqlite storage backend requires a database path")
+        return SqliteProjectStore(database_path, shared=shared)
+    raise ValueError(f"Unsupported storage backend: {backend}")
@@ -0,0 +1,243 @@
+import os
+import logging
+import json
+import hashlib
+import copy
+import uuid
+import threading
+from collections import OrderedDict
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class AnalysisCache:
+    """
+    Content-addressed cache for image analysis results.
+    Results are keyed by a hash of the image bytes plus the analyzer
+    configuration, and kept in an in-memory LRU tier backed by an on-disk
+    tier whose total size is bounded by least-recently-used eviction.
+    """
+
+    def __init__(self, cache_dir=None, memory_entries=128, max_disk_bytes=512 * 1024 * 1024):
+        """
+        Initialize the AnalysisCache.
+
+        Args:
+            cache_dir (str, optional): Directory for the on-disk tier (memory only if not set)
+            memory_entries (int): Maximum number of results kept in memory
+            max_disk_bytes (int): Maximum total size of the on-disk tier
+        """
+        logger.info("Initializing AnalysisCache")
+        self.cache_dir = cache_dir
+        self.memory_entries = memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = 0
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._disk_bytes = sum(size for _, _, size in self._disk_entries())
+
+    @staticmethod
+    def hash_content(source, chunk_size=1024 * 1024):
+        """
+        Hash image content.
+
+        Args:
+            source (str or bytes): Path to the image file or the image bytes
+            chunk_size (int): Read size used when hashing a file
+
+        Returns:
+            str: Hex SHA-256 digest of the content
+        """
+        digest = hashlib.sha256()
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            digest.update(source)
+        else:
+            with open(source, 'rb') as f:
+                for chunk in iter(lambda: f.read(chunk_size), b''):
+                    digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def make_key(content_hash, config):
+        """
+        Build a cache key from a content hash and an analyzer configuration.
+
+        Args:
+            content_hash (str): Hash of the image content
+            config (dict): Analyzer configuration affecting the results
+
+        Returns:
+            str: Cache key
+        """
+        config_hash = hashlib.sha256(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()
+        return f"{content_hash}-{config_hash[:16]}"
+
+    def get(self, key):
+        """
+        Look up cached results.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            dict: Cached results, or None on a miss
+        """
+        with self._lock:
+            results = self._memory.get(key)
+            if results is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(results)
+
+        results = self._read_disk(key)
+
+        with self._lock:
+            if results is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, results)
+            return copy.deepcopy(results)
+
+    def put(self, key, results):
+        """
+        Store results in both cache tiers.
+
+        Args:
+            key (str): Cache key
+            results (dict): Analysis results (must be JSON-serializable)
+        """
+        with self._lock:
+            self._remember(key, copy.deepcopy(results))
+
+        if self.cache_dir:
+            try:
+                self._write_disk(key, results)
+            except Exception as e:
+                logger.error(f"Error writing analysis cache entry: {str(e)}")
+
+    def get_stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: Hit and miss counts, memory entries and disk usage
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'memory_entries': len(self._memory),
+                'disk_bytes': self._disk_bytes
+            }
+
+    def _remember(self, key, results):
+        """
+        Insert results into the memory tier. Caller must hold the lock.
+        """
+        self._memory[key] = results
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _read_disk(self, key):
+        """
+        Read an entry from the on-disk tier and mark it as recently used.
+        """
+        if not self.cache_dir:
+            return None
+
+        path = self._disk_path(key)
+        try:
+            with open(path, 'r') as f:
+                results = json.load(f)
+            os.utime(path, None)
+            return results
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable analysis cache entry {path}: {str(e)}")
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+    def _write_disk(self, key, results):
+        """
+        Write an entry to the on-disk tier and evict old entries if it grew too large.
+        """
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        content = json.dumps(results, default=str)
+        # Unique per writer: the same key can be written concurrently by threads and processes
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(temp_path, 'w') as f:
+                f.write(content)
+            previous_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        with self._lock:
+            self._disk_bytes += len(content.encode('utf-8')) - previous_size
+            over_budget = self._disk_bytes > self.max_disk_bytes
+
+        if over_budget:
+            self._evict_disk()
+
+    def _disk_entries(self):
+        """
+        List on-disk entries.
+
+        Returns:
+            list: (modification time, path, size) tuples
+        """
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, path, stat.st_size))
+        return entries
+
+    def _evict_disk(self):
+        """
+        Remove least recently used on-disk entries until the tier is at 90% of its budget.
+        """
+        entries = sorted(self._disk_entries())
+        total = sum(size for _, _, size in entries)
+        target = self.max_disk_bytes * 0.9
+        removed = 0
+
+        for _, path, size in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                continue
+
+        with self._lock:
+            self._disk_bytes = total
+        logger.info(f"Evicted {removed} analysis cache entries")
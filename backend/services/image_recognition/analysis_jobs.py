@@ -0,0 +1,450 @@
+import logging
+import os
+import json
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class MemoryJobStore:
+    """
+    Job records held in the memory of one process.
+    Jobs can only be polled through the process that queued them, so this
+    store is only suitable for a single server worker.
+    """
+
+    def __init__(self):
+        """
+        Initialize the MemoryJobStore.
+        """
+        self.jobs = {}
+        self._lock = threading.Lock()
+
+    def add(self, job):
+        """
+        Store a new job record.
+
+        Args:
+            job (dict): Job record with an 'id'
+        """
+        with self._lock:
+            self.jobs[job['id']] = dict(job)
+
+    def update(self, job_id, **fields):
+        """
+        Update fields of a job record.
+
+        Args:
+            job_id (str): Job identifier
+            **fields: Fields to set
+        """
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job:
+                job.update(fields)
+
+    def remove(self, job_id):
+        """
+        Delete a job record.
+
+        Args:
+            job_id (str): Job identifier
+        """
+        with self._lock:
+            self.jobs.pop(job_id, None)
+
+    def get(self, job_id):
+        """
+        Get a job record.
+
+        Args:
+            job_id (str): Job identifier
+
+        Returns:
+            dict: Copy of the job record, or None if the job is unknown
+        """
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def status_counts(self):
+        """
+        Count job records per status.
+
+        Returns:
+            dict: Number of jobs per status
+        """
+        with self._lock:
+            counts = {}
+            for job in self.jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+            return counts
+
+    def heartbeat(self):
+        """
+        Mark this process's unfinished jobs as alive.
+
+        Jobs in memory end with their process, so there is nothing to refresh.
+        """
+
+    def prune(self, cutoff):
+        """
+        Delete job records that finished before a point in time.
+
+        Args:
+            cutoff (float): Timestamp before which finished jobs are deleted
+        """
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self.jobs.items()
+                if job['finished_at'] is not None and job['finished_at'] < cutoff
+            ]
+            for job_id in expired:
+                del self.jobs[job_id]
+
+
+class SqliteJobStore:
+    """
+    Job records kept in a SQLite database shared by server worker processes.
+    A job queued by one worker can be polled through any other, so status
+    URLs keep working behind a multi-worker server. The jobs table can live
+    in the same database file as the shared project store.
+
+    Each store instance owns the jobs it adds and refreshes their heartbeat
+    while they are unfinished; a job whose heartbeat is older than
+    stale_after seconds belonged to a worker that stopped, and is reported
+    and recorded as failed.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            metadata TEXT,
+            result TEXT,
+            error TEXT,
+            created_at REAL,
+            started_at REAL,
+            finished_at REAL,
+            owner TEXT,
+            heartbeat_at REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_jobs_finished_at ON jobs (finished_at);
+    """
+
+    FIELDS = ('id', 'status', 'metadata', 'result', 'error', 'created_at', 'started_at', 'finished_at')
+
+    # Fields stored as JSON text
+    JSON_FIELDS = ('metadata', 'result')
+
+    STALE_ERROR = 'The worker running this job stopped before it finished'
+
+    def __init__(self, database_path, stale_after=60):
+        """
+        Initialize the SqliteJobStore.
+
+        Args:
+            database_path (str): Path to the SQLite database file
+            stale_after (float): Seconds without a heartbeat after which an unfinished job is failed
+        """
+        self.database_path = database_path
+        self.stale_after = stale_after
+        self.owner = uuid.uuid4().hex
+        self._local = threading.local()
+
+        directory = os.path.dirname(database_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self._connection()
+        connection.executescript(self.SCHEMA)
+
+        # Tables created before job ownership lack the heartbeat columns
+        columns = [row[1] for row in connection.execute('PRAGMA table_info(jobs)')]
+        with connection:
+            for column, column_type in (('owner', 'TEXT'), ('heartbeat_at', 'REAL')):
+                if column not in columns:
+                    connection.execute(f'ALTER TABLE jobs ADD COLUMN {column} {column_type}')
+
+    def _connection(self):
+        """
+        Get the SQLite connection for the current thread.
+
+        Returns:
+            sqlite3.Connection: Database connection
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.database_path, timeout=30)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def _encode(self, field, value):
+        if field in self.JSON_FIELDS:
+            return json.dumps(value, default=str)
+        return value
+
+    def add(self, job):
+        """
+        Store a new job record.
+
+        Args:
+            job (dict): Job record with an 'id'
+        """
+        columns = self.FIELDS + ('owner', 'heartbeat_at')
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                f"INSERT INTO jobs ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+                [self._encode(field, job.get(field)) for field in self.FIELDS] + [self.owner, time.time()]
+            )
+
+    def update(self, job_id, **fields):
+        """
+        Update fields of a job record.
+
+        Args:
+            job_id (str): Job identifier
+            **fields: Fields to set
+        """
+        columns = [field for field in self.FIELDS if field in fields and field != 'id']
+        if not columns:
+            return
+
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                f"UPDATE jobs SET {', '.join(f'{column} = ?' for column in columns)} WHERE id = ?",
+                [self._encode(column, fields[column]) for column in columns] + [job_id]
+            )
+
+    def remove(self, job_id):
+        """
+        Delete a job record.
+
+        Args:
+            job_id (str): Job identifier
+        """
+        connection = self._connection()
+        with connection:
+            connection.execute('DELETE FROM jobs WHERE id = ?', (job_id,))
+
+    def get(self, job_id):
+        """
+        Get a job record.
+
+        Args:
+            job_id (str): Job identifier
+
+        Returns:
+            dict: Job record, or None if the job is unknown
+        """
+        row = self._connection().execute(
+            f"SELECT {', '.join(self.FIELDS)}, COALESCE(heartbeat_at, created_at) FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        job = dict(zip(self.FIELDS, row))
+        heartbeat_at = row[-1]
+        # Jobs of a worker that stopped stay unfinished; record them as failed first
+        if job['finished_at'] is None and heartbeat_at is not None and heartbeat_at < time.time() - self.stale_after:
+            self._fail_stale_jobs()
+            return self.get(job_id)
+
+        for field in self.JSON_FIELDS:
+            if job[field] is not None:
+                job[field] = json.loads(job[field])
+        return job
+
+    def status_counts(self):
+        """
+        Count job records per status.
+
+        Returns:
+            dict: Number of jobs per status
+        """
+        rows = self._connection().execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall()
+        return {status: count for status, count in rows}
+
+    def heartbeat(self):
+        """
+        Mark this store's unfinished jobs as alive.
+        """
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                'UPDATE jobs SET heartbeat_at = ? WHERE owner = ? AND finished_at IS NULL',
+                (time.time(), self.owner)
+            )
+
+    def _fail_stale_jobs(self):
+        """
+        Record unfinished jobs whose worker stopped sending heartbeats as failed.
+        """
+        now = time.time()
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? "
+                'WHERE finished_at IS NULL AND COALESCE(heartbeat_at, created_at) < ?',
+                (self.STALE_ERROR, now, now - self.stale_after)
+            )
+
+    def prune(self, cutoff):
+        """
+        Fail orphaned jobs and delete job records that finished before a point in time.
+
+        Args:
+            cutoff (float): Timestamp before which finished jobs are deleted
+        """
+        self._fail_stale_jobs()
+        connection = self._connection()
+        with connection:
+            connection.execute('DELETE FROM jobs WHERE finished_at < ?', (cutoff,))
+
+
+class AnalysisJobQueue:
+    """
+    Bounded worker pool for running image analyses outside the request thread.
+    Jobs are queued up to max_pending; their status and result can be polled
+    by job id until result_ttl seconds after they finish. Job records are
+    kept in a job store, which must be a SqliteJobStore when several server
+    worker processes answer the polls.
+    """
+
+    def __init__(self, max_workers=2, max_pending=32, result_ttl=3600, job_store=None, heartbeat_interval=10):
+        """
+        Initialize the AnalysisJobQueue.
+
+        Args:
+            max_workers (int): Number of worker threads
+            max_pending (int): Maximum number of queued jobs waiting for a worker
+            result_ttl (float): Seconds a finished job is kept for polling
+            job_store (optional): Store for job records (defaults to a MemoryJobStore)
+            heartbeat_interval (float): Seconds between heartbeats of this queue's unfinished jobs
+        """
+        logger.info(f"Initializing AnalysisJobQueue with {max_workers} workers")
+        self.max_workers = max_workers
+        self.result_ttl = result_ttl
+        self.job_store = job_store or MemoryJobStore()
+        self.heartbeat_interval = heartbeat_interval
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._workers = []
+
+        heartbeat = threading.Thread(target=self._heartbeat_loop, name='analysis-job-heartbeat', daemon=True)
+        heartbeat.start()
+
+        for index in range(max_workers):
+            worker = threading.Thread(target=self._worker_loop, name=f"analysis-worker-{index}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, task, metadata=None):
+        """
+        Queue a job for execution.
+
+        Args:
+            task (callable): Function called without arguments that returns the job result
+            metadata (dict, optional): Information returned with the job status
+
+        Returns:
+            str: Job identifier, or None if the queue is full
+        """
+        self._prune_finished_jobs()
+
+        job_id = str(uuid.uuid4())
+        job = {
+            'id': job_id,
+            'status': 'queued',
+            'metadata': metadata or {},
+            'result': None,
+            'error': None,
+            'created_at': time.time(),
+            'started_at': None,
+            'finished_at': None
+        }
+
+        self.job_store.add(job)
+
+        try:
+            self._queue.put_nowait((job_id, task))
+        except queue.Full:
+            self.job_store.remove(job_id)
+            logger.warning("Analysis job queue is full")
+            return None
+
+        logger.info(f"Queued analysis job: {job_id}")
+        return job_id
+
+    def get_job(self, job_id):
+        """
+        Get the status of a job.
+
+        Args:
+            job_id (str): Job identifier
+
+        Returns:
+            dict: Job status, result and timestamps, or None if the job is unknown
+        """
+        return self.job_store.get(job_id)
+
+    def get_stats(self):
+        """
+        Get queue statistics.
+
+        Returns:
+            dict: Number of jobs per status and the current queue depth
+        """
+        return {
+            'workers': self.max_workers,
+            'queue_depth': self._queue.qsize(),
+            'jobs': self.job_store.status_counts()
+        }
+
+    def _worker_loop(self):
+        """
+        Run queued jobs until the process exits.
+        """
+        while True:
+            job_id, task = self._queue.get()
+            self._update_job(job_id, status='running', started_at=time.time())
+
+            try:
+                result = task()
+                self._update_job(job_id, status='completed', result=result, finished_at=time.time())
+                logger.info(f"Analysis job completed: {job_id}")
+            except Exception as e:
+                logger.error(f"Analysis job {job_id} failed: {str(e)}")
+                self._update_job(job_id, status='failed', error=str(e), finished_at=time.time())
+            finally:
+                self._queue.task_done()
+
+    def _heartbeat_loop(self):
+        """
+        Refresh the heartbeat of this queue's unfinished jobs until the process exits.
+        """
+        while True:
+            time.sleep(self.heartbeat_interval)
+            try:
+                self.job_store.heartbeat()
+            except Exception as e:
+                logger.error(f"Error refreshing analysis job heartbeats: {str(e)}")
+
+    def _update_job(self, job_id, **fields):
+        try:
+            self.job_store.update(job_id, **fields)
+        except Exception as e:
+            logger.error(f"Error updating analysis job {job_id}: {str(e)}")
+
+    def _prune_finished_jobs(self):
+        """
+        Forget finished jobs older than result_ttl.
+        """
+        self.job_store.prune(time.time() - self.result_ttl)
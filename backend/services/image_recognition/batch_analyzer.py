@@ -0,0 +1,230 @@
+import os
+import sys
+import logging
+import json
+import shutil
+import tarfile
+import tempfile
+import zipfile
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tif', '.tiff', '.webp')
+
+# Analyzer of the current worker process, created by _initialize_worker
+_worker_analyzer = None
+
+def _initialize_worker(output_dir):
+    """
+    Create the ImageAnalyzer used by a pool worker process.
+
+    Args:
+        output_dir (str): Directory to save output files
+    """
+    global _worker_analyzer
+    from .image_analyzer import ImageAnalyzer
+    # The pool already runs one process per core, so stages run one at a time in each
+    _worker_analyzer = ImageAnalyzer(output_dir=output_dir, stage_workers=1)
+
+def _analyze_in_worker(image_path, generate_visualizations):
+    """
+    Analyze one image in a pool worker process.
+
+    Args:
+        image_path (str): Path to the image file
+        generate_visualizations (bool): Whether to offer visualization artifacts
+
+    Returns:
+        dict: Analysis results
+    """
+    return _worker_analyzer.analyze_image(image_path, generate_visualizations=generate_visualizations)
+
+def is_archive(path):
+    """
+    Check whether a path is a zip or tar archive.
+
+    Args:
+        path (str): File path
+
+    Returns:
+        bool: True for supported archives
+    """
+    return os.path.isfile(path) and (zipfile.is_zipfile(path) or tarfile.is_tarfile(path))
+
+def extract_archive(archive_path, target_dir):
+    """
+    Extract a zip or tar archive, refusing members that would land outside the target directory.
+
+    Args:
+        archive_path (str): Path to the archive
+        target_dir (str): Directory to extract into
+
+    Returns:
+        str: Target directory
+    """
+    target_root = os.path.realpath(target_dir)
+
+    def safe_path(name):
+        path = os.path.realpath(os.path.join(target_root, name))
+        if os.path.commonpath([target_root, path]) != target_root:
+            raise ValueError(f"Archive member escapes the extraction directory: {name}")
+        return path
+
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as archive:
+            for member in archive.infolist():
+                safe_path(member.filename)
+            archive.extractall(target_root)
+    else:
+        with tarfile.open(archive_path) as archive:
+            # Only regular files and directories; links could point outside the target
+            members = [member for member in archive.getmembers() if member.isfile() or member.isdir()]
+            for member in members:
+                safe_path(member.name)
+            archive.extractall(target_root, members=members)
+
+    return target_dir
+
+def collect_images(sources, work_dir=None):
+    """
+    Expand directories, archives and image paths into a list of image files.
+
+    Args:
+        sources (str or list): Image paths, directories or archives
+        work_dir (str, optional): Directory archives are extracted into (required for archives)
+
+    Returns:
+        list: Sorted image file paths per source, in source order
+    """
+    if isinstance(sources, str):
+        sources = [sources]
+
+    image_paths = []
+    for index, source in enumerate(sources):
+        if os.path.isdir(source):
+            found = []
+            for root, _, files in os.walk(source):
+                found.extend(os.path.join(root, name) for name in files if name.lower().endswith(IMAGE_EXTENSIONS))
+            image_paths.extend(sorted(found))
+        elif not source.lower().endswith(IMAGE_EXTENSIONS) and is_archive(source):
+            if not work_dir:
+                raise ValueError("A work directory is required to extract archives")
+            target_dir = extract_archive(source, os.path.join(work_dir, f"archive_{index}"))
+            image_paths.extend(collect_images(target_dir))
+        else:
+            image_paths.append(source)
+
+    return image_paths
+
+class BatchAnalyzer:
+    """
+    Analyzes many images on a pool of worker processes.
+    Each worker owns an ImageAnalyzer; results are yielded as soon as each
+    image finishes, so callers can stream them.
+    """
+
+    def __init__(self, output_dir="./output", max_workers=None):
+        """
+        Initialize the BatchAnalyzer.
+
+        Args:
+            output_dir (str): Directory to save output files (shared with the analysis cache)
+            max_workers (int, optional): Number of worker processes (defaults to the number of cores)
+        """
+        self.output_dir = output_dir
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = None
+        logger.info(f"BatchAnalyzer initialized with {self.max_workers} workers")
+
+    def _get_executor(self):
+        if self._executor is None:
+            # Spawned workers do not inherit the parent's threads or locks
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_initialize_worker,
+                initargs=(self.output_dir,)
+            )
+        return self._executor
+
+    def analyze(self, image_paths, generate_visualizations=True):
+        """
+        Analyze images in parallel.
+
+        Args:
+            image_paths (list): Paths to the image files
+            generate_visualizations (bool): Whether to offer visualization artifacts
+
+        Yields:
+            dict: Per-image result with its input index, path, status, and the
+                analysis results or error, in completion order
+        """
+        executor = self._get_executor()
+        futures = {
+            executor.submit(_analyze_in_worker, image_path, generate_visualizations): (index, image_path)
+            for index, image_path in enumerate(image_paths)
+        }
+
+        for future in as_completed(futures):
+            index, image_path = futures[future]
+            try:
+                analysis_results = future.result()
+            except Exception as e:
+                analysis_results = {'error': str(e)}
+
+            if 'error' in analysis_results:
+                logger.error(f"Batch analysis failed for {image_path}: {analysis_results['error']}")
+                yield {'index': index, 'image_path': image_path, 'status': 'failed', 'error': analysis_results['error']}
+            else:
+                yield {'index': index, 'image_path': image_path, 'status': 'completed', 'analysis': analysis_results}
+
+    def close(self):
+        """
+        Shut down the worker processes.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+def main(argv=None):
+    """
+    Command-line entry point: analyze images and print one JSON result per line.
+
+    Args:
+        argv (list, optional): Command-line arguments
+
+    Returns:
+        int: Exit status (1 if any image failed)
+    """
+    parser = argparse.ArgumentParser(description="Analyze a batch of images and stream NDJSON results")
+    parser.add_argument('sources', nargs='+', help="Image files, directories or zip/tar archives")
+    parser.add_argument('--output-dir', default='./output', help="Directory to save output files")
+    parser.add_argument('--workers', type=int, default=None, help="Number of worker processes")
+    parser.add_argument('--no-visualizations', action='store_true', help="Do not offer visualization artifacts")
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix='batch_')
+    batch_analyzer = BatchAnalyzer(output_dir=args.output_dir, max_workers=args.workers)
+    failures = 0
+    try:
+        image_paths = collect_images(args.sources, work_dir)
+        logger.info(f"Analyzing {len(image_paths)} images")
+        for result in batch_analyzer.analyze(image_paths, generate_visualizations=not args.no_visualizations):
+            failures += result['status'] == 'failed'
+            sys.stdout.write(json.dumps(result, default=str) + '\n')
+            sys.stdout.flush()
+    finally:
+        batch_analyzer.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    # Example usage: python -m services.image_recognition.batch_analyzer photos/ catalogue.zip
+    sys.exit(main())
@@ -1,10 +1,10 @@
 import cv2
 import numpy as np
-from PIL import Image
 import matplotlib.pyplot as plt
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
 import os
 import logging
+from .image_frame import ImageFrame
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -15,58 +15,72 @@ class ColorExtractor:
     Class for extracting dominant colors from images.
     """
     
-    def __init__(self, n_colors=5):
+    # Palette algorithms: full k-means (reference), mini-batch k-means,
+    # histogram quantization of a reduced color cube, and median-cut
+    METHODS = ('kmeans', 'minibatch', 'histogram', 'median_cut')
+    
+    def __init__(self, n_colors=5, method='histogram', random_state=0, sample_size=150):
         """
         Initialize the ColorExtractor.
         
         Args:
             n_colors (int): Number of dominant colors to extract
+            method (str): Palette algorithm (one of METHODS)
+            random_state (int): Seed for the mini-batch k-means initialization
+            sample_size (int): Edge length of the resized image pixels are sampled from
         """
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown palette method: {method}")
+        
         self.n_colors = n_colors
-        logger.info(f"ColorExtractor initialized with {n_colors} colors")
+        self.method = method
+        self.random_state = random_state
+        self.sample_size = sample_size
+        logger.info(f"ColorExtractor initialized with {n_colors} colors using {method}")
+    
+    def get_pixels(self, image):
+        """
+        Get the opaque pixels used for palette extraction.
+        
+        Args:
+            image (str or ImageFrame): Path to the image file or decoded image frame
+            
+        Returns:
+            ndarray: Pixel array of shape (n, 3)
+        """
+        # Load image (decoded once and shared with the other stages)
+        frame = ImageFrame.from_source(image, min_size=self.sample_size)
+        img_array = frame.resized(self.sample_size, 'rgb')  # Resize for faster processing
+        
+        # Remove transparent pixels if image has alpha channel
+        alpha = frame.resized(self.sample_size, 'alpha')
+        if alpha is not None:
+            return img_array[alpha > 0]
+        return img_array.reshape(-1, 3)
     
-    def extract_colors(self, image_path):
+    def extract_colors(self, image, method=None):
         """
         Extract dominant colors from an image.
         
         Args:
-            image_path (str): Path to the image file
+            image (str or ImageFrame): Path to the image file or decoded image frame
+            method (str, optional): Palette algorithm overriding the configured one
             
         Returns:
             list: List of dominant colors in hex format
             dict: Additional color information including RGB values and percentages
         """
         try:
-            # Load image
-            logger.info(f"Loading image from {image_path}")
-            img = Image.open(image_path)
-            img = img.resize((150, 150))  # Resize for faster processing
-            img_array = np.array(img)
-            
-            # Reshape the image data for KMeans
-            pixels = img_array.reshape(-1, 3)
-            
-            # Remove transparent pixels if image has alpha channel
-            if img_array.shape[2] == 4:
-                # Get alpha channel
-                alpha = img_array[:, :, 3]
-                # Create mask of non-transparent pixels
-                mask = alpha > 0
-                # Apply mask to get only non-transparent pixels
-                pixels = img_array[mask][:, :3]
-            
-            # Apply KMeans clustering
-            logger.info(f"Applying KMeans clustering to extract {self.n_colors} colors")
-            kmeans = KMeans(n_clusters=self.n_colors, n_init=10)
-            kmeans.fit(pixels)
+            pixels = self.get_pixels(image)
+            
+            logger.info(f"Extracting {self.n_colors} colors using {method or self.method}")
+            centers, counts = self.compute_palette(pixels, method)
             
             # Get the colors
-            colors = kmeans.cluster_centers_.astype(int)
+            colors = centers.astype(int)
             
             # Calculate color percentages
-            labels = kmeans.labels_
-            color_counts = np.bincount(labels)
-            color_percentages = color_counts / len(labels) * 100
+            color_percentages = counts / counts.sum() * 100
             
             # Convert colors to hex format
             hex_colors = ['#%02x%02x%02x' % (r, g, b) for r, g, b in colors]
@@ -89,6 +103,114 @@ class ColorExtractor:
             logger.error(f"Error extracting colors: {str(e)}")
             return [], {}
     
+    def compute_palette(self, pixels, method=None):
+        """
+        Compute a palette from pixels.
+        
+        Args:
+            pixels (ndarray): Pixel array of shape (n, 3)
+            method (str, optional): Palette algorithm overriding the configured one
+            
+        Returns:
+            ndarray: Palette colors of shape (k, 3)
+            ndarray: Number of pixels represented by each color
+        """
+        method = method or self.method
+        if method == 'kmeans':
+            return self._palette_kmeans(pixels)
+        elif method == 'minibatch':
+            return self._palette_minibatch(pixels)
+        elif method == 'histogram':
+            return self._palette_histogram(pixels)
+        elif method == 'median_cut':
+            return self._palette_median_cut(pixels)
+        else:
+            raise ValueError(f"Unknown palette method: {method}")
+    
+    def _palette_kmeans(self, pixels):
+        """
+        Full k-means with 10 random initializations (reference quality, slowest).
+        """
+        kmeans = KMeans(n_clusters=self.n_colors, n_init=10)
+        kmeans.fit(pixels)
+        return kmeans.cluster_centers_, np.bincount(kmeans.labels_, minlength=self.n_colors)
+    
+    def _palette_minibatch(self, pixels):
+        """
+        Mini-batch k-means with a fixed seed, so palettes are reproducible.
+        """
+        kmeans = MiniBatchKMeans(
+            n_clusters=self.n_colors, n_init=3, batch_size=1024, random_state=self.random_state
+        )
+        labels = kmeans.fit_predict(pixels.astype(np.float32))
+        return kmeans.cluster_centers_, np.bincount(labels, minlength=self.n_colors)
+    
+    def _palette_histogram(self, pixels, bits=4, min_distance=24.0, iterations=5):
+        """
+        Histogram quantization in a reduced color cube.
+        
+        Pixels are counted in a cube with 2**bits levels per channel. The
+        most populated cells that are at least min_distance apart seed the
+        palette, which is then refined by a few k-means iterations over the
+        cell means weighted by their pixel counts.
+        """
+        pixels = pixels.astype(np.int64)
+        shift = 8 - bits
+        cells = ((pixels[:, 0] >> shift) << (2 * bits)) | ((pixels[:, 1] >> shift) << bits) | (pixels[:, 2] >> shift)
+        
+        n_cells = 1 << (3 * bits)
+        counts = np.bincount(cells, minlength=n_cells)
+        occupied = np.nonzero(counts)[0]
+        cell_counts = counts[occupied].astype(np.float64)
+        cell_means = np.stack([
+            np.bincount(cells, weights=pixels[:, channel], minlength=n_cells)[occupied] / cell_counts
+            for channel in range(3)
+        ], axis=1)
+        
+        # Greedily pick populous cells that are not near an already chosen color
+        seeds = []
+        for index in np.argsort(-cell_counts, kind='stable'):
+            color = cell_means[index]
+            if all(np.linalg.norm(color - seed) >= min_distance for seed in seeds):
+                seeds.append(color)
+                if len(seeds) == self.n_colors:
+                    break
+        
+        # Refine with weighted k-means over the cells (a few thousand points at most)
+        palette = np.array(seeds)
+        for _ in range(iterations):
+            distances = ((cell_means[:, None, :] - palette[None, :, :]) ** 2).sum(axis=2)
+            assignments = np.argmin(distances, axis=1)
+            palette_counts = np.bincount(assignments, weights=cell_counts, minlength=len(palette))
+            sums = np.stack([
+                np.bincount(assignments, weights=cell_means[:, channel] * cell_counts, minlength=len(palette))
+                for channel in range(3)
+            ], axis=1)
+            palette = np.where(palette_counts[:, None] > 0, sums / np.maximum(palette_counts, 1)[:, None], palette)
+        
+        return palette, palette_counts
+    
+    def _palette_median_cut(self, pixels):
+        """
+        Median-cut: repeatedly split the box with the widest channel range at its median.
+        """
+        boxes = [pixels.astype(np.float64)]
+        while len(boxes) < self.n_colors:
+            ranges = [np.ptp(box, axis=0).max() if len(box) > 1 else -1 for box in boxes]
+            index = int(np.argmax(ranges))
+            if ranges[index] <= 0:
+                break
+            
+            box = boxes.pop(index)
+            channel = int(np.argmax(np.ptp(box, axis=0)))
+            order = np.argsort(box[:, channel], kind='stable')
+            middle = len(box) // 2
+            boxes.extend([box[order[:middle]], box[order[middle:]]])
+        
+        palette = np.array([box.mean(axis=0) for box in boxes])
+        counts = np.array([len(box) for box in boxes], dtype=np.float64)
+        return palette, counts
+    
     def visualize_colors(self, colors, percentages=None, save_path=None):
         """
         Visualize the extracted colors.
@@ -125,12 +247,12 @@ class ColorExtractor:
             logger.error(f"Error visualizing colors: {str(e)}")
             return False
     
-    def get_color_palette(self, image_path, save_visualization=False, output_dir=None):
+    def get_color_palette(self, image, save_visualization=False, output_dir=None):
         """
         Extract and optionally visualize a color palette from an image.
         
         Args:
-            image_path (str): Path to the image file
+            image (str or ImageFrame): Path to the image file or decoded image frame
             save_visualization (bool): Whether to save the color visualization
             output_dir (str, optional): Directory to save the visualization
             
@@ -138,16 +260,14 @@ class ColorExtractor:
             dict: Color palette information including hex colors, RGB values, and percentages
         """
         # Extract colors
-        hex_colors, color_info = self.extract_colors(image_path)
+        hex_colors, color_info = self.extract_colors(image)
         
         if save_visualization and hex_colors and output_dir:
             # Create output directory if it doesn't exist
             os.makedirs(output_dir, exist_ok=True)
             
             # Generate output filename
-            base_name = os.path.basename(image_path)
-            file_name, _ = os.path.splitext(base_name)
-            output_path = os.path.join(output_dir, f"{file_name}_palette.png")
+            output_path = os.path.join(output_dir, f"{ImageFrame.source_name(image)}_palette.png")
             
             # Visualize and save
             self.visualize_colors(hex_colors, color_info['percentages'], output_path)
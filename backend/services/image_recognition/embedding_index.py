@@ -0,0 +1,203 @@
+import logging
+import threading
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class EmbeddingIndex:
+    """
+    Nearest-neighbour search over an EmbeddingStore by cosine similarity.
+    Small stores are scanned exhaustively. Once a store reaches
+    partition_threshold rows, an inverted-file index is built: rows are
+    partitioned around k-means centroids and a query only rescans the
+    rows of its nprobe nearest partitions, plus rows added since the
+    partitions were built. Partitions are trained in a background thread;
+    queries are answered by the exhaustive scan until they are ready and
+    by the previous partitions while they are rebuilt.
+    """
+
+    def __init__(self, store, partition_threshold=50000, nprobe=8, chunk_size=65536, seed=42):
+        """
+        Initialize the EmbeddingIndex.
+
+        Args:
+            store (EmbeddingStore): Store to search
+            partition_threshold (int): Row count above which the partitioned index is used
+            nprobe (int): Number of partitions scanned per query
+            chunk_size (int): Rows converted to float32 at a time during scans
+            seed (int): Random seed for partition training
+        """
+        self.store = store
+        self.partition_threshold = partition_threshold
+        self.nprobe = nprobe
+        self.chunk_size = chunk_size
+        self.seed = seed
+        self._lock = threading.Lock()
+        self._builder = None
+        self._centroids = None
+        self._partitions = None
+        self._indexed_rows = 0
+
+    def prepare(self, wait=False):
+        """
+        Start building the partitioned index if the store is large enough to need it.
+
+        Args:
+            wait (bool): Block until the build has finished
+
+        Returns:
+            bool: True if partitions are ready for queries
+        """
+        self._start_build(self.store.vectors())
+        builder = self._builder
+        if wait and builder is not None:
+            builder.join()
+        return self._centroids is not None
+
+    def search(self, query, k=10, exclude_rows=()):
+        """
+        Find the stored embeddings most similar to a query.
+
+        Args:
+            query (ndarray): Query embedding
+            k (int): Number of neighbours to return
+            exclude_rows (iterable): Rows to leave out of the results
+
+        Returns:
+            list: (row, similarity) pairs, most similar first
+        """
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        vectors = self.store.vectors()
+        if len(vectors) == 0:
+            return []
+
+        exclude_rows = set(int(row) for row in exclude_rows)
+        wanted = k + len(exclude_rows)
+
+        self._start_build(vectors)
+        if self._centroids is None:
+            rows, scores = self._scan(vectors, query, wanted)
+        else:
+            rows, scores = self._search_partitions(vectors, query, wanted)
+
+        results = [(int(row), float(score)) for row, score in zip(rows, scores) if int(row) not in exclude_rows]
+        return results[:k]
+
+    def _scan(self, vectors, query, k, rows=None):
+        """
+        Exhaustively score rows of the store.
+
+        Args:
+            vectors (ndarray): Stored vectors
+            query (ndarray): Normalized query
+            k (int): Number of neighbours to return
+            rows (ndarray, optional): Rows to score (defaults to all)
+
+        Returns:
+            tuple: Row and score arrays, best first
+        """
+        total = len(vectors) if rows is None else len(rows)
+        best_rows = np.zeros(0, dtype=np.int64)
+        best_scores = np.zeros(0, dtype=np.float32)
+
+        for start in range(0, total, self.chunk_size):
+            if rows is None:
+                chunk_rows = np.arange(start, min(start + self.chunk_size, total))
+                chunk = vectors[start:start + self.chunk_size]
+            else:
+                chunk_rows = rows[start:start + self.chunk_size]
+                chunk = vectors[chunk_rows]
+
+            scores = chunk.astype(np.float32) @ query
+            best_rows = np.concatenate([best_rows, chunk_rows])
+            best_scores = np.concatenate([best_scores, scores])
+            if len(best_scores) > k:
+                keep = np.argpartition(-best_scores, k)[:k]
+                best_rows, best_scores = best_rows[keep], best_scores[keep]
+
+        order = np.argsort(-best_scores)
+        return best_rows[order], best_scores[order]
+
+    def _search_partitions(self, vectors, query, k):
+        """
+        Score the rows in the partitions nearest to the query.
+        """
+        with self._lock:
+            centroids, partitions, indexed_rows = self._centroids, self._partitions, self._indexed_rows
+
+        nearest = np.argsort(-(centroids @ query))[:self.nprobe]
+        candidates = [partitions[index] for index in nearest]
+        candidates.append(np.arange(indexed_rows, len(vectors)))
+        return self._scan(vectors, query, k, rows=np.sort(np.concatenate(candidates)))
+
+    def _start_build(self, vectors):
+        """
+        Start a background partition build if the store needs one and none is running.
+
+        Partitions are built once the store reaches partition_threshold rows and
+        rebuilt once it has grown by half since they were trained.
+        """
+        count = len(vectors)
+        if count < self.partition_threshold:
+            return
+
+        with self._lock:
+            if self._builder is not None:
+                return
+            if self._centroids is not None and count <= self._indexed_rows * 1.5:
+                return
+            self._builder = threading.Thread(
+                target=self._build_partitions, args=(vectors,), name='embedding-index-build', daemon=True
+            )
+            self._builder.start()
+
+    def _build_partitions(self, vectors, iterations=10, sample_size=20000):
+        """
+        Build the partitions in the background thread and publish them when done.
+        """
+        try:
+            self._train_partitions(vectors, iterations, sample_size)
+        except Exception as e:
+            logger.error(f"Error building embedding index: {str(e)}")
+        finally:
+            with self._lock:
+                self._builder = None
+
+    def _train_partitions(self, vectors, iterations, sample_size):
+        """
+        Train partition centroids with spherical k-means and assign every row to one.
+        """
+        count = len(vectors)
+        n_partitions = max(1, int(np.sqrt(count)))
+        logger.info(f"Building embedding index with {n_partitions} partitions over {count} rows")
+
+        rng = np.random.default_rng(self.seed)
+        sample = vectors[np.sort(rng.choice(count, size=min(count, sample_size), replace=False))].astype(np.float32)
+        centroids = sample[rng.choice(len(sample), size=min(n_partitions, len(sample)), replace=False)]
+
+        for _ in range(iterations):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            for index in range(len(centroids)):
+                members = sample[assignments == index]
+                if len(members):
+                    centroid = members.mean(axis=0)
+                    norm = np.linalg.norm(centroid)
+                    centroids[index] = centroid / norm if norm > 0 else centroid
+
+        assignments = np.empty(count, dtype=np.int64)
+        for start in range(0, count, self.chunk_size):
+            chunk = vectors[start:start + self.chunk_size].astype(np.float32)
+            assignments[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+
+        order = np.argsort(assignments, kind='stable')
+        boundaries = np.searchsorted(assignments[order], np.arange(len(centroids) + 1))
+        partitions = [order[boundaries[index]:boundaries[index + 1]] for index in range(len(centroids))]
+
+        with self._lock:
+            self._centroids, self._partitions, self._indexed_rows = centroids, partitions, count
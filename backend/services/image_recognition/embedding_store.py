@@ -0,0 +1,239 @@
+import os
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class EmbeddingStore:
+    """
+    Persistent store of image embeddings.
+    Vectors are L2-normalized and kept as float16 rows of a memory-mapped
+    file, so hundreds of thousands of them can be scanned without loading
+    the file into memory. Row metadata (analysis id, image path and linked
+    projects) lives in a SQLite database next to it, which also serializes
+    row allocation between processes.
+    """
+
+    def __init__(self, store_dir, dimension=1280, initial_capacity=1024):
+        """
+        Initialize the EmbeddingStore.
+
+        Args:
+            store_dir (str): Directory holding the vector file and its metadata
+            dimension (int): Embedding dimension
+            initial_capacity (int): Number of rows allocated when the vector file is created
+        """
+        logger.info(f"Initializing EmbeddingStore in {store_dir}")
+        self.store_dir = store_dir
+        self.dimension = dimension
+        self.initial_capacity = initial_capacity
+        self.vectors_path = os.path.join(store_dir, 'vectors.f16')
+        self.metadata_path = os.path.join(store_dir, 'metadata.sqlite3')
+        self._vectors = None
+        self._map_lock = threading.Lock()
+        self._local = threading.local()
+
+        os.makedirs(store_dir, exist_ok=True)
+        self._initialize_schema()
+
+    def _connection(self):
+        """
+        Get the metadata connection of the current thread.
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.metadata_path, timeout=30)
+            connection.execute('PRAGMA journal_mode=WAL')
+            self._local.connection = connection
+        return connection
+
+    def _initialize_schema(self):
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS embeddings ('
+                'row INTEGER PRIMARY KEY, analysis_id TEXT UNIQUE NOT NULL, '
+                'image_path TEXT, created_at TEXT)'
+            )
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS embedding_projects ('
+                'analysis_id TEXT NOT NULL, project_id TEXT NOT NULL, '
+                'PRIMARY KEY (analysis_id, project_id))'
+            )
+
+    def __len__(self):
+        row = self._connection().execute('SELECT MAX(row) FROM embeddings').fetchone()
+        return 0 if row[0] is None else row[0] + 1
+
+    def add(self, analysis_id, embedding, image_path=None):
+        """
+        Store the embedding of an analyzed image.
+
+        Args:
+            analysis_id (str): Analysis identifier (image content hash)
+            embedding (ndarray): Embedding vector
+            image_path (str, optional): Path to the image
+
+        Returns:
+            int: Row of the embedding
+        """
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        if vector.shape[0] != self.dimension:
+            raise ValueError(f"Expected an embedding of dimension {self.dimension}, got {vector.shape[0]}")
+
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector = vector / norm
+
+        connection = self._connection()
+        with connection:
+            # Allocating the row is a single write, so processes adding the same
+            # analysis at once end up with one row instead of a constraint error.
+            # Rows are numbered from 0 so they index the vector file directly.
+            cursor = connection.execute(
+                'INSERT OR IGNORE INTO embeddings (row, analysis_id, image_path, created_at) '
+                'VALUES ((SELECT COALESCE(MAX(row) + 1, 0) FROM embeddings), ?, ?, ?)',
+                (analysis_id, image_path, datetime.now().isoformat())
+            )
+            row = connection.execute(
+                'SELECT row FROM embeddings WHERE analysis_id = ?', (analysis_id,)
+            ).fetchone()[0]
+
+            if cursor.rowcount == 0:
+                # Already stored; the vector depends only on the image content
+                if image_path:
+                    connection.execute(
+                        'UPDATE embeddings SET image_path = ? WHERE analysis_id = ?', (image_path, analysis_id)
+                    )
+                return row
+
+            vectors = self._map(row + 1)
+            vectors[row] = vector.astype(np.float16)
+            vectors.flush()
+
+        return row
+
+    def link_project(self, analysis_id, project_id):
+        """
+        Record that a project uses an analyzed image.
+
+        Args:
+            analysis_id (str): Analysis identifier
+            project_id (str): Project identifier
+        """
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                'INSERT OR IGNORE INTO embedding_projects (analysis_id, project_id) VALUES (?, ?)',
+                (analysis_id, project_id)
+            )
+
+    def get_row(self, analysis_id):
+        """
+        Get the row of an analysis.
+
+        Args:
+            analysis_id (str): Analysis identifier
+
+        Returns:
+            int: Row, or None if the analysis has no embedding
+        """
+        row = self._connection().execute(
+            'SELECT row FROM embeddings WHERE analysis_id = ?', (analysis_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def get_vector(self, analysis_id):
+        """
+        Get the stored embedding of an analysis.
+
+        Args:
+            analysis_id (str): Analysis identifier
+
+        Returns:
+            ndarray: Normalized float32 embedding, or None if the analysis has no embedding
+        """
+        row = self.get_row(analysis_id)
+        if row is None:
+            return None
+        return np.asarray(self.vectors()[row], dtype=np.float32)
+
+    def vectors(self):
+        """
+        Get the stored vectors.
+
+        Returns:
+            ndarray: Memory-mapped float16 array with one row per stored embedding
+        """
+        count = len(self)
+        if count == 0:
+            return np.zeros((0, self.dimension), dtype=np.float16)
+        return self._map(count)[:count]
+
+    def get_metadata(self, rows):
+        """
+        Get metadata for rows.
+
+        Args:
+            rows (list): Row numbers
+
+        Returns:
+            dict: Metadata (analysis id, image path, project ids) keyed by row
+        """
+        rows = [int(row) for row in rows]
+        if not rows:
+            return {}
+
+        connection = self._connection()
+        placeholders = ','.join('?' * len(rows))
+        metadata = {}
+        for row, analysis_id, image_path, created_at in connection.execute(
+            f'SELECT row, analysis_id, image_path, created_at FROM embeddings WHERE row IN ({placeholders})', rows
+        ):
+            metadata[row] = {
+                'analysis_id': analysis_id,
+                'image_path': image_path,
+                'created_at': created_at,
+                'project_ids': []
+            }
+
+        by_analysis = {entry['analysis_id']: entry for entry in metadata.values()}
+        placeholders = ','.join('?' * len(by_analysis))
+        for analysis_id, project_id in connection.execute(
+            f'SELECT analysis_id, project_id FROM embedding_projects WHERE analysis_id IN ({placeholders})',
+            list(by_analysis)
+        ):
+            by_analysis[analysis_id]['project_ids'].append(project_id)
+
+        return metadata
+
+    def _map(self, rows):
+        """
+        Get a memory map of the vector file covering at least the given number of rows.
+
+        The file grows by doubling; other processes may have grown it, in
+        which case it is re-mapped.
+        """
+        with self._map_lock:
+            if self._vectors is not None and self._vectors.shape[0] >= rows:
+                return self._vectors
+
+            row_bytes = self.dimension * np.dtype(np.float16).itemsize
+            file_rows = os.path.getsize(self.vectors_path) // row_bytes if os.path.exists(self.vectors_path) else 0
+
+            if file_rows < rows:
+                capacity = max(self.initial_capacity, file_rows)
+                while capacity < rows:
+                    capacity *= 2
+                with open(self.vectors_path, 'ab') as f:
+                    f.truncate(capacity * row_bytes)
+                file_rows = capacity
+                logger.info(f"Grew embedding store to {capacity} rows")
+
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float16, mode='r+', shape=(file_rows, self.dimension))
+            return self._vectors
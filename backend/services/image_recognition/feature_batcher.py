@@ -0,0 +1,143 @@
+import logging
+import queue
+import threading
+import time
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class FeatureBatcher:
+    """
+    Dynamic micro-batcher for model inference.
+    Concurrent requests are collected until max_batch_size inputs are pending
+    or the oldest one has waited max_latency seconds, then run through the
+    model in a single forward pass and the outputs handed back per request.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=8, max_latency=0.01):
+        """
+        Initialize the FeatureBatcher.
+
+        Args:
+            predict_fn (callable): Function mapping a stacked input batch to a batch of outputs
+            max_batch_size (int): Maximum number of inputs per forward pass
+            max_latency (float): Maximum seconds the oldest request waits for a batch to fill
+        """
+        logger.info(f"Initializing FeatureBatcher with batches of up to {max_batch_size}")
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_latency = max_latency
+        self._queue = queue.Queue()
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            'requests': 0,
+            'batches': 0,
+            'batch_sizes': {},
+            'total_queue_time': 0.0,
+            'max_queue_time': 0.0,
+            'total_inference_time': 0.0
+        }
+
+        self._worker = threading.Thread(target=self._worker_loop, name='feature-batcher', daemon=True)
+        self._worker.start()
+
+    def predict(self, x, timeout=None):
+        """
+        Run one input through the model as part of a batch.
+
+        Args:
+            x (ndarray): Single preprocessed input, without a batch dimension
+            timeout (float, optional): Maximum seconds to wait for the result
+
+        Returns:
+            ndarray: Model output for the input
+        """
+        request = {
+            'input': x,
+            'enqueued_at': time.perf_counter(),
+            'done': threading.Event(),
+            'result': None,
+            'error': None
+        }
+        self._queue.put(request)
+
+        if not request['done'].wait(timeout):
+            raise TimeoutError("Timed out waiting for batched inference")
+        if request['error'] is not None:
+            raise request['error']
+        return request['result']
+
+    def get_metrics(self):
+        """
+        Get batching metrics.
+
+        Returns:
+            dict: Request and batch counts, batch size distribution, and queue and inference times
+        """
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+            metrics['batch_sizes'] = dict(self._metrics['batch_sizes'])
+
+        batches = metrics['batches']
+        requests = metrics['requests']
+        metrics['mean_batch_size'] = requests / batches if batches else 0.0
+        metrics['mean_queue_time'] = metrics['total_queue_time'] / requests if requests else 0.0
+        metrics['mean_inference_time'] = metrics['total_inference_time'] / batches if batches else 0.0
+        metrics['pending'] = self._queue.qsize()
+        return metrics
+
+    def _worker_loop(self):
+        """
+        Collect pending requests into batches and run them until the process exits.
+        """
+        while True:
+            batch = [self._queue.get()]
+            deadline = batch[0]['enqueued_at'] + self.max_latency
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    # Past the deadline, only take requests that are already waiting
+                    if remaining > 0:
+                        batch.append(self._queue.get(timeout=remaining))
+                    else:
+                        batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        """
+        Run one forward pass and hand the outputs back to the waiting requests.
+
+        Args:
+            batch (list): Pending requests
+        """
+        started_at = time.perf_counter()
+        try:
+            outputs = self.predict_fn(np.stack([request['input'] for request in batch]))
+            for request, output in zip(batch, outputs):
+                request['result'] = output
+        except Exception as e:
+            logger.error(f"Error running inference batch of {len(batch)}: {str(e)}")
+            for request in batch:
+                request['error'] = e
+        finally:
+            finished_at = time.perf_counter()
+            self._record_batch(batch, started_at, finished_at)
+            for request in batch:
+                request['done'].set()
+
+    def _record_batch(self, batch, started_at, finished_at):
+        queue_times = [started_at - request['enqueued_at'] for request in batch]
+        with self._metrics_lock:
+            metrics = self._metrics
+            metrics['requests'] += len(batch)
+            metrics['batches'] += 1
+            metrics['batch_sizes'][len(batch)] = metrics['batch_sizes'].get(len(batch), 0) + 1
+            metrics['total_queue_time'] += sum(queue_times)
+            metrics['max_queue_time'] = max(metrics['max_queue_time'], max(queue_times))
+            metrics['total_inference_time'] += finished_at - started_at
@@ -1,10 +1,18 @@
 import os
 import logging
 import json
+import uuid
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from .color_extractor import ColorExtractor
 from .texture_analyzer import TextureAnalyzer
 from .shape_detector import ShapeDetector
 from .model_generator import ModelGenerator
+from .image_frame import ImageFrame
+from .analysis_cache import AnalysisCache
+from .embedding_store import EmbeddingStore
+from .embedding_index import EmbeddingIndex
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -16,99 +24,330 @@ class ImageAnalyzer:
     Integrates color extraction, texture analysis, shape detection, and 3D model generation.
     """
     
-    def __init__(self, output_dir="./output"):
+    # Bump when a change to the pipeline invalidates previously cached results
+    ANALYSIS_VERSION = 5
+    
+    # Visualizations rendered on demand by render_artifact
+    ARTIFACTS = ('palette', 'texture', 'shapes')
+    
+    # Analysis tiers: the stages run (the first always completes, even when
+    # a time budget runs out), their resolution and algorithms, and whether
+    # results are written to the output directory. 'preview' answers live
+    # previews with a palette and a rough shape class; 'full' uses the
+    # reference algorithms
+    TIERS = {
+        'preview': {
+            'stages': ('color', 'shape'),
+            'palette_method': 'histogram',
+            'palette_sample_size': 64,
+            'shape_mode': 'pyramid',
+            'shape_size': 256,
+            'save_results': False
+        },
+        'standard': {
+            'stages': ('color', 'shape', 'texture', 'model'),
+            'palette_method': 'histogram',
+            'palette_sample_size': 150,
+            'shape_mode': 'pyramid',
+            'shape_size': 512,
+            'save_results': True
+        },
+        'full': {
+            'stages': ('color', 'shape', 'texture', 'model'),
+            'palette_method': 'kmeans',
+            'palette_sample_size': 150,
+            'shape_mode': 'full',
+            'shape_size': 512,
+            'save_results': True
+        }
+    }
+    DEFAULT_TIER = 'standard'
+    
+    # Stages that only need the decoded frame and run in parallel; the
+    # model stage combines their results
+    INDEPENDENT_STAGES = ('color', 'shape', 'texture')
+    
+    def __init__(self, output_dir="./output", cache_dir=None, use_cache=True, stage_workers=None):
         """
         Initialize the ImageAnalyzer.
         
         Args:
             output_dir (str): Directory to save output files
+            cache_dir (str, optional): Directory for cached analysis results (defaults to output_dir/cache)
+            use_cache (bool): Whether to reuse results for previously analyzed image content
+            stage_workers (int, optional): Threads shared by the stages of all analyses
+                (defaults to the number of cores, at most 8)
         """
         logger.info("Initializing ImageAnalyzer")
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
         
-        # Initialize components
-        self.color_extractor = ColorExtractor(n_colors=5)
+        # Results are cached by image content, so re-uploads of the same photo skip the pipeline
+        self.analysis_cache = AnalysisCache(cache_dir or os.path.join(output_dir, 'cache')) if use_cache else None
+        
+        # Initialize components; color and shape settings differ per tier
+        self._tiers = {}
+        for tier, settings in self.TIERS.items():
+            self._tiers[tier] = {
+                'settings': settings,
+                'color': ColorExtractor(
+                    n_colors=5, method=settings['palette_method'], sample_size=settings['palette_sample_size']
+                ),
+                'shape': ShapeDetector(mode=settings['shape_mode'], size=settings['shape_size'])
+            }
+        self.color_extractor = self._tiers[self.DEFAULT_TIER]['color']
+        self.shape_detector = self._tiers[self.DEFAULT_TIER]['shape']
         self.texture_analyzer = TextureAnalyzer()
-        self.shape_detector = ShapeDetector()
         self.model_generator = ModelGenerator()
+        self._render_lock = threading.Lock()
+        
+        # OpenCV and NumPy release the GIL, so independent stages overlap on a shared pool
+        self.stage_workers = stage_workers or min(8, os.cpu_count() or 1)
+        self._stage_pool = ThreadPoolExecutor(max_workers=self.stage_workers, thread_name_prefix='analysis-stage')
+        
+        # Embeddings of analyzed images, searchable for visually similar references
+        self.embedding_store = EmbeddingStore(
+            os.path.join(output_dir, 'embeddings'), dimension=ModelGenerator.EMBEDDING_DIMENSION
+        )
+        self.embedding_index = EmbeddingIndex(self.embedding_store)
         
         logger.info("ImageAnalyzer initialized successfully")
     
-    def analyze_image(self, image_path, generate_visualizations=True):
+    def _tier_components(self, tier):
+        """
+        Get the settings and configured components of an analysis tier.
+        
+        Args:
+            tier (str): Analysis tier (one of TIERS)
+            
+        Returns:
+            dict: Tier settings with its color extractor and shape detector
+        """
+        if tier not in self._tiers:
+            raise ValueError(f"Unknown analysis tier: {tier}")
+        return self._tiers[tier]
+    
+    def _decode_size(self, tier=DEFAULT_TIER):
+        """
+        Get the largest size any stage of a tier resizes the image to.
+        
+        Args:
+            tier (str): Analysis tier
+            
+        Returns:
+            int: Edge length the image can be reduced to while decoding
+        """
+        components = self._tier_components(tier)
+        stage_sizes = {
+            'color': components['color'].sample_size,
+            'shape': components['shape'].size,
+            'texture': self.texture_analyzer.size,
+            'model': ModelGenerator.INPUT_SIZE
+        }
+        return max(stage_sizes[stage] for stage in components['settings']['stages'])
+    
+    def _analysis_config(self, generate_visualizations, tier=DEFAULT_TIER):
+        """
+        Get the analyzer settings that affect analysis results.
+        
+        Args:
+            generate_visualizations (bool): Whether visualization artifacts are offered
+            tier (str): Analysis tier
+            
+        Returns:
+            dict: Analyzer configuration used in cache keys
+        """
+        components = self._tier_components(tier)
+        return {
+            'version': self.ANALYSIS_VERSION,
+            'tier': tier,
+            'stages': list(components['settings']['stages']),
+            'n_colors': components['color'].n_colors,
+            'palette_method': components['color'].method,
+            'palette_sample_size': components['color'].sample_size,
+            'shape_mode': components['shape'].mode,
+            'shape_size': components['shape'].size,
+            'visualizations': bool(generate_visualizations)
+        }
+    
+    def register_image(self, image_path, analysis_id=None):
+        """
+        Register an image as the source of its visualization artifacts.
+        
+        Args:
+            image_path (str): Path to the image file
+            analysis_id (str, optional): Precomputed hash of the image content
+            
+        Returns:
+            str: Analysis identifier (the hash of the image content)
+        """
+        analysis_id = analysis_id or AnalysisCache.hash_content(image_path)
+        self._write_artifact_manifest(analysis_id, {'image_path': image_path})
+        return analysis_id
+    
+    def get_cached_analysis(self, image_path, generate_visualizations=True, analysis_id=None, tier=DEFAULT_TIER):
+        """
+        Get cached analysis results for an image with the same content.
+        
+        Args:
+            image_path (str): Path to the image file
+            generate_visualizations (bool): Whether visualization artifacts are required
+            analysis_id (str, optional): Precomputed hash of the image content
+            tier (str): Analysis tier
+            
+        Returns:
+            dict: Analysis results, or None if the image has not been analyzed
+        """
+        if not self.analysis_cache:
+            return None
+        # Without a precomputed hash the content is read from the file
+        if analysis_id is None and not os.path.exists(image_path):
+            return None
+        
+        try:
+            analysis_id = analysis_id or AnalysisCache.hash_content(image_path)
+            cache_key = AnalysisCache.make_key(analysis_id, self._analysis_config(generate_visualizations, tier))
+            cached_results = self.analysis_cache.get(cache_key)
+            if cached_results is None:
+                return None
+            
+            # Point artifact rendering at a copy of the image that still exists
+            if generate_visualizations:
+                self._write_artifact_manifest(analysis_id, {
+                    'image_path': image_path,
+                    'color_analysis': cached_results['color_analysis']
+                })
+            
+            cached_results['image_path'] = image_path
+            cached_results['cached'] = True
+            logger.info(f"Using cached analysis for image: {image_path}")
+            return cached_results
+            
+        except Exception as e:
+            logger.error(f"Error reading cached analysis: {str(e)}")
+            return None
+    
+    def analyze_image(self, image_path, generate_visualizations=True, analysis_id=None, tier=DEFAULT_TIER,
+                      time_budget=None, image_data=None):
         """
         Analyze an image and generate comprehensive analysis results.
         
+        Visualizations are not rendered here; the results name the available
+        artifacts, which render_artifact renders on first request.
+        
+        The tier chooses the stages and their settings. The color, shape and
+        texture stages run in parallel; a stage that fails is reported in
+        stage_errors while the others still return. With a time budget,
+        stages other than the first that have not finished when it runs out
+        are skipped. Partial results are returned but not cached.
+        
         Args:
             image_path (str): Path to the image file
-            generate_visualizations (bool): Whether to generate visualization files
+            generate_visualizations (bool): Whether to offer visualization artifacts
+            analysis_id (str, optional): Precomputed hash of the image content
+            tier (str): Analysis tier (one of TIERS)
+            time_budget (float, optional): Seconds available for the analysis
+            image_data (bytes, optional): Encoded image held in memory, decoded instead of
+                reading image_path (which may still be being written)
             
         Returns:
             dict: Comprehensive analysis results
         """
         try:
-            logger.info(f"Starting analysis of image: {image_path}")
+            start_time = time.perf_counter()
+            deadline = start_time + time_budget if time_budget else None
+            logger.info(f"Starting {tier} analysis of image: {image_path}")
+            
+            components = self._tier_components(tier)
+            settings = components['settings']
             
             # Check if image exists
-            if not os.path.exists(image_path):
+            if image_data is None and not os.path.exists(image_path):
                 raise FileNotFoundError(f"Image file not found: {image_path}")
             
+            # Reuse results for previously analyzed image content
+            analysis_id = analysis_id or AnalysisCache.hash_content(image_path if image_data is None else image_data)
+            cached_results = self.get_cached_analysis(image_path, generate_visualizations, analysis_id, tier)
+            if cached_results is not None:
+                return cached_results
+            
             # Create output directory for this image
             base_name = os.path.basename(image_path)
             file_name, _ = os.path.splitext(base_name)
-            image_output_dir = os.path.join(self.output_dir, file_name)
-            os.makedirs(image_output_dir, exist_ok=True)
-            
-            # Extract colors
-            logger.info("Extracting colors")
-            color_palette = self.color_extractor.get_color_palette(
-                image_path, 
-                save_visualization=generate_visualizations,
-                output_dir=image_output_dir
-            )
-            
-            # Analyze texture
-            logger.info("Analyzing texture")
-            texture_analysis = self.texture_analyzer.analyze_texture(image_path)
-            
-            if generate_visualizations:
-                self.texture_analyzer.save_texture_visualization(image_path, image_output_dir)
-            
-            # Detect shapes
-            logger.info("Detecting shapes")
-            shape_analysis = self.shape_detector.detect_shapes(image_path)
+            image_output_dir = None
+            if settings['save_results']:
+                image_output_dir = os.path.join(self.output_dir, file_name)
+                os.makedirs(image_output_dir, exist_ok=True)
+            
+            # Decode the image once, no larger than the stages need; every stage
+            # reuses the frame and its cached resizes
+            if image_data is None:
+                frame = ImageFrame.from_path(image_path, min_size=self._decode_size(tier))
+            else:
+                frame = ImageFrame.from_bytes(image_data, source_path=image_path, min_size=self._decode_size(tier))
             
-            if generate_visualizations:
-                self.shape_detector.save_shape_visualization(image_path, image_output_dir)
+            def run_stage(stage, stage_results=None):
+                return self._run_stage(
+                    stage, frame, components, stage_results, analysis_id, image_path, image_output_dir, file_name
+                )
             
-            # Generate model parameters
-            logger.info("Generating model parameters")
-            model_params = self.model_generator.generate_model_parameters(
-                image_path, shape_analysis, color_palette, texture_analysis
+            independent_stages = [stage for stage in settings['stages'] if stage in self.INDEPENDENT_STAGES]
+            stage_results, stage_errors, skipped_stages = self._run_parallel_stages(
+                independent_stages, run_stage, deadline
             )
             
-            # Save model parameters
-            model_file = self.model_generator.generate_model_file(
-                model_params, 
-                image_output_dir, 
-                filename=f"{file_name}_model.json"
-            )
+            if 'model' in settings['stages']:
+                if deadline is not None and time.perf_counter() >= deadline:
+                    skipped_stages.append('model')
+                # Model parameters are derived from all other stages
+                elif not all(stage in stage_results for stage in self.INDEPENDENT_STAGES):
+                    skipped_stages.append('model')
+                else:
+                    logger.info("Running model stage")
+                    try:
+                        stage_results['model'] = run_stage('model', stage_results)
+                    except Exception as e:
+                        logger.error(f"Error in model stage: {str(e)}")
+                        stage_errors['model'] = str(e)
+            
+            partial = bool(skipped_stages or stage_errors)
+            if skipped_stages:
+                logger.info(f"Time budget exhausted, skipped stages: {skipped_stages}")
+            
+            if generate_visualizations and 'color' in stage_results:
+                self._write_artifact_manifest(analysis_id, {
+                    'image_path': image_path,
+                    'color_analysis': stage_results['color']
+                })
             
             # Compile comprehensive analysis results
             analysis_results = {
+                'analysis_id': analysis_id,
                 'image_path': image_path,
-                'color_analysis': color_palette,
-                'texture_analysis': texture_analysis,
-                'shape_analysis': shape_analysis,
-                'model_parameters': model_params,
+                'tier': tier,
+                'color_analysis': stage_results.get('color'),
+                'texture_analysis': stage_results.get('texture'),
+                'shape_analysis': stage_results.get('shape'),
+                'model_parameters': stage_results.get('model'),
                 'output_directory': image_output_dir,
-                'visualization_files': self._get_visualization_files(image_output_dir) if generate_visualizations else []
+                'artifacts': list(self.ARTIFACTS) if generate_visualizations else [],
+                'completed_stages': [stage for stage in settings['stages'] if stage in stage_results],
+                'skipped_stages': skipped_stages,
+                'stage_errors': stage_errors,
+                'partial': partial
             }
             
-            # Save comprehensive analysis results
-            self._save_analysis_results(analysis_results, image_output_dir, file_name)
-            
-            logger.info(f"Image analysis completed successfully for {image_path}")
+            if not partial:
+                # Save comprehensive analysis results
+                if image_output_dir:
+                    self._save_analysis_results(analysis_results, image_output_dir, file_name)
+                
+                if self.analysis_cache:
+                    cache_key = AnalysisCache.make_key(analysis_id, self._analysis_config(generate_visualizations, tier))
+                    self.analysis_cache.put(cache_key, analysis_results)
+            
+            duration = time.perf_counter() - start_time
+            logger.info(f"Image analysis completed for {image_path} in {duration * 1000:.1f}ms")
             return analysis_results
             
         except Exception as e:
@@ -119,23 +358,259 @@ class ImageAnalyzer:
                 'status': 'failed'
             }
     
-    def _get_visualization_files(self, directory):
+    def _run_parallel_stages(self, stages, run_stage, deadline=None):
+        """
+        Run independent stages on the shared stage pool.
+        
+        Args:
+            stages (list): Stage names, most important first
+            run_stage (callable): Function running one stage by name
+            deadline (float, optional): time.perf_counter() value after which unfinished stages are skipped
+            
+        Returns:
+            dict: Results of the stages that completed
+            dict: Error messages of the stages that failed
+            list: Stages skipped because the deadline passed
+        """
+        if not stages:
+            return {}, {}, []
+        
+        futures = {stage: self._stage_pool.submit(run_stage, stage) for stage in stages}
+        timeout = None if deadline is None else max(0.0, deadline - time.perf_counter())
+        wait(list(futures.values()), timeout=timeout)
+        
+        # The first stage always completes so an exhausted budget still returns a result
+        wait([futures[stages[0]]])
+        
+        stage_results = {}
+        stage_errors = {}
+        skipped_stages = []
+        for stage, future in futures.items():
+            if not future.done():
+                # Queued stages are dropped; running ones finish in the background and are discarded
+                future.cancel()
+                skipped_stages.append(stage)
+            elif future.exception() is not None:
+                logger.error(f"Error in {stage} stage: {str(future.exception())}")
+                stage_errors[stage] = str(future.exception())
+            else:
+                stage_results[stage] = future.result()
+        
+        return stage_results, stage_errors, skipped_stages
+    
+    def _run_stage(self, stage, frame, components, stage_results, analysis_id, image_path, image_output_dir, file_name):
+        """
+        Run one analysis stage.
+        
+        Args:
+            stage (str): Stage name ('color', 'shape', 'texture' or 'model')
+            frame (ImageFrame): Decoded image frame
+            components (dict): Components of the analysis tier
+            stage_results (dict): Results of the stages run so far
+            analysis_id (str): Analysis identifier
+            image_path (str): Path to the image file
+            image_output_dir (str): Directory for output files, or None to write nothing
+            file_name (str): Base name for output files
+            
+        Returns:
+            dict: Stage results
+        """
+        if stage == 'color':
+            return components['color'].get_color_palette(frame)
+        elif stage == 'shape':
+            return components['shape'].detect_shapes(frame)
+        elif stage == 'texture':
+            return self.texture_analyzer.analyze_texture(frame)
+        elif stage == 'model':
+            # Extract features once for both the model parameters and the similarity index
+            features = self.model_generator.extract_features(frame)
+            self._store_embedding(analysis_id, features, image_path)
+            
+            model_params = self.model_generator.generate_model_parameters(
+                frame, stage_results['shape'], stage_results['color'], stage_results['texture'], features=features
+            )
+            
+            # Save model parameters
+            if image_output_dir:
+                self.model_generator.generate_model_file(
+                    model_params,
+                    image_output_dir,
+                    filename=f"{file_name}_model.json"
+                )
+            return model_params
+        else:
+            raise ValueError(f"Unknown analysis stage: {stage}")
+    
+    def _store_embedding(self, analysis_id, features, image_path):
+        """
+        Add the embedding of an analyzed image to the similarity index.
+        
+        Args:
+            analysis_id (str): Analysis identifier
+            features (ndarray): Extracted features
+            image_path (str): Path to the image file
+        """
+        try:
+            embedding = self.model_generator.compute_embedding(features)
+            if embedding is not None:
+                self.embedding_store.add(analysis_id, embedding, image_path)
+        except Exception as e:
+            logger.error(f"Error storing image embedding: {str(e)}")
+    
+    def link_project(self, analysis_id, project_id):
+        """
+        Record that a project uses an analyzed image, for similarity search results.
+        
+        Args:
+            analysis_id (str): Analysis identifier
+            project_id (str): Project identifier
+        """
+        try:
+            self.embedding_store.link_project(analysis_id, project_id)
+        except Exception as e:
+            logger.error(f"Error linking image to project: {str(e)}")
+    
+    def find_similar_images(self, analysis_id, limit=10):
         """
-        Get list of visualization files in the output directory.
+        Find previously analyzed images that look like an analyzed image.
         
         Args:
-            directory (str): Directory to search for visualization files
+            analysis_id (str): Analysis identifier of the query image
+            limit (int): Maximum number of results
             
         Returns:
-            list: Paths to visualization files
+            list: Similar images with analysis id, image path, linked project ids and
+                similarity, most similar first; None if the image has no embedding
         """
-        visualization_files = []
+        row = self.embedding_store.get_row(analysis_id)
+        if row is None:
+            return None
+        
+        query = self.embedding_store.get_vector(analysis_id)
+        neighbours = self.embedding_index.search(query, k=limit, exclude_rows=[row])
+        metadata = self.embedding_store.get_metadata([neighbour_row for neighbour_row, _ in neighbours])
         
-        for file in os.listdir(directory):
-            if file.endswith(('.png', '.jpg', '.jpeg')):
-                visualization_files.append(os.path.join(directory, file))
+        similar_images = []
+        for neighbour_row, similarity in neighbours:
+            if neighbour_row in metadata:
+                similar_images.append(dict(metadata[neighbour_row], similarity=similarity))
+        return similar_images
+    
+    def render_artifact(self, analysis_id, artifact):
+        """
+        Get a visualization artifact, rendering and caching it on first request.
         
-        return visualization_files
+        Args:
+            analysis_id (str): Analysis identifier returned with the analysis results
+            artifact (str): Artifact name ('palette', 'texture' or 'shapes')
+            
+        Returns:
+            str: Path to the rendered PNG file, or None if the image is unknown
+        """
+        if artifact not in self.ARTIFACTS:
+            raise ValueError(f"Unknown artifact: {artifact}")
+        
+        artifact_dir = self._artifact_dir(analysis_id)
+        artifact_path = os.path.join(artifact_dir, f"{artifact}.png")
+        if os.path.exists(artifact_path):
+            return artifact_path
+        
+        # pyplot keeps global figure state, so renders are serialized
+        with self._render_lock:
+            if os.path.exists(artifact_path):
+                return artifact_path
+            
+            manifest = self._read_artifact_manifest(analysis_id)
+            if not manifest or not os.path.exists(manifest.get('image_path', '')):
+                return None
+            
+            logger.info(f"Rendering {artifact} artifact for analysis {analysis_id}")
+            frame = ImageFrame.from_path(manifest['image_path'], min_size=self._decode_size())
+            
+            # Render under a temporary name so readers never see a partial file
+            temp_name = f".{artifact}-{uuid.uuid4().hex}.png"
+            temp_path = os.path.join(artifact_dir, temp_name)
+            
+            if artifact == 'palette':
+                color_palette = manifest.get('color_analysis') or self.color_extractor.get_color_palette(frame)
+                self.color_extractor.visualize_colors(
+                    color_palette['hex_colors'], color_palette['percentages'], temp_path
+                )
+            elif artifact == 'texture':
+                self.texture_analyzer.save_texture_visualization(frame, artifact_dir, filename=temp_name)
+            else:
+                self.shape_detector.save_shape_visualization(frame, artifact_dir, filename=temp_name)
+            
+            if not os.path.exists(temp_path):
+                logger.error(f"Error rendering {artifact} artifact for analysis {analysis_id}")
+                return None
+            
+            os.replace(temp_path, artifact_path)
+            return artifact_path
+    
+    def artifact_source_pending(self, analysis_id):
+        """
+        Check whether an analysis is known but its source image is not on disk yet.
+        
+        Uploads are analyzed from memory while the original is written in the
+        background, possibly by another server worker.
+        
+        Args:
+            analysis_id (str): Analysis identifier
+            
+        Returns:
+            bool: True if the artifact manifest exists but its source image does not
+        """
+        manifest = self._read_artifact_manifest(analysis_id)
+        return bool(manifest) and not os.path.exists(manifest.get('image_path', ''))
+    
+    def _artifact_dir(self, analysis_id):
+        """
+        Get the artifact directory of an analysis.
+        
+        Args:
+            analysis_id (str): Analysis identifier
+            
+        Returns:
+            str: Directory path
+        """
+        if len(analysis_id) != 64 or any(c not in '0123456789abcdef' for c in analysis_id):
+            raise ValueError(f"Invalid analysis id: {analysis_id}")
+        return os.path.join(self.output_dir, 'artifacts', analysis_id)
+    
+    def _write_artifact_manifest(self, analysis_id, manifest):
+        """
+        Record what artifact rendering needs for an analysis.
+        
+        Args:
+            analysis_id (str): Analysis identifier
+            manifest (dict): Source image path and optional color analysis
+        """
+        artifact_dir = self._artifact_dir(analysis_id)
+        os.makedirs(artifact_dir, exist_ok=True)
+        
+        manifest_path = os.path.join(artifact_dir, 'manifest.json')
+        temp_path = f"{manifest_path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(temp_path, manifest_path)
+    
+    def _read_artifact_manifest(self, analysis_id):
+        """
+        Read the artifact manifest of an analysis.
+        
+        Args:
+            analysis_id (str): Analysis identifier
+            
+        Returns:
+            dict: Manifest, or None if the analysis is unknown
+        """
+        manifest_path = os.path.join(self._artifact_dir(analysis_id), 'manifest.json')
+        try:
+            with open(manifest_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
     
     def _save_analysis_results(self, analysis_results, output_dir, file_name):
         """
@@ -168,7 +643,7 @@ class ImageAnalyzer:
                 },
                 'model_parameters': analysis_results['model_parameters'],
                 'output_directory': analysis_results['output_directory'],
-                'visualization_files': analysis_results['visualization_files']
+                'artifacts': analysis_results['artifacts']
             }
             
             # Save to JSON file
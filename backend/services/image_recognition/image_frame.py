@@ -0,0 +1,267 @@
+import cv2
+import numpy as np
+from PIL import Image, ImageOps
+import os
+import io
+import logging
+import threading
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class ImageFrame:
+    """
+    Image decoded once and shared by all analysis stages.
+    Derived representations (RGB, BGR, grayscale, resizes and blurs) are
+    computed lazily on first use and cached, so each stage reuses the work
+    of the stages before it instead of re-reading the file. Each value is
+    computed under its own lock, so stages running in parallel threads
+    only wait for the values they share.
+    """
+
+    # Modes Image.reduce can shrink after a full-resolution decode
+    REDUCIBLE_MODES = ('L', 'RGB', 'RGBA', 'LA')
+
+    def __init__(self, image, source_path=None, original_size=None):
+        """
+        Initialize the ImageFrame.
+
+        Args:
+            image (PIL.Image.Image): Decoded image
+            source_path (str, optional): Path the image was loaded from
+            original_size (tuple, optional): (width, height) of the file before reduced decoding
+        """
+        self.image = ImageOps.exif_transpose(image)
+        self.source_path = source_path
+        
+        # Keep the original size in display orientation
+        original_size = original_size or image.size
+        if self.image.size != image.size:
+            original_size = original_size[::-1]
+        self.original_size = tuple(original_size)
+        self._cache = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_path(cls, image_path, min_size=None):
+        """
+        Decode an image file.
+
+        With min_size, JPEGs are decoded at the smallest DCT scale (1/2, 1/4
+        or 1/8) that still covers it, and other formats are reduced right
+        after decoding, so the arrays the stages work on no longer grow with
+        the original megapixels.
+
+        Args:
+            image_path (str): Path to the image file
+            min_size (int or tuple, optional): Largest edge length or (width, height)
+                any consumer resizes the image to
+
+        Returns:
+            ImageFrame: Decoded image frame
+        """
+        logger.info(f"Loading image from {image_path}")
+        with Image.open(image_path) as img:
+            return cls._decode(img, image_path, min_size)
+
+    @classmethod
+    def from_bytes(cls, data, source_path=None, min_size=None):
+        """
+        Decode an image held in memory, such as an upload that has not been written to disk.
+
+        Args:
+            data (bytes): Encoded image
+            source_path (str, optional): Path the image is (or will be) stored at
+            min_size (int or tuple, optional): Largest edge length or (width, height)
+                any consumer resizes the image to
+
+        Returns:
+            ImageFrame: Decoded image frame
+        """
+        logger.info(f"Decoding {len(data)} bytes for {source_path or 'in-memory image'}")
+        # BytesIO shares an immutable bytes buffer instead of copying it
+        with Image.open(io.BytesIO(data)) as img:
+            return cls._decode(img, source_path, min_size)
+
+    @classmethod
+    def _decode(cls, img, source_path, min_size):
+        """
+        Load an opened image, reduced to min_size when given.
+        """
+        original_size = img.size
+        if min_size is None:
+            img.load()
+            return cls(img, source_path=source_path)
+        
+        if isinstance(min_size, int):
+            min_size = (min_size, min_size)
+        
+        # Decoder-level downscaling; a no-op for formats without it
+        img.draft(None, min_size)
+        img.load()
+        
+        factor = min(img.size[0] // min_size[0], img.size[1] // min_size[1])
+        if factor >= 2 and img.mode in cls.REDUCIBLE_MODES:
+            img = img.reduce(factor)
+        
+        return cls(img, source_path=source_path, original_size=original_size)
+
+    @classmethod
+    def from_source(cls, image, min_size=None):
+        """
+        Get an ImageFrame for a path or an existing frame.
+
+        Args:
+            image (str or ImageFrame): Path to the image file or decoded image frame
+            min_size (int or tuple, optional): Size the image may be reduced to when decoding a path
+
+        Returns:
+            ImageFrame: Decoded image frame
+        """
+        if isinstance(image, cls):
+            return image
+        if not os.path.exists(image):
+            raise ValueError(f"Could not load image from {image}")
+        return cls.from_path(image, min_size=min_size)
+
+    @property
+    def name(self):
+        """
+        Base name used for output files derived from this image.
+        """
+        if not self.source_path:
+            return 'image'
+        file_name, _ = os.path.splitext(os.path.basename(self.source_path))
+        return file_name
+
+    @classmethod
+    def source_name(cls, image):
+        """
+        Get the output file base name for a path or an existing frame.
+
+        Args:
+            image (str or ImageFrame): Path to the image file or decoded image frame
+
+        Returns:
+            str: Base name without extension
+        """
+        if isinstance(image, cls):
+            return image.name
+        file_name, _ = os.path.splitext(os.path.basename(image))
+        return file_name
+
+    @property
+    def size(self):
+        """
+        Original (width, height) of the image.
+        """
+        return self.original_size
+
+    @property
+    def decoded_size(self):
+        """
+        (width, height) of the decoded pixels, smaller than the original after reduced decoding.
+        """
+        return self.image.size
+
+    def _cached(self, key, compute):
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if key not in self._cache:
+                self._cache[key] = compute()
+            return self._cache[key]
+    
+    def derived(self, key, compute):
+        """
+        Get a value derived from the image, computing it on first use.
+        
+        Args:
+            key (hashable): Cache key identifying the derived value
+            compute (callable): Function called without arguments to compute the value
+            
+        Returns:
+            object: Cached derived value
+        """
+        return self._cached(('derived', key), compute)
+
+    @property
+    def rgb(self):
+        """
+        Full-resolution RGB pixel array.
+        """
+        return self._cached('rgb', lambda: np.array(self.image.convert('RGB')))
+
+    @property
+    def bgr(self):
+        """
+        Full-resolution BGR pixel array, as returned by cv2.imread.
+        """
+        return self._cached('bgr', lambda: cv2.cvtColor(self.rgb, cv2.COLOR_RGB2BGR))
+
+    @property
+    def gray(self):
+        """
+        Full-resolution grayscale pixel array.
+        """
+        return self._cached('gray', lambda: cv2.cvtColor(self.rgb, cv2.COLOR_RGB2GRAY))
+
+    @property
+    def alpha(self):
+        """
+        Full-resolution alpha channel, or None if the image has no transparency.
+        """
+        def compute():
+            if self.image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in self.image.info:
+                return np.array(self.image.convert('RGBA'))[:, :, 3]
+            return None
+        return self._cached('alpha', compute)
+
+    def resized(self, size, mode='rgb'):
+        """
+        Get a resized representation of the image.
+
+        Args:
+            size (int or tuple): Target size as an edge length or (width, height)
+            mode (str): Representation ('rgb', 'bgr', 'gray' or 'alpha')
+
+        Returns:
+            ndarray: Resized pixel array, or None for 'alpha' on opaque images
+        """
+        if isinstance(size, int):
+            size = (size, size)
+
+        def compute():
+            source = getattr(self, mode)
+            if source is None:
+                return None
+            interpolation = cv2.INTER_NEAREST if mode == 'alpha' else cv2.INTER_LINEAR
+            return cv2.resize(source, size, interpolation=interpolation)
+
+        return self._cached(('resized', mode, size), compute)
+
+    def blurred(self, size, kernel_size=5):
+        """
+        Get a Gaussian-blurred grayscale resize of the image.
+
+        Args:
+            size (int or tuple): Target size as an edge length or (width, height)
+            kernel_size (int): Gaussian kernel size
+
+        Returns:
+            ndarray: Blurred grayscale pixel array
+        """
+        if isinstance(size, int):
+            size = (size, size)
+
+        return self._cached(
+            ('blurred', size, kernel_size),
+            lambda: cv2.GaussianBlur(self.resized(size, 'gray'), (kernel_size, kernel_size), 0)
+        )
@@ -1,12 +1,10 @@
 import os
 import logging
+import threading
 import numpy as np
-from PIL import Image
-import tensorflow as tf
-from tensorflow.keras.applications import MobileNetV2
-from tensorflow.keras.applications.mobilenet_v2 import preprocess_input
-from tensorflow.keras.preprocessing import image as keras_image
 import json
+from .image_frame import ImageFrame
+from .feature_batcher import FeatureBatcher
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -17,12 +15,44 @@ class ModelGenerator:
     Class for generating 3D models or sketches from reference images.
     """
     
-    def __init__(self):
+    # Channels of the MobileNetV2 feature map, i.e. the size of pooled embeddings
+    EMBEDDING_DIMENSION = 1280
+    
+    # Edge length of the MobileNetV2 input
+    INPUT_SIZE = 224
+    
+    def __init__(self, max_batch_size=8, max_batch_latency=0.01):
         """
         Initialize the ModelGenerator.
+        
+        The feature extraction model is loaded on first use (or by
+        load_feature_extractor), so TensorFlow is only imported when needed.
+        
+        Args:
+            max_batch_size (int): Maximum number of images per feature extraction pass
+            max_batch_latency (float): Maximum seconds an image waits for its batch to fill
         """
         logger.info("ModelGenerator initialized")
-        self._load_feature_extractor()
+        self.model = None
+        self.batcher = None
+        self.max_batch_size = max_batch_size
+        self.max_batch_latency = max_batch_latency
+        self._model_loaded = False
+        self._model_lock = threading.Lock()
+        self._preprocess_input = None
+    
+    def load_feature_extractor(self):
+        """
+        Load the feature extraction model if it has not been loaded yet.
+        
+        Returns:
+            Model: Feature extraction model, or None if it could not be loaded
+        """
+        with self._model_lock:
+            if not self._model_loaded:
+                self._load_feature_extractor()
+                self._model_loaded = True
+        return self.model
     
     def _load_feature_extractor(self):
         """
@@ -30,35 +60,47 @@ class ModelGenerator:
         """
         try:
             logger.info("Loading pre-trained feature extraction model")
+            from tensorflow.keras.applications import MobileNetV2
+            from tensorflow.keras.applications.mobilenet_v2 import preprocess_input
+            
             # Use MobileNetV2 as a feature extractor (lightweight and fast)
-            self.model = MobileNetV2(weights='imagenet', include_top=False, input_shape=(224, 224, 3))
+            self.model = MobileNetV2(weights='imagenet', include_top=False, input_shape=(self.INPUT_SIZE, self.INPUT_SIZE, 3))
+            self._preprocess_input = preprocess_input
+            
+            # Concurrent extractions share forward passes
+            model = self.model
+            self.batcher = FeatureBatcher(
+                lambda batch: model.predict(batch, verbose=0),
+                max_batch_size=self.max_batch_size,
+                max_latency=self.max_batch_latency
+            )
             logger.info("Feature extraction model loaded successfully")
         except Exception as e:
             logger.error(f"Error loading feature extraction model: {str(e)}")
             self.model = None
     
-    def extract_features(self, image_path):
+    def extract_features(self, image):
         """
         Extract features from an image using a pre-trained model.
         
         Args:
-            image_path (str): Path to the image file
+            image (str or ImageFrame): Path to the image file or decoded image frame
             
         Returns:
             ndarray: Extracted features
         """
         try:
-            if self.model is None:
+            model = self.load_feature_extractor()
+            if model is None:
                 raise ValueError("Feature extraction model not loaded")
             
-            # Load and preprocess the image
-            img = keras_image.load_img(image_path, target_size=(224, 224))
-            x = keras_image.img_to_array(img)
-            x = np.expand_dims(x, axis=0)
-            x = preprocess_input(x)
+            # Load and preprocess the image (decoded once and shared with the other stages)
+            frame = ImageFrame.from_source(image, min_size=self.INPUT_SIZE)
+            x = frame.resized(self.INPUT_SIZE, 'rgb').astype(np.float32)
+            x = self._preprocess_input(x)
             
-            # Extract features
-            features = self.model.predict(x)
+            # Extract features in a batch with any concurrent requests
+            features = self.batcher.predict(x)
             
             # Flatten features for easier processing
             flattened_features = features.flatten()
@@ -69,24 +111,49 @@ class ModelGenerator:
             logger.error(f"Error extracting features: {str(e)}")
             return np.array([])
     
-    def generate_model_parameters(self, image_path, shape_analysis, color_analysis, texture_analysis):
+    def compute_embedding(self, features):
+        """
+        Pool extracted features into a compact image embedding.
+        
+        Args:
+            features (ndarray): Flattened feature map returned by extract_features
+            
+        Returns:
+            ndarray: Embedding averaged over spatial positions, or None if there are no features
+        """
+        if features is None or len(features) == 0:
+            return None
+        return np.asarray(features, dtype=np.float32).reshape(-1, self.EMBEDDING_DIMENSION).mean(axis=0)
+    
+    def get_feature_metrics(self):
+        """
+        Get feature extraction batching metrics.
+        
+        Returns:
+            dict: Batching metrics, or an empty dict if the model is not loaded
+        """
+        return self.batcher.get_metrics() if self.batcher else {}
+    
+    def generate_model_parameters(self, image, shape_analysis, color_analysis, texture_analysis, features=None):
         """
         Generate 3D model parameters based on image analysis.
         
         Args:
-            image_path (str): Path to the image file
+            image (str or ImageFrame): Path to the image file or decoded image frame
             shape_analysis (dict): Shape analysis results
             color_analysis (dict): Color analysis results
             texture_analysis (dict): Texture analysis results
+            features (ndarray, optional): Features already extracted from the image
             
         Returns:
             dict: 3D model parameters
         """
         try:
-            logger.info(f"Generating model parameters for {image_path}")
+            logger.info(f"Generating model parameters for {ImageFrame.source_name(image)}")
             
             # Extract features from the image
-            features = self.extract_features(image_path)
+            if features is None:
+                features = self.extract_features(image)
             
             # Generate basic model parameters
             model_params = {
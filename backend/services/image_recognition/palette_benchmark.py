@@ -0,0 +1,102 @@
+import sys
+import logging
+import time
+import json
+import numpy as np
+from PIL import Image
+from .color_extractor import ColorExtractor
+from .image_frame import ImageFrame
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def palette_error(pixels, palette):
+    """
+    Mean distance from each pixel to its nearest palette color.
+
+    Args:
+        pixels (ndarray): Pixel array of shape (n, 3)
+        palette (ndarray): Palette colors of shape (k, 3)
+
+    Returns:
+        float: Mean Euclidean RGB quantization error
+    """
+    pixels = pixels.astype(np.float32)
+    palette = np.asarray(palette, dtype=np.float32)
+    distances = ((pixels[:, None, :] - palette[None, :, :]) ** 2).sum(axis=2)
+    return float(np.sqrt(distances.min(axis=1)).mean())
+
+def synthetic_images(count=8, size=(400, 300), seed=0):
+    """
+    Generate reproducible test images made of color blocks with noise.
+
+    Args:
+        count (int): Number of images
+        size (tuple): Image (width, height)
+        seed (int): Random seed
+
+    Returns:
+        list: ImageFrame objects
+    """
+    rng = np.random.default_rng(seed)
+    width, height = size
+    frames = []
+    for index in range(count):
+        pixels = np.zeros((height, width, 3), dtype=np.float32)
+        n_blocks = rng.integers(3, 9)
+        for _ in range(n_blocks):
+            x0, y0 = rng.integers(0, width), rng.integers(0, height)
+            x1, y1 = x0 + rng.integers(40, width), y0 + rng.integers(40, height)
+            pixels[y0:y1, x0:x1] = rng.integers(0, 256, size=3)
+        pixels += rng.normal(scale=8.0, size=pixels.shape)
+        image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+        frames.append(ImageFrame(image, source_path=f"synthetic_{index}.png"))
+    return frames
+
+def run_benchmark(images=None, n_colors=5, methods=ColorExtractor.METHODS, repeats=3):
+    """
+    Compare palette algorithms against full k-means.
+
+    Args:
+        images (list, optional): Image paths or ImageFrames (synthetic images if not set)
+        n_colors (int): Palette size
+        methods (tuple): Palette algorithms to compare
+        repeats (int): Timed runs per image and method
+
+    Returns:
+        dict: Per method, the median latency in milliseconds, the mean
+            quantization error and that error relative to k-means
+    """
+    frames = [ImageFrame.from_source(image) for image in images] if images else synthetic_images()
+    extractor = ColorExtractor(n_colors=n_colors)
+    pixel_sets = [extractor.get_pixels(frame) for frame in frames]
+
+    results = {}
+    for method in methods:
+        latencies = []
+        errors = []
+        for pixels in pixel_sets:
+            for _ in range(repeats):
+                start_time = time.perf_counter()
+                palette, _ = extractor.compute_palette(pixels, method)
+                latencies.append((time.perf_counter() - start_time) * 1000)
+            errors.append(palette_error(pixels, palette))
+        results[method] = {
+            'median_ms': float(np.median(latencies)),
+            'mean_error': float(np.mean(errors))
+        }
+
+    reference = results.get('kmeans')
+    for method, result in results.items():
+        if reference:
+            result['speedup'] = reference['median_ms'] / result['median_ms'] if result['median_ms'] else None
+            result['relative_error'] = result['mean_error'] / reference['mean_error'] if reference['mean_error'] else None
+
+    return results
+
+
+if __name__ == "__main__":
+    # Example usage: python -m services.image_recognition.palette_benchmark [image ...]
+    benchmark = run_benchmark(sys.argv[1:] or None)
+    print(json.dumps(benchmark, indent=2))
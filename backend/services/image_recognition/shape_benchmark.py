@@ -0,0 +1,95 @@
+import sys
+import logging
+import time
+import json
+import numpy as np
+import cv2
+from PIL import Image
+from .shape_detector import ShapeDetector
+from .image_frame import ImageFrame
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Result fields compared against full-resolution detection
+COMPARED_FIELDS = ('dominant_shapes', 'shape_count', 'has_straight_lines', 'has_curves')
+
+def synthetic_shapes(kind, count=3, size=1024, seed=0):
+    """
+    Draw reproducible filled shapes of one kind on a light background.
+
+    Args:
+        kind (str): 'circle', 'square' or 'triangle'
+        count (int): Number of shapes
+        size (int): Image width and height
+        seed (int): Random seed
+
+    Returns:
+        Image: Synthetic image
+    """
+    rng = np.random.default_rng(seed)
+    pixels = np.full((size, size, 3), 235, dtype=np.uint8)
+    for _ in range(count):
+        cx, cy = (int(value) for value in rng.integers(150, size - 150, 2))
+        radius = int(rng.integers(50, 110))
+        color = tuple(int(value) for value in rng.integers(0, 120, 3))
+        if kind == 'circle':
+            cv2.circle(pixels, (cx, cy), radius, color, -1)
+        elif kind == 'square':
+            cv2.rectangle(pixels, (cx - radius, cy - radius), (cx + radius, cy + radius), color, -1)
+        else:
+            triangle = np.array([[cx, cy - radius], [cx - radius, cy + radius], [cx + radius, cy + radius]], np.int32)
+            cv2.fillPoly(pixels, [triangle], color)
+    return Image.fromarray(pixels)
+
+def run_benchmark(images=None, modes=ShapeDetector.MODES, repeats=5):
+    """
+    Compare shape detection modes against full-resolution detection.
+
+    Args:
+        images (list, optional): Image paths or ImageFrames (synthetic shapes if not set)
+        modes (tuple): Detection modes to compare
+        repeats (int): Timed runs per image and mode
+
+    Returns:
+        dict: Per mode, the median latency in milliseconds, the speedup over
+            full mode and the share of images whose results match full mode
+    """
+    if images:
+        sources = [ImageFrame.from_source(image).image for image in images]
+    else:
+        sources = [synthetic_shapes(kind) for kind in ('circle', 'square', 'triangle')]
+
+    detectors = {mode: ShapeDetector(mode=mode) for mode in set(modes) | {'full'}}
+    latencies = {mode: [] for mode in detectors}
+    outputs = {mode: [] for mode in detectors}
+
+    for image in sources:
+        for mode, detector in detectors.items():
+            for _ in range(repeats):
+                # A fresh frame per run so cached derivations are not shared between runs
+                frame = ImageFrame(image)
+                start_time = time.perf_counter()
+                shapes = detector.detect_shapes(frame)
+                latencies[mode].append((time.perf_counter() - start_time) * 1000)
+            outputs[mode].append({field: shapes.get(field) for field in COMPARED_FIELDS})
+
+    reference_ms = float(np.median(latencies['full']))
+    results = {}
+    for mode in modes:
+        median_ms = float(np.median(latencies[mode]))
+        matches = sum(output == reference for output, reference in zip(outputs[mode], outputs['full']))
+        results[mode] = {
+            'median_ms': median_ms,
+            'speedup': reference_ms / median_ms if median_ms else None,
+            'agreement': matches / len(sources)
+        }
+
+    return results
+
+
+if __name__ == "__main__":
+    # Example usage: python -m services.image_recognition.shape_benchmark [image ...]
+    benchmark = run_benchmark(sys.argv[1:] or None)
+    print(json.dumps(benchmark, indent=2))
@@ -1,8 +1,8 @@
 import cv2
 import numpy as np
-from PIL import Image
 import logging
 import os
+from .image_frame import ImageFrame
 from skimage.feature import canny
 from skimage.transform import hough_line, hough_line_peaks
 from skimage.measure import find_contours, approximate_polygon
@@ -17,53 +17,76 @@ class ShapeDetector:
     Class for detecting and analyzing shapes in images.
     """
     
-    def __init__(self):
+    # 'full' runs every detector on the whole image at full resolution;
+    # 'pyramid' finds candidate regions at low resolution and only runs
+    # edge, contour and circle detection on those regions at full resolution
+    MODES = ('full', 'pyramid')
+    
+    def __init__(self, mode='pyramid', size=512, coarse_size=128, max_regions=16, max_region_coverage=0.5):
         """
         Initialize the ShapeDetector.
+        
+        Args:
+            mode (str): Detection mode (one of MODES)
+            size (int): Edge length of the full-resolution analysis image
+            coarse_size (int): Edge length of the low-resolution image used to find regions
+            max_regions (int): Above this many regions the whole image is analyzed at full resolution
+            max_region_coverage (float): Above this fraction of the image covered by regions,
+                the whole image is analyzed at full resolution
         """
-        logger.info("ShapeDetector initialized")
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown shape detection mode: {mode}")
+        
+        self.mode = mode
+        self.size = size
+        self.coarse_size = coarse_size
+        self.max_regions = max_regions
+        self.max_region_coverage = max_region_coverage
+        logger.info(f"ShapeDetector initialized in {mode} mode")
     
-    def detect_shapes(self, image_path):
+    def detect_shapes(self, image):
         """
         Detect and analyze shapes in an image.
         
         Args:
-            image_path (str): Path to the image file
+            image (str or ImageFrame): Path to the image file or decoded image frame
             
         Returns:
             dict: Shape analysis results including dominant shapes, edges, and contours
         """
         try:
-            # Load image
-            logger.info(f"Loading image from {image_path}")
-            img = cv2.imread(image_path)
-            if img is None:
-                raise ValueError(f"Could not load image from {image_path}")
-            
-            # Convert to grayscale
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+            # Load image (decoded once and shared with the other stages)
+            frame = ImageFrame.from_source(image, min_size=self.size)
             
-            # Resize for faster processing
-            resized = cv2.resize(gray, (512, 512))
+            # Grayscale resized for faster processing
+            resized = frame.resized(self.size, 'gray')
             
             # Apply Gaussian blur to reduce noise
-            blurred = cv2.GaussianBlur(resized, (5, 5), 0)
-            
-            # Detect edges using Canny edge detector
-            edges = canny(blurred, sigma=2.0)
-            
-            # Find contours
-            contours = find_contours(edges, 0.8)
+            blurred = frame.blurred(self.size)
+            
+            regions = self._find_regions(frame) if self.mode == 'pyramid' else None
+            
+            if regions is None:
+                # Detect edges using Canny edge detector
+                edges = canny(blurred, sigma=2.0)
+                
+                # Find contours
+                contours = find_contours(edges, 0.8)
+                
+                # Detect lines using Hough transform
+                line_info = self._detect_lines(edges)
+                
+                # Detect circles using Hough transform
+                circle_info = self._detect_circles(blurred)
+            else:
+                contours, circle_info = self._detect_in_regions(blurred, regions)
+                
+                # Line orientations do not depend on resolution, so lines are found on the coarse edges
+                line_info = self._detect_lines(self._coarse_edges(frame), distance_scale=self.size / self.coarse_size)
             
             # Analyze contours
             shape_info = self._analyze_contours(contours, resized.shape)
             
-            # Detect lines using Hough transform
-            line_info = self._detect_lines(edges)
-            
-            # Detect circles using Hough transform
-            circle_info = self._detect_circles(blurred)
-            
             # Determine dominant shapes
             dominant_shapes = self._determine_dominant_shapes(shape_info, line_info, circle_info)
             
@@ -93,10 +116,121 @@ class ShapeDetector:
                 'shape_details': []
             }
     
+    def _coarse_edges(self, frame):
+        """
+        Get the edges of the low-resolution image.
+        
+        Args:
+            frame (ImageFrame): Decoded image frame
+            
+        Returns:
+            ndarray: Boolean edge map
+        """
+        return frame.derived(
+            ('coarse_edges', self.coarse_size),
+            lambda: canny(frame.resized(self.coarse_size, 'gray'), sigma=1.0)
+        )
+    
+    def _find_regions(self, frame, padding=2):
+        """
+        Find regions of interest from the low-resolution edges.
+        
+        Args:
+            frame (ImageFrame): Decoded image frame
+            padding (int): Padding around each region in low-resolution pixels
+            
+        Returns:
+            list: Full-resolution (row0, col0, row1, col1) boxes, or None if the whole
+                image should be analyzed at full resolution
+        """
+        edges = self._coarse_edges(frame).astype(np.uint8)
+        edges = cv2.dilate(edges, np.ones((3, 3), np.uint8))
+        n_labels, _, stats, _ = cv2.connectedComponentsWithStats(edges, connectivity=8)
+        
+        scale = self.size / self.coarse_size
+        # A region must be able to hold a shape of at least 100 full-resolution pixels
+        min_area = 100 / (scale * scale)
+        
+        boxes = []
+        for x, y, width, height, _ in stats[1:]:
+            if width * height < min_area:
+                continue
+            boxes.append([
+                max(0, y - padding), max(0, x - padding),
+                min(self.coarse_size, y + height + padding), min(self.coarse_size, x + width + padding)
+            ])
+        
+        boxes = self._merge_boxes(boxes)
+        coverage = sum((r1 - r0) * (c1 - c0) for r0, c0, r1, c1 in boxes) / float(self.coarse_size ** 2)
+        if len(boxes) > self.max_regions or coverage > self.max_region_coverage:
+            return None
+        
+        return [[int(round(value * scale)) for value in box] for box in boxes]
+    
+    def _merge_boxes(self, boxes):
+        """
+        Merge overlapping boxes until none overlap.
+        
+        Args:
+            boxes (list): (row0, col0, row1, col1) boxes
+            
+        Returns:
+            list: Merged boxes
+        """
+        merged = True
+        while merged:
+            merged = False
+            result = []
+            for box in boxes:
+                for other in result:
+                    if box[0] < other[2] and other[0] < box[2] and box[1] < other[3] and other[1] < box[3]:
+                        other[0], other[1] = min(other[0], box[0]), min(other[1], box[1])
+                        other[2], other[3] = max(other[2], box[2]), max(other[3], box[3])
+                        merged = True
+                        break
+                else:
+                    result.append(list(box))
+            boxes = result
+        return boxes
+    
+    def _detect_in_regions(self, blurred, regions):
+        """
+        Run full-resolution edge, contour and circle detection on regions of interest.
+        
+        Args:
+            blurred (ndarray): Blurred full-resolution grayscale image
+            regions (list): (row0, col0, row1, col1) boxes
+            
+        Returns:
+            list: Contours in full-image coordinates
+            dict: Information about detected circles
+        """
+        contours = []
+        circles = []
+        
+        for row0, col0, row1, col1 in regions:
+            crop = blurred[row0:row1, col0:col1]
+            edges = canny(crop, sigma=2.0)
+            offset = np.array([row0, col0], dtype=np.float64)
+            contours.extend(contour + offset for contour in find_contours(edges, 0.8))
+            
+            for circle in self._detect_circles(crop)['circles']:
+                x, y = circle['center']
+                circles.append({'center': (x + col0, y + row0), 'radius': circle['radius']})
+        
+        return contours, {
+            'circles': circles,
+            'has_circles': len(circles) > 0,
+            'circle_count': len(circles)
+        }
+    
     def _analyze_contours(self, contours, image_shape):
         """
         Analyze contours to identify shapes.
         
+        Polygon areas, perimeters, bounding boxes and centroids are computed
+        for all approximated contours at once.
+        
         Args:
             contours (list): List of contours
             image_shape (tuple): Shape of the image
@@ -108,52 +242,51 @@ class ShapeDetector:
         total_area = image_shape[0] * image_shape[1]
         covered_area = 0
         
-        for contour in contours:
-            # Skip very small contours
-            if len(contour) < 5:
-                continue
-            
-            # Approximate the contour
-            approx = approximate_polygon(contour, tolerance=0.02)
-            
-            # Calculate contour properties
-            area = cv2.contourArea(approx.astype(np.float32))
-            perimeter = cv2.arcLength(approx.astype(np.float32), True)
-            
-            # Skip very small shapes
-            if area < 100:
-                continue
-            
-            # Calculate shape metrics
-            compactness = (4 * np.pi * area) / (perimeter ** 2) if perimeter > 0 else 0
-            
-            # Determine shape type
-            shape_type = self._identify_shape(approx, compactness)
-            
-            # Calculate bounding box
-            x_min, y_min = np.min(approx, axis=0)
-            x_max, y_max = np.max(approx, axis=0)
-            width = x_max - x_min
-            height = y_max - y_min
-            
-            # Calculate aspect ratio
-            aspect_ratio = width / height if height > 0 else 0
-            
-            # Add shape information
-            shapes.append({
-                'type': shape_type,
-                'vertices': len(approx),
-                'area': float(area),
-                'perimeter': float(perimeter),
-                'compactness': float(compactness),
-                'aspect_ratio': float(aspect_ratio),
-                'position': {
-                    'x': float(np.mean(approx[:, 0])),
-                    'y': float(np.mean(approx[:, 1]))
-                }
-            })
-            
-            covered_area += area
+        # Skip very small contours, and contours whose bounding box cannot hold a 100 pixel shape
+        candidates = [
+            contour for contour in contours
+            if len(contour) >= 5 and np.prod(np.ptp(contour, axis=0)) >= 100
+        ]
+        
+        # Approximate the contours
+        polygons = [approximate_polygon(contour, tolerance=0.02) for contour in candidates]
+        
+        if polygons:
+            metrics = self._polygon_metrics(polygons)
+            
+            for index, approx in enumerate(polygons):
+                area = metrics['area'][index]
+                perimeter = metrics['perimeter'][index]
+                
+                # Skip very small shapes
+                if area < 100:
+                    continue
+                
+                # Calculate shape metrics
+                compactness = (4 * np.pi * area) / (perimeter ** 2) if perimeter > 0 else 0
+                
+                # Determine shape type
+                shape_type = self._identify_shape(approx, compactness)
+                
+                # Calculate aspect ratio
+                width, height = metrics['size'][index]
+                aspect_ratio = width / height if height > 0 else 0
+                
+                # Add shape information
+                shapes.append({
+                    'type': shape_type,
+                    'vertices': len(approx),
+                    'area': float(area),
+                    'perimeter': float(perimeter),
+                    'compactness': float(compactness),
+                    'aspect_ratio': float(aspect_ratio),
+                    'position': {
+                        'x': float(metrics['center'][index][0]),
+                        'y': float(metrics['center'][index][1])
+                    }
+                })
+                
+                covered_area += area
         
         # Calculate shape complexity
         if len(shapes) < 3:
@@ -178,6 +311,37 @@ class ShapeDetector:
             'distribution': distribution
         }
     
+    def _polygon_metrics(self, polygons):
+        """
+        Compute metrics of closed polygons in one vectorized pass.
+        
+        Args:
+            polygons (list): Polygon vertex arrays of shape (n, 2)
+            
+        Returns:
+            dict: Arrays of areas, perimeters, bounding box sizes and vertex means
+        """
+        lengths = np.array([len(polygon) for polygon in polygons])
+        points = np.concatenate(polygons).astype(np.float64)
+        starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        
+        # Index of the next vertex, wrapping around within each polygon
+        next_index = np.arange(len(points)) + 1
+        next_index[starts + lengths - 1] = starts
+        following = points[next_index]
+        
+        # Shoelace formula for areas, summed edge lengths for perimeters
+        cross = points[:, 0] * following[:, 1] - following[:, 0] * points[:, 1]
+        area = np.abs(np.add.reduceat(cross, starts)) / 2
+        perimeter = np.add.reduceat(np.hypot(*(following - points).T), starts)
+        
+        return {
+            'area': area,
+            'perimeter': perimeter,
+            'size': np.maximum.reduceat(points, starts) - np.minimum.reduceat(points, starts),
+            'center': np.add.reduceat(points, starts) / lengths[:, None]
+        }
+    
     def _identify_shape(self, contour, compactness):
         """
         Identify the type of shape based on contour properties.
@@ -219,12 +383,13 @@ class ShapeDetector:
         else:
             return "Organic"
     
-    def _detect_lines(self, edges):
+    def _detect_lines(self, edges, distance_scale=1.0):
         """
         Detect straight lines in an image using Hough transform.
         
         Args:
             edges (ndarray): Edge image
+            distance_scale (float): Factor converting line distances to full-resolution pixels
             
         Returns:
             dict: Information about detected lines
@@ -249,7 +414,7 @@ class ShapeDetector:
             
             lines.append({
                 'angle': float(angle),
-                'distance': float(dist),
+                'distance': float(dist * distance_scale),
                 'orientation': orientation
             })
         
@@ -375,13 +540,14 @@ class ShapeDetector:
         
         return dominant_shapes
     
-    def save_shape_visualization(self, image_path, output_dir):
+    def save_shape_visualization(self, image, output_dir, filename=None):
         """
         Create and save visualizations of shape detection.
         
         Args:
-            image_path (str): Path to the image file
+            image (str or ImageFrame): Path to the image file or decoded image frame
             output_dir (str): Directory to save the visualization
+            filename (str, optional): Output file name (defaults to the image name)
             
         Returns:
             str: Path to the saved visualization file
@@ -390,22 +556,14 @@ class ShapeDetector:
             # Create output directory if it doesn't exist
             os.makedirs(output_dir, exist_ok=True)
             
-            # Load image
-            img = cv2.imread(image_path)
-            if img is None:
-                raise ValueError(f"Could not load image from {image_path}")
-            
-            # Convert to RGB for matplotlib
-            img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-            
-            # Resize for faster processing
-            resized = cv2.resize(img_rgb, (512, 512))
+            # Load image (decoded once and shared with the other stages)
+            frame = ImageFrame.from_source(image, min_size=512)
             
-            # Convert to grayscale
-            gray = cv2.cvtColor(resized, cv2.COLOR_RGB2GRAY)
+            # RGB resized for matplotlib
+            resized = frame.resized(512, 'rgb')
             
             # Apply Gaussian blur to reduce noise
-            blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+            blurred = frame.blurred(512)
             
             # Detect edges using Canny edge detector
             edges = canny(blurred, sigma=2.0)
@@ -447,9 +605,7 @@ class ShapeDetector:
             plt.axis('off')
             
             # Generate output filename
-            base_name = os.path.basename(image_path)
-            file_name, _ = os.path.splitext(base_name)
-            output_path = os.path.join(output_dir, f"{file_name}_shapes.png")
+            output_path = os.path.join(output_dir, filename or f"{frame.name}_shapes.png")
             
             # Save visualization
             plt.tight_layout()
@@ -1,10 +1,9 @@
 import cv2
 import numpy as np
-from PIL import Image
 import logging
-from skimage.feature import hog, local_binary_pattern
-from skimage import color, exposure
 import os
+from .image_frame import ImageFrame
+from .texture_features import TextureFeatures
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -15,62 +14,38 @@ class TextureAnalyzer:
     Class for analyzing textures in images.
     """
     
-    def __init__(self):
+    def __init__(self, size=256):
         """
         Initialize the TextureAnalyzer.
+        
+        Args:
+            size (int): Edge length of the grayscale image textures are analyzed at
         """
+        self.size = size
         logger.info("TextureAnalyzer initialized")
     
-    def analyze_texture(self, image_path):
+    def analyze_texture(self, image):
         """
         Analyze the texture of an image.
         
         Args:
-            image_path (str): Path to the image file
+            image (str or ImageFrame): Path to the image file or decoded image frame
             
         Returns:
             dict: Texture analysis results including texture type, roughness, and pattern information
         """
         try:
-            # Load image
-            logger.info(f"Loading image from {image_path}")
-            img = cv2.imread(image_path)
-            if img is None:
-                raise ValueError(f"Could not load image from {image_path}")
-            
-            # Convert to grayscale for texture analysis
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            
-            # Resize for faster processing
-            resized = cv2.resize(gray, (256, 256))
-            
-            # Calculate Local Binary Pattern
-            radius = 3
-            n_points = 8 * radius
-            lbp = local_binary_pattern(resized, n_points, radius, method='uniform')
+            # Load image (decoded once and shared with the other stages)
+            frame = ImageFrame.from_source(image, min_size=self.size)
             
-            # Calculate LBP histogram
-            n_bins = int(lbp.max() + 1)
-            lbp_hist, _ = np.histogram(lbp, density=True, bins=n_bins, range=(0, n_bins))
-            
-            # Calculate HOG features
-            hog_features, hog_image = hog(
-                resized, 
-                orientations=8, 
-                pixels_per_cell=(16, 16),
-                cells_per_block=(1, 1), 
-                visualize=True, 
-                block_norm='L2-Hys'
-            )
-            
-            # Enhance HOG image for visualization
-            hog_image_rescaled = exposure.rescale_intensity(hog_image, in_range=(0, 10))
+            # LBP, HOG and gradients computed once and shared with the visualization
+            features = self.compute_features(frame)
+            resized = features.gray
+            lbp_hist = features.lbp_histogram
+            hog_features = features.hog_features
             
             # Calculate texture roughness using gradient magnitude
-            sobelx = cv2.Sobel(resized, cv2.CV_64F, 1, 0, ksize=3)
-            sobely = cv2.Sobel(resized, cv2.CV_64F, 0, 1, ksize=3)
-            gradient_magnitude = np.sqrt(sobelx**2 + sobely**2)
-            roughness = np.mean(gradient_magnitude)
+            roughness = np.mean(features.gradient_magnitude)
             
             # Calculate texture uniformity using standard deviation
             uniformity = 1.0 / (1.0 + np.std(resized))
@@ -116,6 +91,18 @@ class TextureAnalyzer:
                 'features': {}
             }
     
+    def compute_features(self, image):
+        """
+        Compute the texture features of an image once and share them.
+        
+        Args:
+            image (str or ImageFrame): Path to the image file or decoded image frame
+            
+        Returns:
+            TextureFeatures: LBP, HOG and gradient features of the resized grayscale image
+        """
+        return TextureFeatures.from_frame(ImageFrame.from_source(image, min_size=self.size), self.size)
+    
     def _determine_texture_type(self, roughness, uniformity, contrast, directionality):
         """
         Determine the texture type based on calculated features.
@@ -183,13 +170,14 @@ class TextureAnalyzer:
             else:
                 return "Random"
     
-    def save_texture_visualization(self, image_path, output_dir):
+    def save_texture_visualization(self, image, output_dir, filename=None):
         """
         Create and save visualizations of texture analysis.
         
         Args:
-            image_path (str): Path to the image file
+            image (str or ImageFrame): Path to the image file or decoded image frame
             output_dir (str): Directory to save the visualization
+            filename (str, optional): Output file name (defaults to the image name)
             
         Returns:
             str: Path to the saved visualization file
@@ -198,44 +186,17 @@ class TextureAnalyzer:
             # Create output directory if it doesn't exist
             os.makedirs(output_dir, exist_ok=True)
             
-            # Load image
-            img = cv2.imread(image_path)
-            if img is None:
-                raise ValueError(f"Could not load image from {image_path}")
-            
-            # Convert to grayscale
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            
-            # Resize for faster processing
-            resized = cv2.resize(gray, (256, 256))
-            
-            # Calculate Local Binary Pattern
-            radius = 3
-            n_points = 8 * radius
-            lbp = local_binary_pattern(resized, n_points, radius, method='uniform')
-            
-            # Calculate HOG features
-            _, hog_image = hog(
-                resized, 
-                orientations=8, 
-                pixels_per_cell=(16, 16),
-                cells_per_block=(1, 1), 
-                visualize=True, 
-                block_norm='L2-Hys'
-            )
-            
-            # Enhance HOG image for visualization
-            hog_image_rescaled = exposure.rescale_intensity(hog_image, in_range=(0, 10))
+            # Load image (decoded once and shared with the other stages)
+            frame = ImageFrame.from_source(image, min_size=self.size)
             
-            # Calculate gradient magnitude
-            sobelx = cv2.Sobel(resized, cv2.CV_64F, 1, 0, ksize=3)
-            sobely = cv2.Sobel(resized, cv2.CV_64F, 0, 1, ksize=3)
-            gradient_magnitude = np.sqrt(sobelx**2 + sobely**2)
-            gradient_magnitude = cv2.normalize(gradient_magnitude, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+            # Reuse the features computed by analyze_texture; the HOG image is rendered here
+            features = self.compute_features(frame)
+            resized = features.gray
             
-            # Create visualization
-            lbp_normalized = cv2.normalize(lbp, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
-            hog_normalized = (hog_image_rescaled * 255).astype(np.uint8)
+            # Normalize the feature maps for display
+            gradient_magnitude = cv2.normalize(features.gradient_magnitude, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+            lbp_normalized = cv2.normalize(features.lbp, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+            hog_normalized = (features.hog_image * 255).astype(np.uint8)
             
             # Create a 2x2 grid of images
             h, w = resized.shape
@@ -253,9 +214,7 @@ class TextureAnalyzer:
             cv2.putText(visualization, 'HOG', (w+10, h+20), font, 0.5, 255, 1, cv2.LINE_AA)
             
             # Generate output filename
-            base_name = os.path.basename(image_path)
-            file_name, _ = os.path.splitext(base_name)
-            output_path = os.path.join(output_dir, f"{file_name}_texture.png")
+            output_path = os.path.join(output_dir, filename or f"{frame.name}_texture.png")
             
             # Save visualization
             cv2.imwrite(output_path, visualization)
@@ -0,0 +1,86 @@
+import cv2
+import numpy as np
+import logging
+import threading
+from skimage.feature import hog, local_binary_pattern
+from skimage import exposure
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class TextureFeatures:
+    """
+    Texture features of one grayscale image, computed in a single pass.
+    The LBP map and histogram, HOG descriptor and gradient magnitude are
+    shared by texture analysis and its visualization. The HOG image is
+    only rendered when a visualization asks for it.
+    """
+
+    def __init__(self, gray, radius=3, hog_orientations=8, hog_cell_size=16):
+        """
+        Initialize the TextureFeatures.
+
+        Args:
+            gray (ndarray): Grayscale pixel array
+            radius (int): LBP radius
+            hog_orientations (int): Number of HOG orientation bins
+            hog_cell_size (int): HOG cell edge length in pixels
+        """
+        self.gray = gray
+        self.hog_orientations = hog_orientations
+        self.hog_cell_size = hog_cell_size
+        self._hog_image = None
+        self._lock = threading.Lock()
+
+        # Local Binary Pattern and its histogram
+        n_points = 8 * radius
+        self.lbp = local_binary_pattern(gray, n_points, radius, method='uniform')
+        n_bins = int(self.lbp.max() + 1)
+        self.lbp_histogram, _ = np.histogram(self.lbp, density=True, bins=n_bins, range=(0, n_bins))
+
+        # HOG descriptor without the visualization image
+        self.hog_features = hog(
+            gray,
+            orientations=hog_orientations,
+            pixels_per_cell=(hog_cell_size, hog_cell_size),
+            cells_per_block=(1, 1),
+            block_norm='L2-Hys'
+        )
+
+        # Gradient magnitude
+        sobelx = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
+        sobely = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
+        self.gradient_magnitude = np.sqrt(sobelx**2 + sobely**2)
+
+    @classmethod
+    def from_frame(cls, frame, size=256):
+        """
+        Get the texture features of a frame, computing them once per frame.
+
+        Args:
+            frame (ImageFrame): Decoded image frame
+            size (int): Edge length of the grayscale resize analyzed
+
+        Returns:
+            TextureFeatures: Texture features
+        """
+        return frame.derived(('texture_features', size), lambda: cls(frame.resized(size, 'gray')))
+
+    @property
+    def hog_image(self):
+        """
+        HOG visualization image, rendered on first access and rescaled for display.
+        """
+        with self._lock:
+            if self._hog_image is None:
+                _, hog_image = hog(
+                    self.gray,
+                    orientations=self.hog_orientations,
+                    pixels_per_cell=(self.hog_cell_size, self.hog_cell_size),
+                    cells_per_block=(1, 1),
+                    visualize=True,
+                    block_norm='L2-Hys'
+                )
+                self._hog_image = exposure.rescale_intensity(hog_image, in_range=(0, 10))
+            return self._hog_image
@@ -0,0 +1,135 @@
+import os
+import logging
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from .analysis_cache import AnalysisCache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class UploadIngestor:
+    """
+    Ingests uploaded images from memory.
+    The upload is read once into an immutable buffer that is hashed,
+    handed to the analyzer for decoding, and written to the upload
+    directory on a background thread, so the request never waits for disk.
+    """
+
+    def __init__(self, upload_dir, max_writers=2):
+        """
+        Initialize the UploadIngestor.
+
+        Args:
+            upload_dir (str): Directory uploaded originals are stored in
+            max_writers (int): Number of background writer threads
+        """
+        self.upload_dir = upload_dir
+        self._writer = ThreadPoolExecutor(max_workers=max_writers, thread_name_prefix='upload-writer')
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'ingested': 0,
+            'bytes': 0,
+            'written': 0,
+            'write_errors': 0
+        }
+        os.makedirs(upload_dir, exist_ok=True)
+        logger.info(f"UploadIngestor initialized with {max_writers} writers")
+
+    @staticmethod
+    def read_upload(file_storage):
+        """
+        Get the bytes of an uploaded file.
+
+        In-memory upload streams hand over their buffer without copying it.
+
+        Args:
+            file_storage (FileStorage): Uploaded file
+
+        Returns:
+            bytes: File content
+        """
+        stream = file_storage.stream
+        if hasattr(stream, 'getvalue'):
+            return stream.getvalue()
+        stream.seek(0)
+        return stream.read()
+
+    def ingest(self, data, file_path):
+        """
+        Hash an upload and store it in the background.
+
+        Args:
+            data (bytes): File content
+            file_path (str): Path the original is stored at
+
+        Returns:
+            str: Analysis identifier (the hash of the content)
+        """
+        analysis_id = AnalysisCache.hash_content(data)
+        future = self._writer.submit(self._write, file_path, data)
+
+        with self._lock:
+            self._pending[file_path] = future
+            self._stats['ingested'] += 1
+            self._stats['bytes'] += len(data)
+        future.add_done_callback(lambda _: self._finish(file_path))
+
+        return analysis_id
+
+    def _write(self, file_path, data):
+        """
+        Write an upload under a temporary name so readers never see a partial file.
+        """
+        temp_path = os.path.join(os.path.dirname(file_path), f".{uuid.uuid4().hex}.tmp")
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, file_path)
+            with self._lock:
+                self._stats['written'] += 1
+        except Exception as e:
+            logger.error(f"Error storing upload {file_path}: {str(e)}")
+            with self._lock:
+                self._stats['write_errors'] += 1
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _finish(self, file_path):
+        with self._lock:
+            self._pending.pop(file_path, None)
+
+    def wait(self, file_path=None, timeout=None):
+        """
+        Wait until uploads are stored.
+
+        Args:
+            file_path (str, optional): Upload to wait for (defaults to every pending upload)
+            timeout (float, optional): Maximum seconds to wait
+
+        Returns:
+            bool: True if the waited-for uploads are stored
+        """
+        with self._lock:
+            if file_path is None:
+                futures = list(self._pending.values())
+            else:
+                futures = [self._pending[file_path]] if file_path in self._pending else []
+
+        done, not_done = wait(futures, timeout=timeout)
+        if not_done or any(future.exception() is not None for future in done):
+            return False
+        return file_path is None or os.path.exists(file_path)
+
+    def get_stats(self):
+        """
+        Get ingestion statistics.
+
+        Returns:
+            dict: Uploads ingested, bytes, writes completed and failed, and writes pending
+        """
+        with self._lock:
+            return dict(self._stats, pending=len(self._pending))
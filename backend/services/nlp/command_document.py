@@ -0,0 +1,122 @@
+import logging
+import re
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class CommandDocument:
+    """
+    Command text analyzed once and shared by all NLP stages.
+    The lowercase text, tokens with their character offsets and numeric
+    values are computed on first use and cached, and stages cache their
+    own results (normalized terms, part-of-speech tags, processed command
+    information) on the document, so no stage repeats the work of another.
+    """
+
+    # Numbers, runs of word characters and single punctuation marks
+    TOKEN_PATTERN = re.compile(r"\d+(?:\.\d+)?|\w+|[^\w\s]")
+
+    # Numbers including decimals and percentages
+    NUMBER_PATTERN = re.compile(r'\b\d+(?:\.\d+)?%?\b')
+
+    def __init__(self, text):
+        """
+        Initialize the CommandDocument.
+
+        Args:
+            text (str): Command text
+        """
+        self.text = text
+        self._cache = {}
+
+    @classmethod
+    def from_source(cls, text):
+        """
+        Get a CommandDocument for text or an existing document.
+
+        Args:
+            text (str or CommandDocument): Command text or analyzed document
+
+        Returns:
+            CommandDocument: Analyzed document
+        """
+        if isinstance(text, cls):
+            return text
+        return cls(text)
+
+    def _cached(self, key, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def derived(self, key, compute):
+        """
+        Get a value derived from the document, computing it on first use.
+
+        Args:
+            key (hashable): Cache key identifying the derived value
+            compute (callable): Function called without arguments to compute the value
+
+        Returns:
+            object: Cached derived value
+        """
+        return self._cached(('derived', key), compute)
+
+    @property
+    def lower(self):
+        """
+        Lowercase command text.
+        """
+        return self._cached('lower', self.text.lower)
+
+    @property
+    def tokens(self):
+        """
+        Tokens of the lowercase text as (token, start, end) tuples.
+        """
+        return self._cached('tokens', lambda: [
+            (match.group(), match.start(), match.end()) for match in self.TOKEN_PATTERN.finditer(self.lower)
+        ])
+
+    @property
+    def words(self):
+        """
+        Lowercase token strings.
+        """
+        return self._cached('words', lambda: [token for token, _, _ in self.tokens])
+
+    @property
+    def whitespace_words(self):
+        """
+        Lowercase text split on whitespace, as used for word-distance heuristics.
+        """
+        return self._cached('whitespace_words', self.lower.split)
+
+    @property
+    def numbers(self):
+        """
+        Numeric values as (value_type, value, start, end) tuples.
+        """
+        def compute():
+            numbers = []
+            for match in self.NUMBER_PATTERN.finditer(self.text):
+                number = match.group()
+                if '%' in number:
+                    # Handle percentages
+                    numbers.append(('percentage', float(number.replace('%', '')) / 100, match.start(), match.end()))
+                elif '.' in number:
+                    # Handle decimals
+                    numbers.append(('decimal', float(number), match.start(), match.end()))
+                else:
+                    # Handle integers
+                    numbers.append(('integer', int(number), match.start(), match.end()))
+            return numbers
+        return self._cached('numbers', compute)
+
+    @property
+    def numeric_values(self):
+        """
+        Numeric values as (value_type, value) tuples.
+        """
+        return self._cached('numeric_values', lambda: [(value_type, value) for value_type, value, _, _ in self.numbers])
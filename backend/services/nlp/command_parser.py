@@ -3,6 +3,7 @@ import json
 from .text_processor import TextProcessor
 from .intent_classifier import IntentClassifier
 from .entity_extractor import EntityExtractor
+from .command_document import CommandDocument
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -12,42 +13,80 @@ class CommandParser:
     """
     Class for parsing user commands into structured operations.
     Integrates text processing, intent classification, and entity extraction.
+    Each command is analyzed once into a CommandDocument that every stage shares,
+    and parsed operations can be served from a ParseCache for repeated commands.
     """
     
-    def __init__(self):
+    # Version of the parsing logic; bump it when operations change shape
+    PARSER_VERSION = 1
+    
+    def __init__(self, intent_classifier=None, entity_extractor=None, text_processor=None, parse_cache=None):
         """
         Initialize the CommandParser.
+        
+        Args:
+            intent_classifier (IntentClassifier, optional): Intent classifier to use
+            entity_extractor (EntityExtractor, optional): Entity extractor to use
+            text_processor (TextProcessor, optional): Text processor shared by the stages
+            parse_cache (ParseCache, optional): Cache of parsed operations
         """
         logger.info("Initializing CommandParser")
-        self.text_processor = TextProcessor()
-        self.intent_classifier = IntentClassifier()
-        self.entity_extractor = EntityExtractor()
+        if text_processor is None:
+            text_processor = intent_classifier.text_processor if intent_classifier else TextProcessor()
+        self.text_processor = text_processor
+        self.intent_classifier = intent_classifier or IntentClassifier(text_processor)
+        self.entity_extractor = entity_extractor or EntityExtractor(text_processor)
+        self.parse_cache = parse_cache
+    
+    @property
+    def vocabulary_fingerprint(self):
+        """
+        Fingerprint of the parser version and the intent and entity vocabularies.
+        """
+        return f"{self.PARSER_VERSION}-{self.intent_classifier.vocabulary_version}-{self.entity_extractor.vocabulary_version}"
     
     def parse_command(self, text):
         """
         Parse a user command into a structured operation.
         
         Args:
-            text (str): User command text
+            text (str or CommandDocument): User command text
             
         Returns:
             dict: Structured command operation
         """
+        document = CommandDocument.from_source(text)
+        text = document.text
+        
+        # Serve repeated commands from the cache
+        cache_key = None
+        if self.parse_cache is not None:
+            self.parse_cache.validate(self.vocabulary_fingerprint)
+            cache_key = self.parse_cache.normalize(document)
+            operation = self.parse_cache.get(cache_key)
+            if operation is not None:
+                operation['original_text'] = text
+                return operation
+        
         try:
             logger.info(f"Parsing command: {text}")
             
             # Classify intent
-            intent_classification = self.intent_classifier.classify_intent(text)
+            intent_classification = self.intent_classifier.classify_intent(document)
             
             # Extract entities
-            entities = self.entity_extractor.extract_entities(text)
+            entities = self.entity_extractor.extract_entities(document)
             
             # Extract relationships between entities
-            relationships = self.entity_extractor.extract_relationships(text, entities)
+            relationships = self.entity_extractor.extract_relationships(document, entities)
             
             # Create structured operation
             operation = self._create_operation(text, intent_classification, entities, relationships)
             
+            # Only complete parses are cached
+            if cache_key is not None and 'error' not in intent_classification and 'error' not in entities:
+                self.parse_cache.put(cache_key, operation)
+            
             logger.info(f"Parsed operation: {operation}")
             return operation
             
@@ -1,7 +1,11 @@
 import logging
 import re
 import json
+import hashlib
 from .text_processor import TextProcessor
+from .command_document import CommandDocument
+from .term_matcher import TermMatcher
+from .measurement_extractor import MeasurementExtractor
 from .intent_classifier import IntentClassifier
 
 # Configure logging
@@ -14,12 +18,15 @@ class EntityExtractor:
     Identifies products, attributes, values, and other relevant entities.
     """
     
-    def __init__(self):
+    def __init__(self, text_processor=None):
         """
         Initialize the EntityExtractor.
+        
+        Args:
+            text_processor (TextProcessor, optional): Text processor shared with the other NLP stages
         """
         logger.info("Initializing EntityExtractor")
-        self.text_processor = TextProcessor()
+        self.text_processor = text_processor or TextProcessor()
         self._load_entity_patterns()
     
     def _load_entity_patterns(self):
@@ -101,27 +108,84 @@ class EntityExtractor:
             'percentage': ['%', 'percent', 'percentage']
         }
         
-        # Compile regex patterns for products
-        self.product_patterns = {}
-        for product in self.all_products:
-            self.product_patterns[product] = re.compile(r'\b' + product + r'(?:s)?\b', re.IGNORECASE)
+        # Define location phrases (e.g., "on the top", "at the bottom")
+        self.location_terms = {
+            'top': ['on top', 'on the top', 'top of', 'top part'],
+            'bottom': ['on bottom', 'on the bottom', 'bottom of', 'bottom part'],
+            'left': ['on left', 'on the left', 'left of', 'left side'],
+            'right': ['on right', 'on the right', 'right of', 'right side'],
+            'front': ['on front', 'on the front', 'front of', 'front part'],
+            'back': ['on back', 'on the back', 'back of', 'back part'],
+            'center': ['in center', 'in the center', 'center', 'middle'],
+            'inside': ['inside', 'within', 'inner'],
+            'outside': ['outside', 'outer', 'exterior']
+        }
         
-        # Compile regex patterns for attributes
-        self.attribute_patterns = {}
+        # Define action phrases (e.g., "rotate", "move", "scale")
+        self.action_terms = {
+            'rotate': ['rotate', 'turn', 'spin'],
+            'move': ['move', 'shift', 'reposition'],
+            'scale': ['scale', 'resize', 'make bigger', 'make smaller', 'make larger'],
+            'add': ['add', 'insert', 'place'],
+            'remove': ['remove', 'delete', 'take away', 'take out'],
+            'change': ['change', 'modify', 'alter'],
+            'combine': ['combine', 'merge', 'join'],
+            'separate': ['separate', 'split', 'divide']
+        }
+        
+        self.refresh_vocabulary()
+    
+    def refresh_vocabulary(self):
+        """
+        Rebuild the entity matcher and measurement grammar from the vocabularies;
+        call after changing them.
+        """
+        # Category of each product (the first category listing it)
+        self.product_category_map = {}
+        for category, products in self.product_categories.items():
+            for product in products:
+                self.product_category_map.setdefault(product, category)
+        
+        # Every term maps to an (entity kind, entity name) pair; entities are reported in vocabulary order
+        entity_terms = []
+        for product in self.product_category_map:
+            entity_terms.append((('product', product), [product, product + 's']))
         for attr_type, attributes in self.attribute_types.items():
             for attr in attributes:
-                self.attribute_patterns[attr] = (attr_type, re.compile(r'\b' + attr + r'\b', re.IGNORECASE))
+                entity_terms.append((('attribute', (attr_type, attr)), [attr]))
+        for location, phrases in self.location_terms.items():
+            entity_terms.append((('location', location), phrases))
+        for action, phrases in self.action_terms.items():
+            entity_terms.append((('action', action), phrases))
+        
+        self.entity_matcher = TermMatcher()
+        self.entity_order = {}
+        for entity, terms in entity_terms:
+            self.entity_order.setdefault(entity, len(self.entity_order))
+            for term in terms:
+                self.entity_matcher.add(term, entity)
+        
+        logger.info(f"Entity matcher built with {len(self.entity_matcher)} terms")
+        
+        # Compile the measurement grammar
+        self.measurement_extractor = MeasurementExtractor(self.measurement_units)
+        
+        # Fingerprint of the vocabularies, used to invalidate cached parses
+        vocabularies = [self.product_categories, self.attribute_types, self.location_terms, self.action_terms, self.measurement_units]
+        self.vocabulary_version = hashlib.sha256(json.dumps(vocabularies, sort_keys=True).encode('utf-8')).hexdigest()[:16]
     
     def extract_entities(self, text):
         """
         Extract entities from text.
         
         Args:
-            text (str): Input text
+            text (str or CommandDocument): Input text
             
         Returns:
             dict: Extracted entities
         """
+        document = CommandDocument.from_source(text)
+        text = document.text
         try:
             logger.info(f"Extracting entities from: {text}")
             
@@ -140,78 +204,25 @@ class EntityExtractor:
                 'actions': []
             }
             
-            # Extract products
-            for product, pattern in self.product_patterns.items():
-                if pattern.search(text):
-                    category = next((cat for cat, prods in self.product_categories.items() if product in prods), 'other')
+            # Find products, attributes, locations and actions in one pass
+            found = {entity for entity, _, _ in self.entity_matcher.match(document)}
+            
+            for kind, name in sorted(found, key=self.entity_order.get):
+                if kind == 'product':
                     entities['products'].append({
-                        'name': product,
-                        'category': category
+                        'name': name,
+                        'category': self.product_category_map.get(name, 'other')
                     })
-            
-            # Extract attributes
-            for attr, (attr_type, pattern) in self.attribute_patterns.items():
-                if pattern.search(text):
+                elif kind == 'attribute':
+                    attr_type, attr = name
                     entities['attributes'][attr_type].append(attr)
-            
-            # Extract measurements using text processor
-            numeric_values = self.text_processor.extract_numeric_values(text)
-            
-            for value_type, value in numeric_values:
-                # Check if there's a unit mentioned near the number
-                for unit_type, units in self.measurement_units.items():
-                    for unit in units:
-                        unit_pattern = re.compile(r'\b' + str(value) + r'\s*' + unit + r'\b', re.IGNORECASE)
-                        if unit_pattern.search(text):
-                            entities['measurements'].append({
-                                'value': value,
-                                'unit': unit,
-                                'type': unit_type
-                            })
-                            break
-                    else:
-                        continue
-                    break
+                elif kind == 'location':
+                    entities['locations'].append(name)
                 else:
-                    # No unit found, just add the numeric value
-                    entities['measurements'].append({
-                        'value': value,
-                        'unit': None,
-                        'type': value_type
-                    })
+                    entities['actions'].append(name)
             
-            # Extract locations (e.g., "on the top", "at the bottom")
-            location_patterns = {
-                'top': r'\bon\s+(?:the\s+)?top\b|\btop\s+(?:of|part)\b',
-                'bottom': r'\bon\s+(?:the\s+)?bottom\b|\bbottom\s+(?:of|part)\b',
-                'left': r'\bon\s+(?:the\s+)?left\b|\bleft\s+(?:of|side)\b',
-                'right': r'\bon\s+(?:the\s+)?right\b|\bright\s+(?:of|side)\b',
-                'front': r'\bon\s+(?:the\s+)?front\b|\bfront\s+(?:of|part)\b',
-                'back': r'\bon\s+(?:the\s+)?back\b|\bback\s+(?:of|part)\b',
-                'center': r'\bin\s+(?:the\s+)?center\b|\bcenter\s+(?:of)?\b|\bmiddle\b',
-                'inside': r'\binside\b|\bwithin\b|\binner\b',
-                'outside': r'\boutside\b|\bouter\b|\bexterior\b'
-            }
-            
-            for location, pattern in location_patterns.items():
-                if re.search(pattern, text, re.IGNORECASE):
-                    entities['locations'].append(location)
-            
-            # Extract actions (e.g., "rotate", "move", "scale")
-            action_patterns = {
-                'rotate': r'\brotate\b|\bturn\b|\bspin\b',
-                'move': r'\bmove\b|\bshift\b|\breposition\b',
-                'scale': r'\bscale\b|\bresize\b|\bmake\s+(?:bigger|smaller|larger)\b',
-                'add': r'\badd\b|\binsert\b|\bplace\b',
-                'remove': r'\bremove\b|\bdelete\b|\btake\s+(?:away|out)\b',
-                'change': r'\bchange\b|\bmodify\b|\balter\b',
-                'combine': r'\bcombine\b|\bmerge\b|\bjoin\b',
-                'separate': r'\bseparate\b|\bsplit\b|\bdivide\b'
-            }
-            
-            for action, pattern in action_patterns.items():
-                if re.search(pattern, text, re.IGNORECASE):
-                    entities['actions'].append(action)
+            # Extract measurements (numbers with their units) in one pass
+            entities['measurements'] = self.measurement_extractor.extract(document)
             
             logger.info(f"Extracted entities: {entities}")
             return entities
@@ -238,12 +249,15 @@ class EntityExtractor:
         Extract relationships between entities.
         
         Args:
-            text (str): Input text
+            text (str or CommandDocument): Input text
             entities (dict): Extracted entities
             
         Returns:
             dict: Entity relationships
         """
+        # Words of the command, split once for every relationship check
+        words = CommandDocument.from_source(text).whitespace_words
+        
         relationships = {
             'product_attributes': [],
             'product_actions': [],
@@ -259,7 +273,6 @@ class EntityExtractor:
                 for attr in attrs:
                     # Check if the attribute is mentioned close to the product
                     # (within a window of words)
-                    words = text.lower().split()
                     try:
                         product_indices = [i for i, word in enumerate(words) if product_name in word]
                         attr_indices = [i for i, word in enumerate(words) if attr in word]
@@ -283,7 +296,6 @@ class EntityExtractor:
             
             for action in entities['actions']:
                 # Check if the action is mentioned close to the product
-                words = text.lower().split()
                 try:
                     product_indices = [i for i, word in enumerate(words) if product_name in word]
                     action_indices = [i for i, word in enumerate(words) if action in word]
@@ -305,7 +317,6 @@ class EntityExtractor:
             for attr in attrs:
                 for location in entities['locations']:
                     # Check if the attribute is mentioned close to the location
-                    words = text.lower().split()
                     try:
                         attr_indices = [i for i, word in enumerate(words) if attr in word]
                         loc_pattern = '\\b' + location + '\\b'
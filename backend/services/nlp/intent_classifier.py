@@ -1,7 +1,9 @@
 import logging
-import re
 import json
+import hashlib
 from .text_processor import TextProcessor
+from .command_document import CommandDocument
+from .term_matcher import TermMatcher
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -13,12 +15,15 @@ class IntentClassifier:
     Identifies the primary intent and secondary intents in user commands.
     """
     
-    def __init__(self):
+    def __init__(self, text_processor=None):
         """
         Initialize the IntentClassifier.
+        
+        Args:
+            text_processor (TextProcessor, optional): Text processor shared with the other NLP stages
         """
         logger.info("Initializing IntentClassifier")
-        self.text_processor = TextProcessor()
+        self.text_processor = text_processor or TextProcessor()
         self._load_intent_patterns()
     
     def _load_intent_patterns(self):
@@ -132,35 +137,47 @@ class IntentClassifier:
             ]
         }
         
-        # Compile patterns for efficiency
-        self.compiled_patterns = {}
+        self.refresh_vocabulary()
+    
+    def refresh_vocabulary(self):
+        """
+        Rebuild the intent matcher from intent_patterns; call after changing them.
+        """
+        # Build one matcher over every intent term so all intents are scored in a single scan
+        self.intent_matcher = TermMatcher()
         for intent, patterns in self.intent_patterns.items():
-            self.compiled_patterns[intent] = [re.compile(r'\b' + pattern + r'\b', re.IGNORECASE) for pattern in patterns]
+            for pattern in patterns:
+                self.intent_matcher.add(pattern, intent)
+        
+        # Fingerprint of the vocabulary, used to invalidate cached parses
+        self.vocabulary_version = hashlib.sha256(json.dumps(self.intent_patterns, sort_keys=True).encode('utf-8')).hexdigest()[:16]
     
     def classify_intent(self, text):
         """
         Classify the primary and secondary intents in a text command.
         
         Args:
-            text (str): Input text command
+            text (str or CommandDocument): Input text command
             
         Returns:
-            dict: Intent classification results
+            dict: Intent classification results, including the character spans
+                of the terms matched for each intent
         """
+        document = CommandDocument.from_source(text)
         try:
-            logger.info(f"Classifying intent for: {text}")
+            logger.info(f"Classifying intent for: {document.text}")
             
             # Process the command text
-            command_info = self.text_processor.process_command(text)
+            command_info = self.text_processor.process_command(document)
             
             # Initialize intent scores
             intent_scores = {intent: 0 for intent in self.intent_patterns.keys()}
+            intent_spans = {}
             
-            # Score each intent based on pattern matches
-            for intent, patterns in self.compiled_patterns.items():
-                for pattern in patterns:
-                    matches = pattern.findall(text.lower())
-                    intent_scores[intent] += len(matches)
+            # Score every intent from the term matches of a single scan
+            for intent, start, end in self.intent_matcher.match(document):
+                intent_scores[intent] += 1
+                intent_spans.setdefault(intent, []).append([start, end])
             
             # Determine primary intent (highest score)
             primary_intent = max(intent_scores.items(), key=lambda x: x[1])
@@ -183,6 +200,7 @@ class IntentClassifier:
                 'primary_intent': primary_intent[0],
                 'primary_score': primary_intent[1],
                 'secondary_intents': [intent for intent, _ in secondary_intents],
+                'intent_spans': intent_spans,
                 'command_info': command_info
             }
             
@@ -195,6 +213,7 @@ class IntentClassifier:
                 'primary_intent': 'unknown',
                 'primary_score': 0,
                 'secondary_intents': [],
+                'intent_spans': {},
                 'error': str(e)
             }
     
@@ -0,0 +1,151 @@
+import logging
+import re
+from .command_document import CommandDocument
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class MeasurementExtractor:
+    """
+    Extracts measurements from commands.
+    A single grammar compiled from the unit vocabulary recognizes integers,
+    decimals, fractions ("1/2", "1 1/2"), ranges ("10-20 cm", "between 2
+    and 3 feet") and the unit that follows, in one pass over the text, so
+    the cost does not depend on how many units are supported.
+    """
+
+    def __init__(self, measurement_units):
+        """
+        Initialize the MeasurementExtractor.
+
+        Args:
+            measurement_units (dict): Measurement types and their units; a unit listed
+                under several types belongs to the first
+        """
+        self.units = {}
+        for unit_type, units in measurement_units.items():
+            for unit in units:
+                self.units.setdefault(self._normalize_unit(unit), (unit, unit_type))
+
+        # Every written form (units and their plurals) with its vocabulary unit and type
+        self.written_units = dict(self.units)
+        for unit, unit_info in self.units.items():
+            for plural in self._plurals(unit):
+                self.written_units.setdefault(plural, unit_info)
+
+        self.pattern = self._compile_grammar()
+        logger.info(f"MeasurementExtractor initialized with {len(self.units)} units")
+
+    @staticmethod
+    def _normalize_unit(unit):
+        return ' '.join(unit.lower().split())
+
+    @staticmethod
+    def _plurals(unit):
+        """
+        Get the plural forms of a unit.
+
+        Single-letter and symbol units have none, so "ms" is never read as meters.
+        """
+        if len(unit) < 2 or not unit[-1].isalpha():
+            return []
+        if unit.endswith(('s', 'x', 'z', 'ch', 'sh')):
+            return [unit + 'es']
+        return [unit + 's']
+
+    @staticmethod
+    def _quantity(name):
+        """
+        Pattern for an integer, decimal, fraction or mixed number captured under a group name.
+        """
+        return (
+            rf'(?:(?:(?P<{name}_whole>\d+)\s+)?(?P<{name}_numerator>\d+)\s*/\s*(?P<{name}_denominator>\d+)'
+            rf'|(?P<{name}_number>\d+(?:\.\d+)?))'
+        )
+
+    def _compile_grammar(self):
+        """
+        Compile the measurement grammar from the unit vocabulary.
+        """
+        # Longest forms first so "fluid ounces" wins over "fluid ounce" and "mm" over "m"
+        unit_pattern = '|'.join(
+            r'\s+'.join(re.escape(part) for part in unit.split())
+            for unit in sorted(self.written_units, key=len, reverse=True)
+        )
+
+        return re.compile(
+            r'(?<![\w.])'
+            r'(?P<between>between\s+)?'
+            + self._quantity('low') +
+            # "between X and Y" or "X-Y" / "X to Y"
+            r'(?:(?(between)\s+and\s+|\s*(?:-|–|to\s)\s*)' + self._quantity('high') + r')?'
+            r'(?:\s*(?P<unit>' + unit_pattern + r'))?'
+            r'(?!\w)',
+            re.IGNORECASE
+        )
+
+    @staticmethod
+    def _value(match, name):
+        """
+        Get the value and value type of a quantity captured by the grammar.
+        """
+        number = match.group(f'{name}_number')
+        if number is not None:
+            if '.' in number:
+                return float(number), 'decimal'
+            return int(number), 'integer'
+
+        numerator = match.group(f'{name}_numerator')
+        if numerator is None:
+            return None, None
+        denominator = int(match.group(f'{name}_denominator'))
+        if denominator == 0:
+            return None, None
+        whole = int(match.group(f'{name}_whole') or 0)
+        return whole + int(numerator) / denominator, 'fraction'
+
+    def _lookup_unit(self, unit_text):
+        """
+        Get the vocabulary unit and measurement type for a unit as written.
+        """
+        return self.written_units.get(self._normalize_unit(unit_text), (None, None))
+
+    def extract(self, text):
+        """
+        Extract measurements from text.
+
+        Args:
+            text (str or CommandDocument): Input text
+
+        Returns:
+            list: Measurements in text order, each with its value as written, unit and
+                type (the measurement type for units, otherwise the value type), so
+                "20%" has the value 20 and the unit '%'; ranges also carry their
+                bounds under 'range'
+        """
+        document = CommandDocument.from_source(text)
+        measurements = []
+
+        for match in self.pattern.finditer(document.lower):
+            value, value_type = self._value(match, 'low')
+            if value is None:
+                continue
+
+            unit, unit_type = (None, None)
+            if match.group('unit'):
+                unit, unit_type = self._lookup_unit(match.group('unit'))
+
+            measurement = {
+                'value': value,
+                'unit': unit,
+                'type': unit_type or value_type
+            }
+
+            high, _ = self._value(match, 'high')
+            if high is not None:
+                measurement['range'] = [value, high]
+
+            measurements.append(measurement)
+
+        return measurements
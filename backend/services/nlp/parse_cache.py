@@ -0,0 +1,196 @@
+import os
+import logging
+import json
+import copy
+import uuid
+import atexit
+import threading
+from collections import OrderedDict
+from .command_document import CommandDocument
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class ParseCache:
+    """
+    Bounded LRU cache of parsed command operations.
+    Commands are keyed by their lowercase, whitespace-normalized text, so
+    repeated phrasings skip the NLP pipeline. Entries are tied to the
+    vocabulary fingerprint of the parser that produced them and are dropped
+    when it changes; the cache can optionally be persisted to a JSON file.
+    """
+
+    def __init__(self, max_entries=1024, persist_path=None, save_interval=50):
+        """
+        Initialize the ParseCache.
+
+        Args:
+            max_entries (int): Maximum number of cached operations
+            persist_path (str, optional): JSON file the cache is loaded from and saved to
+            save_interval (int): Number of new entries after which a persisted cache is saved
+        """
+        logger.info("Initializing ParseCache")
+        self.max_entries = max_entries
+        self.persist_path = persist_path
+        self.save_interval = save_interval
+        self.fingerprint = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._unsaved = 0
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'invalidations': 0
+        }
+
+        if persist_path:
+            self._load()
+            atexit.register(self.save)
+
+    @staticmethod
+    def normalize(text):
+        """
+        Get the cache key of a command.
+
+        Args:
+            text (str or CommandDocument): Command text or analyzed document
+
+        Returns:
+            str: Lowercase command text with whitespace collapsed
+        """
+        return ' '.join(CommandDocument.from_source(text).whitespace_words)
+
+    def validate(self, fingerprint):
+        """
+        Drop every entry if the vocabularies they were parsed with have changed.
+
+        Args:
+            fingerprint (str): Vocabulary fingerprint of the parser
+        """
+        with self._lock:
+            if fingerprint == self.fingerprint:
+                return
+            if self._entries:
+                logger.info(f"Vocabulary changed, dropping {len(self._entries)} cached command parses")
+                self._stats['invalidations'] += 1
+                self._unsaved += 1
+            self._entries.clear()
+            self.fingerprint = fingerprint
+
+    def get(self, key):
+        """
+        Look up a cached operation.
+
+        Args:
+            key (str): Normalized command text
+
+        Returns:
+            dict: Copy of the cached operation, or None on a miss
+        """
+        with self._lock:
+            operation = self._entries.get(key)
+            if operation is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return copy.deepcopy(operation)
+
+    def put(self, key, operation):
+        """
+        Cache an operation, evicting the least recently used one if the cache is full.
+
+        Args:
+            key (str): Normalized command text
+            operation (dict): Parsed operation (must be JSON-serializable to be persisted)
+        """
+        with self._lock:
+            self._entries[key] = copy.deepcopy(operation)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+            self._unsaved += 1
+            save_now = self.persist_path and self._unsaved >= self.save_interval
+
+        if save_now:
+            self.save()
+
+    def clear(self):
+        """
+        Drop every cached operation.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._unsaved += 1
+
+    def get_stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: Hit, miss, eviction and invalidation counts, hit rate and size
+        """
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return dict(
+                self._stats,
+                hit_rate=self._stats['hits'] / lookups if lookups else 0.0,
+                entries=len(self._entries),
+                max_entries=self.max_entries
+            )
+
+    def save(self):
+        """
+        Write the cache to its persistence file.
+
+        Returns:
+            bool: True if the cache was saved
+        """
+        if not self.persist_path:
+            return False
+
+        with self._lock:
+            if not self._unsaved:
+                return True
+            content = {
+                'fingerprint': self.fingerprint,
+                'entries': list(self._entries.items())
+            }
+            self._unsaved = 0
+
+        # Unique per writer: threads and worker processes may share the persistence file
+        temp_path = f"{self.persist_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            directory = os.path.dirname(self.persist_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(temp_path, 'w') as f:
+                json.dump(content, f, default=str)
+            os.replace(temp_path, self.persist_path)
+            return True
+        except Exception as e:
+            logger.error(f"Error saving parse cache: {str(e)}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
+
+    def _load(self):
+        """
+        Read the cache from its persistence file.
+        """
+        if not os.path.exists(self.persist_path):
+            return
+
+        try:
+            with open(self.persist_path, 'r') as f:
+                content = json.load(f)
+            self.fingerprint = content.get('fingerprint')
+            for key, operation in content.get('entries', [])[-self.max_entries:]:
+                self._entries[key] = operation
+            logger.info(f"Loaded {len(self._entries)} cached command parses")
+        except Exception as e:
+            logger.warning(f"Discarding unreadable parse cache {self.persist_path}: {str(e)}")
+            self._entries.clear()
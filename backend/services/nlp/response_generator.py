@@ -13,12 +13,15 @@ class ResponseGenerator:
     Converts parsed operations into natural language responses.
     """
     
-    def __init__(self):
+    def __init__(self, command_parser=None):
         """
         Initialize the ResponseGenerator.
+        
+        Args:
+            command_parser (CommandParser, optional): Command parser to use
         """
         logger.info("Initializing ResponseGenerator")
-        self.command_parser = CommandParser()
+        self.command_parser = command_parser or CommandParser()
         self._load_response_templates()
     
     def _load_response_templates(self):
@@ -421,7 +424,7 @@ class ResponseGenerator:
         Process a user command and generate a response.
         
         Args:
-            text (str): User command text
+            text (str or CommandDocument): User command text
             
         Returns:
             dict: Response with message, follow-up, and suggestions
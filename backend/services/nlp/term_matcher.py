@@ -0,0 +1,73 @@
+import logging
+from .command_document import CommandDocument
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class TermMatcher:
+    """
+    Multi-term matcher over command tokens.
+    Vocabulary terms (single words or phrases) are stored in a trie keyed
+    by token, so every term in a command is found in one pass over its
+    tokens; the cost depends on the command length and the longest phrase,
+    not on the size of the vocabulary.
+    """
+
+    # Trie key holding the payloads of terms ending at a node (tokens are never None)
+    _TERMINAL = None
+
+    def __init__(self):
+        """
+        Initialize the TermMatcher.
+        """
+        self._root = {}
+        self._term_count = 0
+
+    def __len__(self):
+        return self._term_count
+
+    def add(self, term, payload):
+        """
+        Add a vocabulary term.
+
+        Args:
+            term (str): Word or phrase, matched case-insensitively and token by token
+            payload (object): Value reported when the term matches
+        """
+        tokens = CommandDocument(term).words
+        if not tokens:
+            return
+
+        node = self._root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node.setdefault(self._TERMINAL, []).append(payload)
+        self._term_count += 1
+
+    def match(self, text):
+        """
+        Find every vocabulary term in a command.
+
+        Args:
+            text (str or CommandDocument): Command text or analyzed document
+
+        Returns:
+            list: (payload, start, end) tuples with the character span of each match, in text order
+        """
+        tokens = CommandDocument.from_source(text).tokens
+        matches = []
+
+        for index, (_, start, _) in enumerate(tokens):
+            node = self._root
+            position = index
+            while position < len(tokens):
+                token, _, end = tokens[position]
+                node = node.get(token)
+                if node is None:
+                    break
+                for payload in node.get(self._TERMINAL, ()):
+                    matches.append((payload, start, end))
+                position += 1
+
+        return matches
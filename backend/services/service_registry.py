@@ -0,0 +1,185 @@
+import logging
+import importlib
+import sys
+import threading
+import time
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class ServiceRegistry:
+    """
+    Registry that imports and constructs services on first use.
+    Import and construction times are recorded per module and per service,
+    so slow cold starts can be traced to the dependency responsible.
+    """
+
+    def __init__(self):
+        """
+        Initialize the ServiceRegistry.
+        """
+        self.created_at = time.time()
+        self._factories = {}
+        self._warmups = {}
+        self._instances = {}
+        self._lock = threading.RLock()
+        self.import_timings = {}
+        self.service_timings = {}
+        self.warmup_timings = {}
+
+    def register(self, name, factory, warmup=None):
+        """
+        Register a service factory.
+
+        Args:
+            name (str): Service name
+            factory (callable): Function called without arguments that builds the service
+            warmup (callable, optional): Function called with the service to preload expensive resources
+        """
+        self._factories[name] = factory
+        if warmup:
+            self._warmups[name] = warmup
+
+    def import_module(self, module_name):
+        """
+        Import a module, recording how long the first import took.
+
+        Args:
+            module_name (str): Dotted module name
+
+        Returns:
+            module: Imported module
+        """
+        if module_name in sys.modules:
+            return sys.modules[module_name]
+
+        start_time = time.perf_counter()
+        module = importlib.import_module(module_name)
+        self.import_timings[module_name] = time.perf_counter() - start_time
+        return module
+
+    def load(self, module_name, attribute):
+        """
+        Import a module and get one of its attributes.
+
+        Args:
+            module_name (str): Dotted module name
+            attribute (str): Attribute name, usually a class
+
+        Returns:
+            object: Attribute value
+        """
+        return getattr(self.import_module(module_name), attribute)
+
+    def get(self, name):
+        """
+        Get a service, constructing it on first use.
+
+        Args:
+            name (str): Service name
+
+        Returns:
+            object: Service instance
+        """
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            if name not in self._instances:
+                if name not in self._factories:
+                    raise KeyError(f"Unknown service: {name}")
+
+                logger.info(f"Loading service: {name}")
+                start_time = time.perf_counter()
+                self._instances[name] = self._factories[name]()
+                self.service_timings[name] = time.perf_counter() - start_time
+                logger.info(f"Service {name} loaded in {self.service_timings[name]:.3f}s")
+
+            return self._instances[name]
+
+    def is_loaded(self, name):
+        """
+        Check whether a service has been constructed.
+
+        Args:
+            name (str): Service name
+
+        Returns:
+            bool: True if the service exists
+        """
+        return name in self._instances
+
+    def proxy(self, name):
+        """
+        Get a stand-in that constructs the service on first attribute access.
+
+        Args:
+            name (str): Service name
+
+        Returns:
+            LazyService: Service proxy
+        """
+        return LazyService(self, name)
+
+    def warmup(self, names=None):
+        """
+        Construct services and run their warmup hooks.
+
+        Args:
+            names (list, optional): Services to warm up (defaults to all)
+
+        Returns:
+            dict: Timing report
+        """
+        for name in names or list(self._factories):
+            service = self.get(name)
+
+            warmup = self._warmups.get(name)
+            if warmup and name not in self.warmup_timings:
+                start_time = time.perf_counter()
+                warmup(service)
+                self.warmup_timings[name] = time.perf_counter() - start_time
+
+        report = self.get_timings()
+        logger.info(f"Services warmed up: {report}")
+        return report
+
+    def get_timings(self):
+        """
+        Get the startup timing report.
+
+        Returns:
+            dict: Seconds spent per import, per service construction and per warmup hook
+        """
+        return {
+            'imports': dict(self.import_timings),
+            'services': dict(self.service_timings),
+            'warmups': dict(self.warmup_timings),
+            'loaded': sorted(self._instances),
+            'pending': sorted(set(self._factories) - set(self._instances))
+        }
+
+
+class LazyService:
+    """
+    Proxy that forwards attribute access to a registry service, constructing it on first use.
+    """
+
+    def __init__(self, registry, name):
+        """
+        Initialize the LazyService.
+
+        Args:
+            registry (ServiceRegistry): Registry that owns the service
+            name (str): Service name
+        """
+        object.__setattr__(self, '_registry', registry)
+        object.__setattr__(self, '_name', name)
+
+    def __getattr__(self, attribute):
+        return getattr(self._registry.get(self._name), attribute)
+
+    def __setattr__(self, attribute, value):
+        setattr(self._registry.get(self._name), attribute, value)
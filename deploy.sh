@@ -31,7 +31,13 @@ cat > $DEPLOY_DIR/start.sh << 'EOF'
 # Start the ProductPro AI application
 export FLASK_APP=backend/api/app.py
 export FLASK_ENV=production
-gunicorn --bind 0.0.0.0:5000 backend.api.app:app
+# Workers share one SQLite database: the project store, with per-project optimistic
+# concurrency, and the analysis job records, so any worker can answer a job status poll
+export PRODUCTPRO_SHARED_STORE=1
+export PRODUCTPRO_WORKERS=${PRODUCTPRO_WORKERS:-$(nproc)}
+# Each worker runs its own batch analysis process pool; PRODUCTPRO_BATCH_WORKERS sets
+# its size, which defaults to the cores divided among the workers
+gunicorn --workers "$PRODUCTPRO_WORKERS" --bind 0.0.0.0:5000 backend.api.app:app
 EOF
 
 chmod +x $DEPLOY_DIR/start.sh
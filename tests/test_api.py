@@ -2,6 +2,7 @@ import unittest
 import sys
 import os
 import json
+import shutil
 
 # Add backend directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -129,6 +130,45 @@ class APITestCase(unittest.TestCase):
         self.assertTrue('session_id' in data)
         self.assertEqual(data['name'], 'Test Collaboration Session')
         self.assertEqual(data['project_id'], project_id)
+    
+    def test_startup_report(self):
+        """Test that services are constructed on first use and timed"""
+        self.app.get('/api/materials')
+        
+        response = self.app.get('/api/startup-report')
+        data = json.loads(response.data)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(data['success'])
+        self.assertIn('material_database', data['timings']['loaded'])
+        self.assertIn('material_database', data['timings']['services'])
+        self.assertIn('services.design_engine.material_database', data['timings']['imports'])
+    
+    def test_artifact_source_pending(self):
+        """Test that artifacts of an upload still being stored are retryable rather than missing"""
+        from backend.api.app import image_analyzer
+        
+        analysis_id = 'e' * 64
+        self.addCleanup(shutil.rmtree, image_analyzer._artifact_dir(analysis_id), True)
+        image_analyzer._write_artifact_manifest(analysis_id, {'image_path': '/nonexistent/pending.png'})
+        original_wait = app.config['ARTIFACT_SOURCE_WAIT']
+        app.config['ARTIFACT_SOURCE_WAIT'] = 0.2
+        try:
+            response = self.app.get(f'/api/analyses/{analysis_id}/artifacts/palette')
+        finally:
+            app.config['ARTIFACT_SOURCE_WAIT'] = original_wait
+        
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], '1')
+        self.assertEqual(self.app.get(f"/api/analyses/{'f' * 64}/artifacts/palette").status_code, 404)
+    
+    def test_analyze_batch_requires_images(self):
+        """Test that a batch without images is rejected before any work starts"""
+        response = self.app.post('/api/analyze-batch', data={}, content_type='multipart/form-data')
+        data = json.loads(response.data)
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', data)
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,6 +1,10 @@
 import unittest
 import sys
 import os
+import json
+import tempfile
+import shutil
+import threading
 
 # Add backend directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -12,6 +16,7 @@ from backend.services.design_engine.industry_standards import IndustryStandards
 from backend.services.design_engine.sustainability_analyzer import SustainabilityAnalyzer
 from backend.services.design_engine.trend_analyzer import TrendAnalyzer
 from backend.services.design_engine.compliance_checker import ComplianceChecker
+from backend.services.design_engine.project_store import ProjectVersionConflict
 
 class DesignEngineTestCase(unittest.TestCase):
     """Test case for the design engine components"""
@@ -91,6 +96,270 @@ class DesignEngineTestCase(unittest.TestCase):
         # Verify configuration has expected fields
         self.assertTrue('name' in furniture_config)
         self.assertTrue('design_principles' in furniture_config)
+    
+    def test_delta_version_history(self):
+        """Test delta-encoded project history and version materialization"""
+        manager = DesignManager(history_checkpoint_interval=3)
+        project_id = manager.create_design_project(name="History Chair", industry="furniture", template_id="chair")
+        
+        expected_states = {}
+        for index in range(7):
+            project = manager.get_design_project(project_id)
+            expected_states[project['version']] = {
+                key: value for key, value in json.loads(json.dumps(project)).items() if key != 'version_history'
+            }
+            manager.update_design_project(project_id, {'description': f"Revision {index}"})
+        
+        history = manager.get_design_project(project_id)['version_history']
+        self.assertEqual(len(history), 8)
+        self.assertEqual(['checkpoint' in entry for entry in history],
+                         [True, False, False, True, False, False, True, False])
+        for version, state in expected_states.items():
+            self.assertEqual(manager.get_project_version(project_id, version), state)
+        self.assertEqual(len(manager.get_project_versions(project_id)), 8)
+    
+    def test_version_history_covers_every_mutation(self):
+        """Test that every project mutation is recorded in the version history"""
+        data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, data_dir)
+        database_path = os.path.join(data_dir, 'design_database.json')
+        
+        manager = DesignManager(
+            material_service=self.material_database,
+            sustainability_service=self.sustainability_analyzer,
+            database_path=database_path
+        )
+        project_id = manager.create_design_project(name="Tracked Chair", industry="furniture", template_id="chair")
+        component_name = manager.get_design_project(project_id)['components'][0]['name']
+        material_id = next(iter(self.material_database.materials))
+        
+        expected_states = {}
+        mutations = [
+            lambda: manager.set_design_parameter(project_id, "style", "modern"),
+            lambda: manager.select_material(project_id, component_name, material_id),
+            lambda: manager.attach_image_analysis(project_id, "chair.jpg", {'colors': []}),
+            lambda: manager.analyze_design(project_id),
+            lambda: manager.generate_design_recommendations(project_id),
+            lambda: manager.update_design_project(project_id, {'status': 'review'})
+        ]
+        for mutate in mutations:
+            project = manager.get_design_project(project_id)
+            expected_states[project['version']] = {
+                key: value for key, value in json.loads(json.dumps(project)).items() if key != 'version_history'
+            }
+            mutate()
+        manager.design_projects.close()
+        
+        reloaded = DesignManager(database_path=database_path)
+        versions = [entry['version'] for entry in reloaded.get_project_versions(project_id)]
+        self.assertEqual(versions, list(range(1, len(mutations) + 2)))
+        for version, state in expected_states.items():
+            self.assertEqual(reloaded.get_project_version(project_id, version), state)
+    
+    def test_legacy_history_backfill(self):
+        """Test that reads leave history alone and the next save records a missing current version"""
+        manager = DesignManager()
+        project_id = manager.create_design_project(name="Legacy Chair", industry="furniture")
+        
+        # A version saved without recording history, as before every save recorded one
+        legacy = dict(manager.get_design_project(project_id), description="Legacy revision")
+        manager.design_projects.save_project(project_id, legacy)
+        legacy_state = {
+            key: value for key, value in json.loads(json.dumps(legacy)).items() if key != 'version_history'
+        }
+        
+        manager.get_design_project(project_id)
+        self.assertEqual(len(manager.get_design_project(project_id)['version_history']), 1)
+        self.assertEqual([entry['version'] for entry in manager.get_project_versions(project_id)], [1, 2])
+        
+        manager.update_design_project(project_id, {'status': 'review'})
+        self.assertEqual([entry['version'] for entry in manager.get_project_versions(project_id)], [1, 2, 3])
+        self.assertEqual(manager.get_project_version(project_id, 2), legacy_state)
+    
+    def test_project_listing(self):
+        """Test paginated, filtered and projected project listing in both storage backends"""
+        data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, data_dir)
+        managers = [
+            DesignManager(),
+            DesignManager(database_path=os.path.join(data_dir, 'design_database.sqlite3'), storage_backend='sqlite')
+        ]
+        
+        for manager in managers:
+            for index in range(7):
+                manager.create_design_project(name=f"Project {index}", industry='furniture' if index % 2 else 'packaging')
+            
+            names = []
+            cursor = None
+            while True:
+                page = manager.list_design_projects(industry='furniture', sort='name', descending=False,
+                                                    limit=2, cursor=cursor, fields=['id', 'name'])
+                for project in page['projects']:
+                    self.assertEqual(set(project), {'id', 'name'})
+                    names.append(project['name'])
+                cursor = page['next_cursor']
+                if not cursor:
+                    break
+            self.assertEqual(names, ["Project 1", "Project 3", "Project 5"])
+            
+            page = manager.list_design_projects(limit=3)
+            self.assertEqual(len(page['projects']), 3)
+            self.assertNotIn('version_history', page['projects'][0])
+            
+            with self.assertRaises(ValueError):
+                manager.list_design_projects(sort='description')
+    
+    def test_journal_replay(self):
+        """Test that journaled project changes survive a restart"""
+        data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, data_dir)
+        database_path = os.path.join(data_dir, 'design_database.json')
+        
+        manager = DesignManager(database_path=database_path)
+        manager.save_database()
+        kept_id = manager.create_design_project(name="Kept", industry="furniture")
+        deleted_id = manager.create_design_project(name="Deleted", industry="furniture")
+        manager.update_design_project(kept_id, {'status': 'review'})
+        manager.delete_design_project(deleted_id)
+        manager.design_projects.close()
+        
+        reloaded = DesignManager(database_path=database_path)
+        self.assertEqual(reloaded.get_design_project(kept_id)['status'], 'review')
+        self.assertEqual(reloaded.get_design_project(deleted_id), {})
+    
+    def test_journal_compaction(self):
+        """Test that compaction folds the journal into the snapshot"""
+        data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, data_dir)
+        database_path = os.path.join(data_dir, 'design_database.json')
+        
+        manager = DesignManager(database_path=database_path)
+        project_id = manager.create_design_project(name="Compacted", industry="furniture")
+        self.assertTrue(manager.compact_database())
+        manager.update_design_project(project_id, {'status': 'final'})
+        manager.design_projects.close()
+        
+        self.assertFalse(os.path.exists(manager.design_projects.journal.compacting_path))
+        reloaded = DesignManager(database_path=database_path)
+        self.assertEqual(reloaded.get_design_project(project_id)['status'], 'final')
+    
+    def test_compaction_during_writes(self):
+        """Test that compaction takes consistent snapshots while projects are created and deleted"""
+        data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, data_dir)
+        database_path = os.path.join(data_dir, 'design_database.json')
+        
+        manager = DesignManager(database_path=database_path)
+        manager.save_database()
+        compactions = []
+        
+        def write_projects():
+            for index in range(100):
+                project_id = manager.create_design_project(name=f"Churn {index}", industry="furniture")
+                if index % 2:
+                    manager.delete_design_project(project_id)
+        
+        def compact():
+            for _ in range(20):
+                compactions.append(manager.compact_database())
+        
+        threads = [threading.Thread(target=write_projects) for _ in range(4)] + [threading.Thread(target=compact)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertTrue(any(compactions))
+        self.assertTrue(manager.compact_database())
+        manager.design_projects.close()
+        self.assertEqual([name for name in os.listdir(data_dir) if name.endswith('.tmp')], [])
+        
+        reloaded = DesignManager(database_path=database_path)
+        self.assertEqual(len(reloaded.design_projects), len(manager.design_projects))
+        self.assertEqual(len(reloaded.design_projects), 200)
+    
+    def test_compaction_during_updates(self):
+        """Test that compaction snapshots whole project versions while a project is updated"""
+        data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, data_dir)
+        database_path = os.path.join(data_dir, 'design_database.json')
+        
+        manager = DesignManager(database_path=database_path)
+        project_id = manager.create_design_project(name="Busy Chair", industry="furniture", template_id="chair")
+        updating = threading.Event()
+        compactions = []
+        
+        def update_project():
+            for index in range(300):
+                manager.update_design_project(project_id, {'description': f"Revision {index}", f"note_{index}": index})
+            updating.set()
+        
+        def compact():
+            while not updating.is_set():
+                compactions.append(manager.design_projects.compact())
+        
+        threads = [threading.Thread(target=update_project), threading.Thread(target=compact)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertTrue(compactions)
+        self.assertTrue(all(compactions))
+        with open(database_path) as f:
+            snapshot = json.load(f)['design_projects'][project_id]
+        self.assertEqual(snapshot['version_history'][-1]['version'], snapshot['version'])
+        
+        manager.design_projects.close()
+        reloaded = DesignManager(database_path=database_path)
+        project = reloaded.get_design_project(project_id)
+        self.assertEqual(project['version'], 301)
+        self.assertEqual(project['description'], "Revision 299")
+        self.assertEqual([entry['version'] for entry in project['version_history']], list(range(1, 302)))
+    
+    def test_sqlite_project_store(self):
+        """Test design projects persisted in the SQLite storage backend"""
+        data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, data_dir)
+        database_path = os.path.join(data_dir, 'design_database.sqlite3')
+        
+        manager = DesignManager(database_path=database_path, storage_backend='sqlite')
+        project_id = manager.create_design_project(name="SQLite Chair", industry="furniture", template_id="chair")
+        manager.set_design_parameter(project_id, "style", "modern")
+        deleted_id = manager.create_design_project(name="Removed", industry="furniture")
+        manager.delete_design_project(deleted_id)
+        manager.design_projects.close()
+        
+        reloaded = DesignManager(database_path=database_path, storage_backend='sqlite')
+        self.assertEqual(len(reloaded.design_projects), 1)
+        project = reloaded.get_design_project(project_id)
+        self.assertEqual(project['name'], "SQLite Chair")
+        self.assertEqual(project['design_parameters']['style']['selected'], "modern")
+        self.assertGreater(len(reloaded.get_industry_templates('furniture')), 0)
+    
+    def test_shared_store_version_conflict(self):
+        """Test optimistic concurrency between workers sharing a SQLite store"""
+        data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, data_dir)
+        database_path = os.path.join(data_dir, 'design_database.sqlite3')
+        
+        worker_a = DesignManager(database_path=database_path, storage_backend='sqlite', shared_store=True)
+        worker_b = DesignManager(database_path=database_path, storage_backend='sqlite', shared_store=True)
+        project_id = worker_a.create_design_project(name="Shared Chair", industry="furniture")
+        
+        # Each worker sees the other's writes
+        version = worker_b.get_design_project(project_id)['version']
+        stale_project = worker_b.get_design_project(project_id)
+        self.assertTrue(worker_a.update_design_project(project_id, {'status': 'review'}, expected_version=version))
+        self.assertEqual(worker_b.get_design_project(project_id)['status'], 'review')
+        
+        # Writes based on an old version are rejected
+        with self.assertRaises(ProjectVersionConflict):
+            worker_b.update_design_project(project_id, {'status': 'final'}, expected_version=version)
+        stale_project['status'] = 'archived'
+        with self.assertRaises(ProjectVersionConflict):
+            worker_b.design_projects.save_project(project_id, stale_project)
+        self.assertEqual(worker_a.get_design_project(project_id)['status'], 'review')
 
 if __name__ == '__main__':
     unittest.main()
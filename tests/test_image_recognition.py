@@ -1,6 +1,15 @@
 import unittest
 import sys
 import os
+import io
+import time
+import tempfile
+import shutil
+import threading
+import zipfile
+import numpy as np
+import cv2
+from PIL import Image
 
 # Add backend directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -10,6 +19,16 @@ from backend.services.image_recognition.color_extractor import ColorExtractor
 from backend.services.image_recognition.texture_analyzer import TextureAnalyzer
 from backend.services.image_recognition.shape_detector import ShapeDetector
 from backend.services.image_recognition.image_analyzer import ImageAnalyzer
+from backend.services.image_recognition.analysis_jobs import AnalysisJobQueue, SqliteJobStore
+from backend.services.image_recognition.image_frame import ImageFrame
+from backend.services.image_recognition.analysis_cache import AnalysisCache
+from backend.services.image_recognition.feature_batcher import FeatureBatcher
+from backend.services.image_recognition.embedding_store import EmbeddingStore
+from backend.services.image_recognition.embedding_index import EmbeddingIndex
+from backend.services.image_recognition.palette_benchmark import run_benchmark, synthetic_images
+from backend.services.image_recognition.shape_benchmark import run_benchmark as run_shape_benchmark, synthetic_shapes
+from backend.services.image_recognition.batch_analyzer import BatchAnalyzer, collect_images
+from backend.services.image_recognition.upload_ingest import UploadIngestor
 
 class ImageRecognitionTestCase(unittest.TestCase):
     """Test case for the image recognition components"""
@@ -42,6 +61,467 @@ class ImageRecognitionTestCase(unittest.TestCase):
         # Check that the analyze_image method exists
         self.assertTrue(hasattr(self.image_analyzer, 'analyze_image'))
         self.assertTrue(callable(getattr(self.image_analyzer, 'analyze_image')))
+    
+    def test_image_frame_caching(self):
+        """Test that an image frame decodes once and caches derived representations"""
+        image_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, image_dir)
+        image_path = os.path.join(image_dir, 'sample.png')
+        Image.new('RGBA', (640, 480), (200, 40, 40, 255)).save(image_path)
+        
+        frame = ImageFrame.from_path(image_path)
+        self.assertEqual(frame.name, 'sample')
+        self.assertEqual(frame.resized(150, 'rgb').shape, (150, 150, 3))
+        self.assertEqual(frame.resized(256, 'gray').shape, (256, 256))
+        self.assertIs(frame.resized(512, 'gray'), frame.resized(512, 'gray'))
+        self.assertIs(ImageFrame.from_source(frame), frame)
+        self.assertEqual(tuple(frame.rgb[0, 0]), (200, 40, 40))
+    
+    def test_analysis_job_queue(self):
+        """Test background analysis jobs and queue bounds"""
+        job_queue = AnalysisJobQueue(max_workers=1, max_pending=1)
+        
+        slow_job = job_queue.submit(lambda: time.sleep(0.2) or {'status': 'done'})
+        time.sleep(0.05)
+        failing_job = job_queue.submit(lambda: 1 / 0)
+        self.assertIsNone(job_queue.submit(lambda: None))
+        
+        deadline = time.time() + 5
+        while job_queue.get_job(failing_job)['status'] != 'failed' and time.time() < deadline:
+            time.sleep(0.01)
+        
+        self.assertEqual(job_queue.get_job(slow_job)['status'], 'completed')
+        self.assertEqual(job_queue.get_job(slow_job)['result'], {'status': 'done'})
+        self.assertEqual(job_queue.get_job(failing_job)['status'], 'failed')
+        self.assertIsNone(job_queue.get_job('unknown'))
+    
+    def test_shared_analysis_jobs(self):
+        """Test that jobs in a shared store can be polled through another worker's queue"""
+        data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, data_dir)
+        database_path = os.path.join(data_dir, 'design_database.sqlite3')
+        worker_a = AnalysisJobQueue(max_workers=1, job_store=SqliteJobStore(database_path))
+        worker_b = AnalysisJobQueue(max_workers=1, job_store=SqliteJobStore(database_path))
+        
+        job_id = worker_a.submit(lambda: {'colors': ['#ff0000']}, metadata={'tier': 'fast'})
+        failing_job = worker_a.submit(lambda: 1 / 0)
+        deadline = time.time() + 5
+        while worker_b.get_job(failing_job)['status'] != 'failed' and time.time() < deadline:
+            time.sleep(0.01)
+        
+        job = worker_b.get_job(job_id)
+        self.assertEqual(job['status'], 'completed')
+        self.assertEqual(job['result'], {'colors': ['#ff0000']})
+        self.assertEqual(job['metadata'], {'tier': 'fast'})
+        self.assertIn('division', worker_b.get_job(failing_job)['error'])
+        self.assertEqual(worker_b.get_stats()['jobs'], {'completed': 1, 'failed': 1})
+        self.assertIsNone(worker_b.get_job('unknown'))
+        
+        worker_b.result_ttl = -1
+        worker_b.submit(lambda: None)
+        self.assertIsNone(worker_a.get_job(job_id))
+    
+    def test_orphaned_analysis_jobs(self):
+        """Test that jobs left unfinished by a stopped worker are reported as failed"""
+        data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, data_dir)
+        database_path = os.path.join(data_dir, 'design_database.sqlite3')
+        
+        # A worker that stopped while its job was running
+        SqliteJobStore(database_path).add({
+            'id': 'orphan', 'status': 'running', 'metadata': {}, 'created_at': time.time(), 'started_at': time.time()
+        })
+        
+        job_queue = AnalysisJobQueue(
+            max_workers=1, job_store=SqliteJobStore(database_path, stale_after=0.5), heartbeat_interval=0.05
+        )
+        slow_job = job_queue.submit(lambda: time.sleep(1.0) or 'done')
+        time.sleep(0.7)
+        
+        orphan = job_queue.get_job('orphan')
+        self.assertEqual(orphan['status'], 'failed')
+        self.assertEqual(orphan['error'], SqliteJobStore.STALE_ERROR)
+        self.assertEqual(job_queue.get_job(slow_job)['status'], 'running')
+        
+        deadline = time.time() + 5
+        while job_queue.get_job(slow_job)['status'] != 'completed' and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(job_queue.get_job(slow_job)['result'], 'done')
+    
+    def test_reduced_decoding(self):
+        """Test that large images are decoded no larger than the stages need"""
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir)
+        image = Image.new('RGB', (2400, 1600), (40, 90, 160))
+        jpeg_path = os.path.join(output_dir, 'large.jpg')
+        png_path = os.path.join(output_dir, 'large.png')
+        image.save(jpeg_path)
+        image.save(png_path)
+        
+        for path in (jpeg_path, png_path):
+            frame = ImageFrame.from_path(path, min_size=256)
+            self.assertEqual(frame.size, (2400, 1600))
+            self.assertLess(frame.decoded_size[0], 2400)
+            self.assertGreaterEqual(min(frame.decoded_size), 256)
+            self.assertEqual(frame.resized(256, 'rgb').shape, (256, 256, 3))
+        
+        self.assertEqual(ImageFrame.from_path(jpeg_path, min_size=256).decoded_size, (600, 400))
+        self.assertEqual(ImageFrame.from_path(jpeg_path).decoded_size, (2400, 1600))
+        
+        palette = self.color_extractor.get_color_palette(jpeg_path)
+        dominant = [int(palette['hex_colors'][0][i:i + 2], 16) for i in (1, 3, 5)]
+        self.assertLessEqual(max(abs(a - b) for a, b in zip(dominant, (40, 90, 160))), 4)
+    
+    def test_upload_ingestion(self):
+        """Test analyzing an upload from memory while the original is stored in the background"""
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir)
+        buffer = io.BytesIO()
+        Image.new('RGB', (320, 240), (200, 120, 30)).save(buffer, 'PNG')
+        image_data = buffer.getvalue()
+        file_path = os.path.join(output_dir, 'uploads', 'upload.png')
+        
+        ingestor = UploadIngestor(os.path.join(output_dir, 'uploads'))
+        analyzer = ImageAnalyzer(output_dir=os.path.join(output_dir, 'output'))
+        analysis_id = ingestor.ingest(image_data, file_path)
+        self.assertEqual(analysis_id, AnalysisCache.hash_content(image_data))
+        
+        results = analyzer.analyze_image(file_path, analysis_id=analysis_id, image_data=image_data)
+        self.assertNotIn('error', results)
+        self.assertEqual(results['analysis_id'], analysis_id)
+        
+        self.assertTrue(ingestor.wait(file_path, timeout=5))
+        with open(file_path, 'rb') as f:
+            self.assertEqual(f.read(), image_data)
+        stats = ingestor.get_stats()
+        self.assertEqual((stats['ingested'], stats['written'], stats['pending']), (1, 1, 0))
+        
+        frame = ImageFrame.from_bytes(image_data, min_size=64)
+        self.assertEqual(frame.size, (320, 240))
+        self.assertEqual(frame.decoded_size, (107, 80))
+    
+    def test_analysis_cache(self):
+        """Test content-addressed analysis caching and disk eviction"""
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        
+        content_hash = AnalysisCache.hash_content(b'image bytes')
+        self.assertEqual(content_hash, AnalysisCache.hash_content(bytearray(b'image bytes')))
+        key = AnalysisCache.make_key(content_hash, {'n_colors': 5})
+        self.assertNotEqual(key, AnalysisCache.make_key(content_hash, {'n_colors': 8}))
+        
+        cache = AnalysisCache(cache_dir, memory_entries=1)
+        self.assertIsNone(cache.get(key))
+        cache.put(key, {'texture_analysis': {'roughness': 0.5}})
+        cached = cache.get(key)
+        cached['texture_analysis']['roughness'] = 1.0
+        self.assertEqual(cache.get(key)['texture_analysis']['roughness'], 0.5)
+        
+        # A new cache instance finds the entry in the disk tier
+        self.assertEqual(AnalysisCache(cache_dir).get(key), {'texture_analysis': {'roughness': 0.5}})
+        
+        # Concurrent writers of one key never see each other's partial files
+        writers = [threading.Thread(target=AnalysisCache(cache_dir).put, args=(key, {'writer': index, 'padding': 'x' * 4096}))
+                   for index in range(8)]
+        for writer in writers:
+            writer.start()
+        for writer in writers:
+            writer.join()
+        self.assertIn(AnalysisCache(cache_dir).get(key)['writer'], range(8))
+        self.assertFalse([name for _, _, files in os.walk(cache_dir) for name in files if name.endswith('.tmp')])
+        
+        small_cache = AnalysisCache(tempfile.mkdtemp(dir=cache_dir), max_disk_bytes=200)
+        for index in range(10):
+            small_cache.put(f"{index:064d}-config", {'index': index, 'padding': 'x' * 40})
+        self.assertLessEqual(small_cache.get_stats()['disk_bytes'], 200)
+        self.assertEqual(small_cache.get(f"{9:064d}-config")['index'], 9)
+    
+    def test_lazy_artifact_rendering(self):
+        """Test that visualizations are rendered only when first requested"""
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir)
+        image_path = os.path.join(output_dir, 'sample.png')
+        Image.new('RGB', (320, 240), (30, 120, 200)).save(image_path)
+        
+        analyzer = ImageAnalyzer(output_dir=output_dir)
+        results = analyzer.analyze_image(image_path)
+        self.assertEqual(results['artifacts'], list(ImageAnalyzer.ARTIFACTS))
+        artifact_dir = os.path.join(output_dir, 'artifacts', results['analysis_id'])
+        self.assertFalse(any(name.endswith('.png') for name in os.listdir(artifact_dir)))
+        
+        texture_path = analyzer.render_artifact(results['analysis_id'], 'texture')
+        self.assertTrue(os.path.exists(texture_path))
+        self.assertEqual(analyzer.render_artifact(results['analysis_id'], 'texture'), texture_path)
+        self.assertIsNone(analyzer.render_artifact('0' * 64, 'palette'))
+        with self.assertRaises(ValueError):
+            analyzer.render_artifact(results['analysis_id'], 'unknown')
+        with self.assertRaises(ValueError):
+            analyzer.render_artifact('../etc', 'palette')
+    
+    def test_feature_batcher(self):
+        """Test that concurrent feature requests share batched forward passes"""
+        batch_sizes = []
+        
+        def predict(batch):
+            batch_sizes.append(len(batch))
+            time.sleep(0.02)
+            return batch * 2
+        
+        batcher = FeatureBatcher(predict, max_batch_size=4, max_latency=0.05)
+        results = {}
+        threads = [
+            threading.Thread(target=lambda i=i: results.__setitem__(i, batcher.predict(np.full(3, i))))
+            for i in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        for i in range(8):
+            self.assertEqual(results[i].tolist(), [i * 2] * 3)
+        self.assertLessEqual(max(batch_sizes), 4)
+        self.assertLess(len(batch_sizes), 8)
+        
+        metrics = batcher.get_metrics()
+        self.assertEqual(metrics['requests'], 8)
+        self.assertEqual(metrics['batches'], len(batch_sizes))
+        self.assertGreater(metrics['mean_batch_size'], 1)
+    
+    def test_embedding_similarity_search(self):
+        """Test embedding persistence and exact and partitioned nearest-neighbour search"""
+        store_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, store_dir)
+        
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(300, 16)).astype(np.float32)
+        store = EmbeddingStore(store_dir, dimension=16, initial_capacity=64)
+        for index, vector in enumerate(vectors):
+            self.assertEqual(store.add(f"image-{index}", vector, f"/uploads/{index}.png"), index)
+        self.assertEqual(store.add('image-5', vectors[5]), 5)
+        self.assertEqual(store.get_metadata([5])[5]['image_path'], '/uploads/5.png')
+        
+        # Concurrent writers adding the same analysis share one row
+        added_rows = []
+        writers = [
+            threading.Thread(target=lambda: added_rows.append(
+                EmbeddingStore(store_dir, dimension=16).add('image-shared', vectors[0], '/uploads/shared.png')
+            ))
+            for _ in range(8)
+        ]
+        for writer in writers:
+            writer.start()
+        for writer in writers:
+            writer.join()
+        self.assertEqual(added_rows, [300] * 8)
+        self.assertEqual(len(store), 301)
+        store.link_project('image-42', 'project-1')
+        self.assertEqual(len(EmbeddingStore(store_dir, dimension=16)), 301)
+        
+        query = vectors[42] + rng.normal(scale=0.01, size=16).astype(np.float32)
+        exact = EmbeddingIndex(store).search(query, k=3)
+        self.assertEqual(exact[0][0], 42)
+        self.assertGreater(exact[0][1], 0.99)
+        
+        # Answered by an exact scan while the partitions are built in the background
+        partitioned_index = EmbeddingIndex(store, partition_threshold=100, nprobe=17)
+        self.assertEqual(partitioned_index.search(query, k=3), exact)
+        self.assertTrue(partitioned_index.prepare(wait=True))
+        partitioned = partitioned_index.search(query, k=3)
+        self.assertEqual([row for row, _ in partitioned], [row for row, _ in exact])
+        self.assertFalse(EmbeddingIndex(store).prepare(wait=True))
+        self.assertNotIn(42, [row for row, _ in EmbeddingIndex(store).search(query, k=3, exclude_rows=[42])])
+        
+        metadata = store.get_metadata([42])
+        self.assertEqual(metadata[42]['analysis_id'], 'image-42')
+        self.assertEqual(metadata[42]['project_ids'], ['project-1'])
+    
+    def test_palette_methods(self):
+        """Test that every palette algorithm finds the colors of a three-color image"""
+        pixels = np.array([[200, 30, 30]] * 500 + [[20, 180, 40]] * 300 + [[30, 40, 210]] * 200, dtype=np.uint8)
+        extractor = ColorExtractor(n_colors=3)
+        
+        for method in ColorExtractor.METHODS:
+            palette, counts = extractor.compute_palette(pixels, method)
+            order = np.argsort(-counts)
+            self.assertEqual(counts.sum(), 1000, method)
+            self.assertLess(np.abs(palette[order[0]] - [200, 30, 30]).max(), 2, method)
+            if method != 'median_cut':  # median-cut splits boxes at the pixel median, not at color edges
+                self.assertEqual(counts[order].tolist(), [500, 300, 200], method)
+        
+        palette, _ = extractor.compute_palette(pixels, 'minibatch')
+        self.assertEqual(palette.tolist(), extractor.compute_palette(pixels, 'minibatch')[0].tolist())
+        with self.assertRaises(ValueError):
+            ColorExtractor(method='unknown')
+    
+    def test_palette_benchmark(self):
+        """Test the palette benchmark against full k-means"""
+        results = run_benchmark(synthetic_images(count=2), methods=('kmeans', 'histogram'), repeats=1)
+        self.assertEqual(set(results), {'kmeans', 'histogram'})
+        for result in results.values():
+            self.assertEqual(set(result), {'median_ms', 'mean_error', 'speedup', 'relative_error'})
+            self.assertGreater(result['median_ms'], 0)
+        self.assertEqual(results['kmeans']['relative_error'], 1.0)
+        self.assertLess(results['histogram']['relative_error'], 1.5)
+    
+    def test_texture_features_shared(self):
+        """Test that texture features are computed once and the HOG image only on demand"""
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir)
+        rng = np.random.default_rng(0)
+        frame = ImageFrame(Image.fromarray(rng.integers(0, 256, (300, 300, 3), dtype=np.uint8)), source_path='noise.png')
+        
+        analysis = self.texture_analyzer.analyze_texture(frame)
+        features = self.texture_analyzer.compute_features(frame)
+        self.assertIs(features, self.texture_analyzer.compute_features(frame))
+        self.assertIsNone(features._hog_image)
+        self.assertAlmostEqual(analysis['roughness'], float(np.mean(features.gradient_magnitude)))
+        
+        output_path = self.texture_analyzer.save_texture_visualization(frame, output_dir)
+        self.assertTrue(os.path.exists(output_path))
+        self.assertEqual(features.hog_image.shape, (256, 256))
+    
+    def test_shape_detector_pyramid(self):
+        """Test that pyramid shape detection matches full resolution on synthetic shapes"""
+        full_detector = ShapeDetector(mode='full')
+        pyramid_detector = ShapeDetector(mode='pyramid')
+        
+        for kind in ('circle', 'square', 'triangle'):
+            image = synthetic_shapes(kind)
+            full = full_detector.detect_shapes(ImageFrame(image))
+            pyramid = pyramid_detector.detect_shapes(ImageFrame(image))
+            
+            for key in ('dominant_shapes', 'shape_count', 'has_straight_lines', 'has_curves'):
+                self.assertEqual(pyramid[key], full[key], f"{kind}: {key}")
+        
+        # Latency is compared by the shape benchmark, not asserted here
+        results = run_shape_benchmark([ImageFrame(synthetic_shapes('circle', size=512))], repeats=1)
+        self.assertEqual(results['pyramid']['agreement'], 1.0)
+        self.assertEqual(results['full']['speedup'], 1.0)
+    
+    def test_polygon_metrics(self):
+        """Test vectorized polygon area and perimeter"""
+        square = np.array([[0, 0], [0, 10], [10, 10], [10, 0], [0, 0]], dtype=np.float64)
+        triangle = np.array([[0, 0], [0, 4], [3, 0]], dtype=np.float64)
+        metrics = self.shape_detector._polygon_metrics([square, triangle])
+        
+        self.assertEqual(metrics['area'].tolist(), [100.0, 6.0])
+        self.assertEqual(metrics['perimeter'].tolist(), [40.0, 12.0])
+        self.assertEqual(metrics['size'].tolist(), [[10.0, 10.0], [3.0, 4.0]])
+    
+    def test_analysis_tiers(self):
+        """Test that tiers choose stages and that time budgets return partial results"""
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir)
+        image_path = os.path.join(output_dir, 'sample.png')
+        image = np.zeros((240, 320, 3), dtype=np.uint8)
+        cv2.rectangle(image, (60, 40), (200, 180), (220, 60, 60), -1)
+        Image.fromarray(image).save(image_path)
+        
+        analyzer = ImageAnalyzer(output_dir=output_dir)
+        preview = analyzer.analyze_image(image_path, tier='preview')
+        self.assertEqual(preview['completed_stages'], ['color', 'shape'])
+        self.assertIsNone(preview['texture_analysis'])
+        self.assertIsNone(preview['model_parameters'])
+        self.assertIsNone(preview['output_directory'])
+        self.assertTrue(preview['color_analysis']['hex_colors'])
+        self.assertFalse(preview['partial'])
+        
+        standard = analyzer.analyze_image(image_path, tier='standard')
+        self.assertEqual(standard['completed_stages'], ['color', 'shape', 'texture', 'model'])
+        self.assertNotIn('cached', standard)
+        self.assertTrue(analyzer.get_cached_analysis(image_path, tier='preview')['cached'])
+        
+        partial = analyzer.analyze_image(image_path, tier='full', time_budget=1e-9)
+        self.assertTrue(partial['partial'])
+        self.assertEqual(partial['completed_stages'], ['color'])
+        self.assertEqual(partial['skipped_stages'], ['shape', 'texture', 'model'])
+        self.assertIsNone(analyzer.get_cached_analysis(image_path, tier='full'))
+        
+        self.assertIn('error', analyzer.analyze_image(image_path, tier='unknown'))
+    
+    def test_parallel_stages(self):
+        """Test that independent stages overlap and that a failing stage yields partial results"""
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir)
+        image_path = os.path.join(output_dir, 'sample.png')
+        Image.new('RGB', (320, 240), (90, 160, 30)).save(image_path)
+        
+        analyzer = ImageAnalyzer(output_dir=output_dir, stage_workers=3)
+        
+        # Each stage waits until all three are running, so they only complete if they overlap
+        all_running = threading.Barrier(3, timeout=10)
+        stage_threads = []
+        
+        def overlapping(stage_function):
+            def run(*args, **kwargs):
+                stage_threads.append(threading.current_thread().name)
+                all_running.wait()
+                return stage_function(*args, **kwargs)
+            return run
+        
+        get_color_palette = analyzer.color_extractor.get_color_palette
+        detect_shapes = analyzer.shape_detector.detect_shapes
+        analyzer.color_extractor.get_color_palette = overlapping(get_color_palette)
+        analyzer.shape_detector.detect_shapes = overlapping(detect_shapes)
+        analyzer.texture_analyzer.analyze_texture = overlapping(analyzer.texture_analyzer.analyze_texture)
+        
+        results = analyzer.analyze_image(image_path)
+        self.assertEqual(len(set(stage_threads)), 3)
+        self.assertEqual(results['completed_stages'], ['color', 'shape', 'texture', 'model'])
+        self.assertFalse(results['partial'])
+        
+        def fail(image):
+            raise RuntimeError('texture failure')
+        analyzer.color_extractor.get_color_palette = get_color_palette
+        analyzer.shape_detector.detect_shapes = detect_shapes
+        analyzer.texture_analyzer.analyze_texture = fail
+        analyzer.analysis_cache = None
+        
+        results = analyzer.analyze_image(image_path)
+        self.assertEqual(results['stage_errors'], {'texture': 'texture failure'})
+        self.assertEqual(results['completed_stages'], ['color', 'shape'])
+        self.assertEqual(results['skipped_stages'], ['model'])
+        self.assertTrue(results['partial'])
+        self.assertTrue(results['color_analysis']['hex_colors'])
+    
+    def test_batch_analyzer(self):
+        """Test collecting images from archives and analyzing them on a process pool"""
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir)
+        image_paths = []
+        for index, color in enumerate([(200, 40, 40), (40, 200, 40), (40, 40, 200)]):
+            image_path = os.path.join(work_dir, f"image_{index}.png")
+            Image.new('RGB', (160, 120), color).save(image_path)
+            image_paths.append(image_path)
+        broken_path = os.path.join(work_dir, 'broken.png')
+        with open(broken_path, 'wb') as f:
+            f.write(b'not an image')
+        
+        archive_path = os.path.join(work_dir, 'images.zip')
+        with zipfile.ZipFile(archive_path, 'w') as archive:
+            for image_path in image_paths[1:]:
+                archive.write(image_path, os.path.join('nested', os.path.basename(image_path)))
+        collected = collect_images([image_paths[0], archive_path], os.path.join(work_dir, 'extracted'))
+        self.assertEqual(len(collected), 3)
+        self.assertEqual(collected[0], image_paths[0])
+        
+        evil_path = os.path.join(work_dir, 'evil.zip')
+        with zipfile.ZipFile(evil_path, 'w') as archive:
+            archive.writestr('../escaped.png', b'data')
+        with self.assertRaises(ValueError):
+            collect_images([evil_path], os.path.join(work_dir, 'evil'))
+        
+        batch_analyzer = BatchAnalyzer(output_dir=os.path.join(work_dir, 'output'), max_workers=2)
+        self.addCleanup(batch_analyzer.close)
+        results = list(batch_analyzer.analyze(collected + [broken_path], generate_visualizations=False))
+        
+        self.assertEqual(sorted(result['index'] for result in results), [0, 1, 2, 3])
+        by_index = {result['index']: result for result in results}
+        for index in range(3):
+            self.assertEqual(by_index[index]['status'], 'completed')
+            self.assertIn('color_analysis', by_index[index]['analysis'])
+        self.assertEqual(by_index[3]['status'], 'failed')
 
 if __name__ == '__main__':
     unittest.main()
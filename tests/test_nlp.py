@@ -1,6 +1,9 @@
 import unittest
 import sys
 import os
+import tempfile
+import shutil
+import threading
 
 # Add backend directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -11,6 +14,10 @@ from backend.services.nlp.intent_classifier import IntentClassifier
 from backend.services.nlp.entity_extractor import EntityExtractor
 from backend.services.nlp.command_parser import CommandParser
 from backend.services.nlp.response_generator import ResponseGenerator
+from backend.services.nlp.command_document import CommandDocument
+from backend.services.nlp.term_matcher import TermMatcher
+from backend.services.nlp.measurement_extractor import MeasurementExtractor
+from backend.services.nlp.parse_cache import ParseCache
 
 class NLPTestCase(unittest.TestCase):
     """Test case for the NLP components"""
@@ -60,6 +67,198 @@ class NLPTestCase(unittest.TestCase):
         self.assertIsNotNone(command_data)
         self.assertTrue('intent' in command_data)
         self.assertTrue('entities' in command_data)
+    
+    def test_shared_command_document(self):
+        """Test that a command is analyzed once and shared by every stage"""
+        parser = CommandParser(text_processor=self.text_processor)
+        self.assertIs(parser.intent_classifier.text_processor, self.text_processor)
+        self.assertIs(parser.entity_extractor.text_processor, self.text_processor)
+        
+        document = self.text_processor.process_text("Make the Chair RED and 20% bigger")
+        self.assertIsInstance(document, CommandDocument)
+        self.assertEqual(document.lower, "make the chair red and 20% bigger")
+        self.assertEqual(document.numeric_values, [('integer', 20)])
+        self.assertEqual(document.tokens[2], ('chair', 9, 14))
+        
+        # Stages reuse the results cached on the document
+        command_info = self.text_processor.process_command(document)
+        self.assertIs(parser.intent_classifier.classify_intent(document)['command_info'], command_info)
+        self.assertEqual(command_info['colors'], ['red'])
+        self.assertEqual(command_info['size'].get('change'), 'increase')
+        
+        operation = parser.parse_command(document)
+        self.assertEqual(operation['original_text'], "Make the Chair RED and 20% bigger")
+        self.assertEqual(operation['context']['entities']['products'][0]['name'], 'chair')
+    
+    def test_intent_spans(self):
+        """Test that every intent is scored in one scan with its match spans"""
+        text = "Save and export the design, then render a preview"
+        classification = self.intent_classifier.classify_intent(text)
+        
+        self.assertEqual(classification['primary_intent'], 'save')
+        self.assertEqual(classification['primary_score'], 2)
+        self.assertIn('export', classification['secondary_intents'])
+        
+        spans = classification['intent_spans']
+        self.assertEqual([text[start:end] for start, end in spans['save']], ['Save', 'export'])
+        self.assertEqual([text[start:end] for start, end in spans['render']], ['render', 'preview'])
+        self.assertNotIn('undo', spans)
+    
+    def test_parse_cache(self):
+        """Test that repeated commands are served from the parse cache"""
+        parser = CommandParser(self.intent_classifier, self.entity_extractor, parse_cache=ParseCache(max_entries=8))
+        
+        first = parser.parse_command("Make it RED")
+        second = parser.parse_command("  make it   red ")
+        self.assertEqual(second['original_text'], "  make it   red ")
+        self.assertEqual(second['parameters'], first['parameters'])
+        self.assertEqual(parser.parse_cache.get_stats()['hits'], 1)
+        
+        # Changing a vocabulary invalidates the cached parses
+        self.entity_extractor.attribute_types['color'].append('vermilion')
+        self.entity_extractor.refresh_vocabulary()
+        parser.parse_command("make it red")
+        stats = parser.parse_cache.get_stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['invalidations'], 1)
+
+class TermMatcherTestCase(unittest.TestCase):
+    """Test case for the vocabulary term matcher"""
+    
+    def test_term_matching(self):
+        """Test that words and phrases are matched in one pass with their spans"""
+        matcher = TermMatcher()
+        matcher.add('chair', 'chair')
+        matcher.add('chairs', 'chair')
+        matcher.add('art deco', 'art deco')
+        matcher.add('mid-century', 'mid-century')
+        matcher.add('on the top', 'top')
+        self.assertEqual(len(matcher), 5)
+        
+        text = "Put two Chairs on the top, an arm-chair and a mid-century art  deco lamp"
+        matches = matcher.match(text)
+        self.assertEqual([payload for payload, _, _ in matches], ['chair', 'top', 'chair', 'mid-century', 'art deco'])
+        self.assertEqual(matches[0][1:], (8, 14))
+        self.assertEqual(text[matches[1][1]:matches[1][2]], 'on the top')
+        
+        # Terms only match whole tokens
+        self.assertEqual(matcher.match("An armchair at the desktop"), [])
+
+class MeasurementExtractorTestCase(unittest.TestCase):
+    """Test case for the measurement grammar"""
+    
+    def setUp(self):
+        """Set up test objects"""
+        self.extractor = MeasurementExtractor({
+            'length': ['mm', 'cm', 'm', 'inch', 'in'],
+            'weight': ['g', 'kg', 'lb', 'oz'],
+            'volume': ['ml', 'l', 'oz', 'fluid ounce'],
+            'percentage': ['%', 'percent']
+        })
+    
+    def test_units_and_values(self):
+        """Test that numbers are paired with the unit that follows them"""
+        measurements = self.extractor.extract("Make it 2.5 m wide, 3 inches deep, 20% larger and 45 degrees")
+        self.assertEqual(measurements, [
+            {'value': 2.5, 'unit': 'm', 'type': 'length'},
+            {'value': 3, 'unit': 'inch', 'type': 'length'},
+            {'value': 20, 'unit': '%', 'type': 'percentage'},
+            {'value': 45, 'unit': None, 'type': 'integer'}
+        ])
+        
+        # A unit listed under several types belongs to the first
+        self.assertEqual(self.extractor.extract("8 oz")[0]['type'], 'weight')
+        self.assertEqual(self.extractor.extract("1 1/2 fluid ounces")[0], {'value': 1.5, 'unit': 'fluid ounce', 'type': 'volume'})
+        
+        # Plurals are matched as whole forms and never fall back to a shorter unit
+        self.assertEqual(self.extractor.extract("5 lbs and 2 kgs"), [
+            {'value': 5, 'unit': 'lb', 'type': 'weight'},
+            {'value': 2, 'unit': 'kg', 'type': 'weight'}
+        ])
+        self.assertEqual(self.extractor.extract("5 mls, 2 ms")[0]['unit'], 'ml')
+        self.assertEqual(self.extractor.extract("2 ms")[0]['unit'], None)
+    
+    def test_ranges_and_fractions(self):
+        """Test that ranges and fractions are extracted as single measurements"""
+        self.assertEqual(self.extractor.extract("between 120 and 140 cm"), [
+            {'value': 120, 'unit': 'cm', 'type': 'length', 'range': [120, 140]}
+        ])
+        self.assertEqual(self.extractor.extract("10-12 mm or 3 to 4 kg")[1]['range'], [3, 4])
+        self.assertEqual(self.extractor.extract("about 1/2 the height"), [
+            {'value': 0.5, 'unit': None, 'type': 'fraction'}
+        ])
+        
+        # Numbers inside words and units that are prefixes of words are ignored
+        self.assertEqual(self.extractor.extract("a 30x40 frame with 5 mugs"), [
+            {'value': 5, 'unit': None, 'type': 'integer'}
+        ])
+
+class ParseCacheTestCase(unittest.TestCase):
+    """Test case for the parsed command cache"""
+    
+    def setUp(self):
+        """Set up test objects"""
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.cache_dir, 'parse_cache.json')
+    
+    def tearDown(self):
+        """Clean up test files"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+    
+    def test_lru_eviction_and_metrics(self):
+        """Test that the cache is bounded and counts hits, misses and evictions"""
+        cache = ParseCache(max_entries=2)
+        cache.validate('v1')
+        self.assertEqual(ParseCache.normalize("  Make it\tRED "), "make it red")
+        
+        cache.put('make it red', {'operation_type': 'color'})
+        cache.put('use bamboo', {'operation_type': 'material'})
+        self.assertEqual(cache.get('make it red')['operation_type'], 'color')
+        cache.put('rotate it', {'operation_type': 'rotate'})
+        
+        # The least recently used entry was evicted
+        self.assertIsNone(cache.get('use bamboo'))
+        self.assertIsNotNone(cache.get('rotate it'))
+        
+        # Cached operations are copies
+        cache.get('rotate it')['operation_type'] = 'move'
+        self.assertEqual(cache.get('rotate it')['operation_type'], 'rotate')
+        
+        stats = cache.get_stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions'], stats['entries']), (4, 1, 1, 2))
+    
+    def test_persistence_and_invalidation(self):
+        """Test that the cache survives restarts unless the vocabulary changed"""
+        cache = ParseCache(persist_path=self.cache_path)
+        cache.validate('v1')
+        cache.put('make it red', {'operation_type': 'color'})
+        self.assertTrue(cache.save())
+        
+        restored = ParseCache(persist_path=self.cache_path)
+        restored.validate('v1')
+        self.assertEqual(restored.get('make it red'), {'operation_type': 'color'})
+        
+        restored.validate('v2')
+        self.assertIsNone(restored.get('make it red'))
+        self.assertEqual(restored.get_stats()['invalidations'], 1)
+    
+    def test_concurrent_saves(self):
+        """Test that caches sharing a persistence file save without clobbering each other"""
+        caches = [ParseCache(persist_path=self.cache_path) for _ in range(4)]
+        for index, cache in enumerate(caches):
+            cache.validate('v1')
+            cache.put(f'command {index}', {'index': index})
+        
+        savers = [threading.Thread(target=cache.save) for cache in caches for _ in range(5)]
+        for saver in savers:
+            saver.start()
+        for saver in savers:
+            saver.join()
+        
+        restored = ParseCache(persist_path=self.cache_path)
+        restored.validate('v1')
+        self.assertEqual(restored.get_stats()['entries'], 1)
+        self.assertEqual(os.listdir(self.cache_dir), ['parse_cache.json'])
 
 if __name__ == '__main__':
     unittest.main()